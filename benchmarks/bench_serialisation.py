@@ -0,0 +1,68 @@
+"""
+Serialisation time of the `currency-rates` response: DRF serializer + JSONRenderer vs precompiled encoder.
+
+Run from the repository root:
+    python benchmarks/bench_serialisation.py
+"""
+import datetime
+import os
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_currency.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from my_currency.constants import Currencies  # noqa: E402
+from my_currency.renderers import CurrencyRatesJSONRenderer  # noqa: E402
+from my_currency.serializers import \
+    CurrencyRatesResponseSerializer  # noqa: E402
+
+NUM_RATES = 10_000
+REPEAT = 20
+
+
+def build_rates() -> dict:
+    currencies = Currencies.values()
+    num_days = NUM_RATES // len(currencies)
+    date_from = datetime.date(2000, 1, 1)
+    data = {
+        date_from + datetime.timedelta(days=day): {
+            code: Decimal(f'{1 + (day % 97) / 1000 + num / 10:.6f}') for num, code in enumerate(currencies)
+        }
+        for day in range(num_days)
+    }
+    return {
+        'provider_name': 'DB',
+        'source_currency': Currencies.USD,
+        'date_from': date_from,
+        'date_to': date_from + datetime.timedelta(days=num_days - 1),
+        'data': data,
+    }
+
+
+def main():
+    rates = build_rates()
+    renderer = JSONRenderer()
+    fast_renderer = CurrencyRatesJSONRenderer()
+    assert renderer.render(CurrencyRatesResponseSerializer(rates).data) == fast_renderer.render(rates)
+
+    before = min(timeit.repeat(
+        lambda: renderer.render(CurrencyRatesResponseSerializer(rates).data), number=1, repeat=REPEAT
+    ))
+    after = min(timeit.repeat(lambda: fast_renderer.render(rates), number=1, repeat=REPEAT))
+    print(f'Serialisation of {NUM_RATES} rates (best of {REPEAT}):')
+    print(f'  serializer + JSONRenderer: {before * 1000:8.2f} ms')
+    print(f'  precompiled encoder:       {after * 1000:8.2f} ms')
+    print(f'  speedup:                   {before / after:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,13 @@
 from django.contrib import admin
 
 from my_currency import logger
+from my_currency.admin_pagination import KeysetPaginationAdminMixin
 from my_currency.controllers import CurrencyExchangeController
 from my_currency.exceptions import NoProviderException
-from my_currency.models import (Currency, CurrencyExchangeRate,
+from my_currency.models import (AlertOutbox, AlertSubscription, BackfillChunk,
+                                BackfillJob, Currency, CurrencyExchangeRate,
                                 ExchangeCurrency, Provider)
+from my_currency.resolved_rates import refresh_resolved_rates
 
 
 @admin.register(Provider)
@@ -13,19 +16,36 @@ class ProviderAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'updated_at')
     ordering = ('priority',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'priority' in form.changed_data:
+            refresh_resolved_rates()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_resolved_rates()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        refresh_resolved_rates()
+
 @admin.register(Currency)
 class CurrencyAdmin(admin.ModelAdmin):
     list_display = ('id', 'code', 'name', 'symbol')
     ordering = ('id',)
 
 @admin.register(CurrencyExchangeRate)
-class CurrencyExchangeRateAdmin(admin.ModelAdmin):
+class CurrencyExchangeRateAdmin(KeysetPaginationAdminMixin, admin.ModelAdmin):
     list_display = (
         'id', 'provider', 'source_currency', 'exchanged_currency', 'valuation_date', 
-        'rate_value', 'created_at', 'updated_at', 'provider'
+        'rate_value', 'created_at', 'updated_at'
         )
-    list_filter = ('provider', 'source_currency')
-    ordering = ('-created_at',)
+    list_select_related = ('provider', 'source_currency', 'exchanged_currency')
+    # Choices of FK filters come from the small related tables and the date filter has fixed choices (today,
+    # past 7 days, ...), no DISTINCT over the rates table. No date_hierarchy: its drill-down scans the whole table
+    list_filter = ('provider', 'source_currency', 'exchanged_currency', 'valuation_date')
+    # Pagination and date ranges both go through the (valuation_date, id) index
+    keyset_fields = ('valuation_date', 'id')
 
     def has_add_permission(self, request):
         return False
@@ -54,6 +74,10 @@ class ExchangeCurrencyAdmin(admin.ModelAdmin):
                 exchanged_currency=obj.exchanged_currency.code,
                 amount=obj.source_amount,
             )
+            obj.provider = Provider.objects.get(name=rate['provider_name'])
+            obj.exchanged_amount = rate['exchanged_amount']
+            obj.rate_value = rate['rate_value']
+            super().save_model(request, obj, form, change)
             self.message_user(
                 request, 
                 f'{obj.source_amount} {obj.source_currency} = {round(rate["exchanged_amount"], 2)} '
@@ -62,3 +86,44 @@ class ExchangeCurrencyAdmin(admin.ModelAdmin):
 
         except NoProviderException as e:
             self.message_user(request, f'Error: {str(e)}', level='error')
+
+
+class BackfillChunkInline(admin.TabularInline):
+    model = BackfillChunk
+    fields = ('date_from', 'date_to', 'status', 'attempts', 'last_error', 'updated_at')
+    readonly_fields = fields
+    ordering = ('-date_from',)
+    extra = 0
+    can_delete = False
+
+@admin.register(BackfillJob)
+class BackfillJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'source_currency', 'date_from', 'date_to', 'status', 'created_at', 'updated_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    inlines = (BackfillChunkInline,)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AlertSubscription)
+class AlertSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subscriber', 'source_currency', 'exchanged_currency', 'condition', 'threshold', 'is_active')
+    list_filter = ('condition', 'is_active')
+    list_select_related = ('source_currency', 'exchanged_currency')
+    ordering = ('id',)
+
+
+@admin.register(AlertOutbox)
+class AlertOutboxAdmin(KeysetPaginationAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'id', 'subscription', 'valuation_date', 'crossing', 'rate_value', 'created_at', 'delivered_at', 'attempts',
+    )
+    list_select_related = ('subscription__source_currency', 'subscription__exchanged_currency')
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,135 @@
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_VAR = 'cursor'
+# Filtered changelists count at most this many rows
+COUNT_LIMIT = 10000
+
+
+def estimate_table_rows(model, using: str) -> int | None:
+    """
+    Cheap row count estimate of the whole table, None if the DB backend doesn't provide one.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+        elif connection.vendor == 'sqlite':
+            # Rows are append-only, the last rowid is close to the row count
+            cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which never runs a full COUNT(*): the whole table is estimated from DB statistics,
+    filtered querysets are counted up to COUNT_LIMIT rows.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return queryset.order_by()[:COUNT_LIMIT].count()
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paginated by a cursor over `keyset_fields` (all descending) instead of OFFSET.
+    """
+    def __init__(self, request, *args, **kwargs):
+        # Cursor is removed from the query string, so filter and search links start from the first page
+        request.GET = request.GET.copy()
+        self.cursor = request.GET.pop(CURSOR_VAR, [None])[-1]
+        super().__init__(request, *args, **kwargs)
+
+    def _parse_cursor(self) -> dict | None:
+        if not self.cursor:
+            return None
+        values = self.cursor.split(',')
+        if len(values) != len(self.model_admin.keyset_fields):
+            raise IncorrectLookupParameters(f'Invalid cursor: {self.cursor}')
+        try:
+            return {
+                field_name: self.lookup_opts.get_field(field_name).to_python(value)
+                for field_name, value in zip(self.model_admin.keyset_fields, values)
+            }
+        except ValidationError as e:
+            raise IncorrectLookupParameters(e)
+
+    def _get_cursor_filter(self, position: dict) -> Q:
+        keyset_filter = Q()
+        equal_fields = {}
+        for field_name, value in position.items():
+            keyset_filter |= Q(**equal_fields, **{f'{field_name}__lt': value})
+            equal_fields[field_name] = value
+        return keyset_filter
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        position = self._parse_cursor()
+        if position:
+            queryset = queryset.filter(self._get_cursor_filter(position))
+        result_list = list(queryset[:self.list_per_page + 1])
+
+        self.next_cursor = None
+        if len(result_list) > self.list_per_page:
+            result_list = result_list[:self.list_per_page]
+            last = result_list[-1]
+            self.next_cursor = ','.join(
+                str(getattr(last, self.lookup_opts.get_field(field_name).attname))
+                for field_name in self.model_admin.keyset_fields
+            )
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = paginator
+
+    @property
+    def first_page_url(self) -> str:
+        return self.get_query_string()
+
+    @property
+    def next_page_url(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+
+class KeysetPaginationAdminMixin:
+    """
+    ModelAdmin mixin for large tables: cursor pagination over an index of `keyset_fields` and estimated counts.
+    """
+    keyset_fields = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    # Sorting by other columns would break the keyset order
+    sortable_by = ()
+    change_list_template = 'admin/my_currency/keyset_change_list.html'
+
+    def get_ordering(self, request):
+        return [f'-{field_name}' for field_name in self.keyset_fields]
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,207 @@
+import bisect
+import datetime
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from my_currency import logger
+from my_currency.models import (AlertCondition, AlertCrossing, AlertOutbox,
+                                AlertSubscription, ResolvedExchangeRate)
+
+
+class ThresholdIndex:
+    """
+    Thresholds of one condition of a pair, sorted, with their subscription ids.
+    A rate update finds the crossed thresholds with two binary searches.
+    """
+    def __init__(self):
+        self.thresholds = []
+        self.subscription_ids = []
+
+    def add(self, threshold: float, subscription_id: int) -> None:
+        position = bisect.bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(position, threshold)
+        self.subscription_ids.insert(position, subscription_id)
+
+    def crossed_upwards(self, previous: float, current: float) -> list[int]:
+        # previous <= threshold < current
+        start = bisect.bisect_left(self.thresholds, previous)
+        return self.subscription_ids[start:bisect.bisect_left(self.thresholds, current, lo=start)]
+
+    def crossed_downwards(self, previous: float, current: float) -> list[int]:
+        # current < threshold <= previous
+        start = bisect.bisect_right(self.thresholds, current)
+        return self.subscription_ids[start:bisect.bisect_right(self.thresholds, previous, lo=start)]
+
+
+class AlertEngine:
+    """
+    Matches rate updates against active subscriptions kept in threshold indexes per pair and condition.
+    Indexes are rebuilt when subscriptions change. Previous rates and daily moves already alerted are kept in memory,
+    so a subscription fires once per crossing. Other processes (or a restarted one) start from the previous day's rate
+    and may see the same crossing again, the outbox keeps one alert per subscription, day and direction.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._indexes = {}
+        self._last_rates = {}
+        # pair -> (day, largest daily move already alerted)
+        self._daily_moves = {}
+
+    def _load_subscriptions(self) -> None:
+        version = tuple(AlertSubscription.objects.aggregate(Max('updated_at'), Count('id')).values())
+        if version == self._version:
+            return
+
+        indexes = defaultdict(lambda: defaultdict(ThresholdIndex))
+        subscriptions = AlertSubscription.objects.filter(is_active=True).values_list(
+            'id', 'source_currency__code', 'exchanged_currency__code', 'condition', 'threshold'
+        )
+        for subscription_id, source_currency, exchanged_currency, condition, threshold in subscriptions:
+            indexes[(source_currency, exchanged_currency)][condition].add(float(threshold), subscription_id)
+        self._indexes = indexes
+        self._version = version
+        logger.info(f'Loaded alert subscriptions for {len(indexes)} pairs')
+
+    def _get_previous_day_rates(self, source_currency: str, valuation_date: datetime.date) -> dict[str, float]:
+        return {
+            exchanged_currency: float(rate_value)
+            for exchanged_currency, rate_value in ResolvedExchangeRate.objects.filter(
+                source_currency__code=source_currency, valuation_date=valuation_date - datetime.timedelta(days=1)
+            ).values_list('exchanged_currency__code', 'rate_value')
+        }
+
+    def evaluate(
+            self, source_currency: str, valuation_date: datetime.date, rates: dict[str, float]
+            ) -> list[AlertOutbox]:
+        """
+        Returns (unsaved) outbox records of the subscriptions the new rates of `valuation_date` trigger.
+        """
+        alerts = []
+        with self._lock:
+            self._load_subscriptions()
+            previous_day_rates = None
+            for exchanged_currency, rate_value in rates.items():
+                pair = (source_currency, exchanged_currency)
+                rate_value = float(rate_value)
+                indexes = self._indexes.get(pair)
+                if indexes is None:
+                    self._last_rates[pair] = rate_value
+                    continue
+                if previous_day_rates is None:
+                    previous_day_rates = self._get_previous_day_rates(source_currency, valuation_date)
+                previous_day_rate = previous_day_rates.get(exchanged_currency)
+                previous = self._last_rates.get(pair, previous_day_rate)
+                self._last_rates[pair] = rate_value
+
+                triggered = []
+                if previous is not None:
+                    triggered += [
+                        (subscription_id, previous, AlertCrossing.UP)
+                        for subscription_id in indexes[AlertCondition.ABOVE].crossed_upwards(previous, rate_value)
+                    ] + [
+                        (subscription_id, previous, AlertCrossing.DOWN)
+                        for subscription_id in indexes[AlertCondition.BELOW].crossed_downwards(previous, rate_value)
+                    ]
+                if previous_day_rate:
+                    move = abs(rate_value / previous_day_rate - 1) * 100
+                    alerted_day, alerted_move = self._daily_moves.get(pair, (None, 0))
+                    if alerted_day != valuation_date:
+                        alerted_move = 0
+                    crossing = AlertCrossing.UP if rate_value > previous_day_rate else AlertCrossing.DOWN
+                    triggered += [
+                        (subscription_id, previous_day_rate, crossing)
+                        for subscription_id in indexes[AlertCondition.DAILY_CHANGE].crossed_upwards(alerted_move, move)
+                    ]
+                    self._daily_moves[pair] = (valuation_date, max(alerted_move, move))
+
+                alerts += [
+                    AlertOutbox(
+                        subscription_id=subscription_id, valuation_date=valuation_date, crossing=crossing,
+                        rate_value=rate_value, reference_value=reference_value,
+                    )
+                    for subscription_id, reference_value, crossing in triggered
+                ]
+        return alerts
+
+
+_engine = AlertEngine()
+
+
+def get_alert_engine() -> AlertEngine:
+    return _engine
+
+
+def check_alerts(source_currency: str, rates_by_day: dict) -> int:
+    """
+    Evaluates new rates `{day: {code: rate}}` and writes triggered alerts to the outbox in one batch.
+    Days older than ALERTS['MAX_AGE_DAYS'] (historical backfills, imports) are ignored.
+    Alerts another process already wrote for the same crossing are skipped by the outbox constraint.
+    """
+    oldest_day = timezone.now().date() - datetime.timedelta(days=settings.ALERTS['MAX_AGE_DAYS'])
+    alerts = []
+    for day in sorted(rates_by_day, key=str):
+        valuation_date = datetime.date.fromisoformat(str(day))
+        if valuation_date >= oldest_day:
+            alerts += _engine.evaluate(source_currency, valuation_date, rates_by_day[day])
+    AlertOutbox.objects.bulk_create(alerts, ignore_conflicts=True)
+    if alerts:
+        logger.info(f'{len(alerts)} alerts triggered for {source_currency}')
+    return len(alerts)
+
+
+class LogAlertBackend:
+    """
+    Default delivery backend, writes alerts to the log. Backends take a batch of alert dicts in `send`.
+    """
+    def send(self, alerts: list[dict]) -> None:
+        for alert in alerts:
+            logger.info(f'Alert for {alert["subscriber"]}: {alert["pair"]} {alert["condition"]} {alert["threshold"]}, '
+                        f'rate {alert["rate_value"]} (from {alert["reference_value"]}) on {alert["valuation_date"]}')
+
+
+def deliver_alerts(batch_size: int | None = None) -> int:
+    """
+    Sends pending outbox records with the ALERTS['BACKEND'] in batches, marking them delivered.
+    A failed batch is left pending for the next run, up to ALERTS['MAX_ATTEMPTS'] times.
+    Returns the number of delivered alerts.
+    """
+    batch_size = batch_size or settings.ALERTS['BATCH_SIZE']
+    backend = import_string(settings.ALERTS['BACKEND'])()
+    delivered = 0
+    while True:
+        batch = list(AlertOutbox.objects.filter(
+            delivered_at__isnull=True, attempts__lt=settings.ALERTS['MAX_ATTEMPTS']
+        ).select_related(
+            'subscription__source_currency', 'subscription__exchanged_currency'
+        ).order_by('id')[:batch_size])
+        if not batch:
+            return delivered
+
+        ids = [alert.id for alert in batch]
+        try:
+            backend.send([
+                {
+                    'id': alert.id,
+                    'subscriber': alert.subscription.subscriber,
+                    'pair': f'{alert.subscription.source_currency.code}/{alert.subscription.exchanged_currency.code}',
+                    'condition': alert.subscription.condition,
+                    'threshold': float(alert.subscription.threshold),
+                    'valuation_date': str(alert.valuation_date),
+                    'rate_value': float(alert.rate_value),
+                    'reference_value': float(alert.reference_value),
+                }
+                for alert in batch
+            ])
+        except Exception as e:
+            logger.error(f'Failed to deliver {len(batch)} alerts: {e}')
+            AlertOutbox.objects.filter(id__in=ids).update(attempts=F('attempts') + 1)
+            return delivered
+
+        AlertOutbox.objects.filter(id__in=ids).update(delivered_at=timezone.now(), attempts=F('attempts') + 1)
+        delivered += len(batch)
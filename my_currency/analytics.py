@@ -0,0 +1,101 @@
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def build_rate_matrix(data: dict, targets: list[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Converts `{day: {code: rate}}` into sorted day labels and a (days x targets) float64 matrix, NaN for missing rates.
+    """
+    days = sorted(data, key=str)
+    matrix = np.array(
+        [[data[day].get(code, np.nan) for code in targets] for day in days], dtype=np.float64
+    ).reshape(len(days), len(targets))
+    return [str(day) for day in days], matrix
+
+
+def rows_to_columns(rows: list[tuple], targets: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converts `(day, code, rate)` rows into a datetime64 vector of sorted days and a (targets x days) float64 matrix,
+    NaN for missing rates.
+    """
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), np.empty((len(targets), 0))
+    days, codes, values = zip(*rows)
+    days = np.array(days, dtype='datetime64[D]')
+    dates, day_index = np.unique(days, return_inverse=True)
+    target_index = {code: index for index, code in enumerate(targets)}
+    code_index = np.array([target_index.get(code, -1) for code in codes])
+    known = code_index >= 0
+
+    matrix = np.full((len(targets), len(dates)), np.nan)
+    matrix[code_index[known], day_index[known]] = np.array(values, dtype=np.float64)[known]
+    return dates, matrix
+
+
+def to_json_list(values: np.ndarray) -> list:
+    """
+    NaN and inf are not valid JSON, they are returned as nulls.
+    """
+    output = values.astype(object)
+    output[~np.isfinite(values)] = None
+    return output.tolist()
+
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """
+    Applies `func` over trailing windows along days, the first `window - 1` days are NaN.
+    """
+    output = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        output[window - 1:] = func(sliding_window_view(values, window, axis=0), axis=-1)
+    return output
+
+
+def compute_rate_analytics(matrix: np.ndarray, windows: list[int]) -> dict:
+    """
+    Daily returns, rolling mean of rates and rolling volatility of returns per window,
+    max drawdown and correlation of returns between targets, columns of `matrix` are targets.
+    """
+    daily_returns = np.full(matrix.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_returns[1:] = matrix[1:] / matrix[:-1] - 1
+
+    rolling = {
+        window: {
+            'mean': _rolling(matrix, window, np.mean),
+            'volatility': _rolling(daily_returns, window, np.std),
+        }
+        for window in windows
+    }
+
+    num_targets = matrix.shape[1]
+    max_drawdown = np.full(num_targets, np.nan)
+    if len(matrix):
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            # Targets without any rate have an all-NaN drawdown
+            warnings.simplefilter('ignore', RuntimeWarning)
+            max_drawdown = np.nanmin(matrix / np.fmax.accumulate(matrix, axis=0) - 1, axis=0)
+
+    complete_returns = daily_returns[np.isfinite(daily_returns).all(axis=1)]
+    correlation = np.full((num_targets, num_targets), np.nan)
+    if len(complete_returns) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.atleast_2d(np.corrcoef(complete_returns, rowvar=False))
+
+    return {
+        'daily_returns': daily_returns,
+        'rolling': rolling,
+        'max_drawdown': max_drawdown,
+        'correlation': correlation,
+    }
+
+
+def cross_rate_matrix(base_rates: np.ndarray) -> np.ndarray:
+    """
+    Every pair from base rates, (days x currencies) -> (days x sources x targets):
+    source -> target = (base -> target) / (base -> source).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return base_rates[:, np.newaxis, :] / base_rates[:, :, np.newaxis]
@@ -0,0 +1,226 @@
+import datetime
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from my_currency import logger
+from my_currency.models import Currency, CurrencyExchangeRate, Provider
+from my_currency.resolved_rates import refresh_resolved_rates
+
+MANIFEST_NAME = 'manifest.json'
+
+# path -> (manifest mtime, entries)
+_manifest_cache = {}
+
+
+def _month_end(month: datetime.date) -> datetime.date:
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
+
+
+def rows_to_partition(rows: list[tuple]) -> dict[str, np.ndarray]:
+    """
+    Converts `(provider, code, day, rate)` rows into sorted providers, currencies, datetime64 days
+    and a (providers x currencies x days) float64 cube, NaN for missing rates.
+    """
+    provider_names, codes, days, values = zip(*rows)
+    providers, provider_index = np.unique(np.array(provider_names), return_inverse=True)
+    currencies, currency_index = np.unique(np.array(codes), return_inverse=True)
+    dates, day_index = np.unique(np.array(days, dtype='datetime64[D]'), return_inverse=True)
+    rates = np.full((len(providers), len(currencies), len(dates)), np.nan)
+    rates[provider_index, currency_index, day_index] = np.array(values, dtype=np.float64)
+    return {'providers': providers, 'currencies': currencies, 'dates': dates, 'rates': rates}
+
+
+def partition_to_rows(partition: dict[str, np.ndarray]) -> list[tuple]:
+    provider_index, currency_index, day_index = np.nonzero(~np.isnan(partition['rates']))
+    return list(zip(
+        partition['providers'][provider_index].tolist(),
+        partition['currencies'][currency_index].tolist(),
+        partition['dates'][day_index].tolist(),
+        partition['rates'][provider_index, currency_index, day_index].tolist(),
+    ))
+
+
+class RateArchive:
+    """
+    Cold daily rates as compressed monthly partitions per source currency (`<source>/<YYYY-MM>.npz`),
+    with rates of every provider, so precedence is applied on read with the current provider priorities.
+    The manifest keeps min/max dates per file, reads open only the partitions overlapping the range.
+    """
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / MANIFEST_NAME
+
+    def get_entries(self) -> list[dict]:
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached = _manifest_cache.get(self.manifest_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(self.manifest_path) as f:
+            entries = json.load(f)['files']
+        for entry in entries:
+            entry['date_from'] = datetime.date.fromisoformat(entry['date_from'])
+            entry['date_to'] = datetime.date.fromisoformat(entry['date_to'])
+        _manifest_cache[self.manifest_path] = (mtime, entries)
+        return entries
+
+    def _write_atomic(self, path: Path, write) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _save_entry(self, entry: dict) -> None:
+        entries = [
+            existing for existing in self.get_entries()
+            if (existing['source_currency'], existing['path']) != (entry['source_currency'], entry['path'])
+        ] + [entry]
+        entries.sort(key=lambda existing: (existing['source_currency'], existing['date_from']))
+        manifest = {'files': [
+            {**existing, 'date_from': str(existing['date_from']), 'date_to': str(existing['date_to'])}
+            for existing in entries
+        ]}
+        self._write_atomic(self.manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+
+    def read_partition(self, path: str) -> dict[str, np.ndarray]:
+        with np.load(self.directory / path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+    def write_partition(self, source_currency: str, month: datetime.date, rows: list[tuple]) -> dict:
+        """
+        Merges `(provider, code, day, rate)` rows into the partition of the month, the new rows win.
+        """
+        path = f'{source_currency}/{month:%Y-%m}.npz'
+        archived_paths = {(entry['source_currency'], entry['path']) for entry in self.get_entries()}
+        if (source_currency, path) in archived_paths:
+            merged = {row[:3]: row[3] for row in partition_to_rows(self.read_partition(path))}
+            merged.update({row[:3]: row[3] for row in rows})
+            rows = [(*key, value) for key, value in merged.items()]
+
+        partition = rows_to_partition(rows)
+        self._write_atomic(self.directory / path, lambda f: np.savez_compressed(f, **partition))
+        entry = {
+            'source_currency': source_currency,
+            'path': path,
+            'date_from': partition['dates'][0].item(),
+            'date_to': partition['dates'][-1].item(),
+            'rows': len(rows),
+        }
+        self._save_entry(entry)
+        return entry
+
+    def _get_partitions(self, source_currency: str, date_from: datetime.date, date_to: datetime.date):
+        for entry in self.get_entries():
+            if (
+                entry['source_currency'] == source_currency
+                and entry['date_from'] <= date_to and entry['date_to'] >= date_from
+            ):
+                partition = self.read_partition(entry['path'])
+                dates = partition['dates']
+                in_range = (dates >= np.datetime64(date_from)) & (dates <= np.datetime64(date_to))
+                yield {**partition, 'dates': dates[in_range], 'rates': partition['rates'][:, :, in_range]}
+
+    def get_rates(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date, priorities: dict[str, int]
+            ) -> list[tuple]:
+        """
+        (valuation_date, exchanged currency code, rate_value, priority) of the highest priority provider
+        in `priorities` per day, ordered by (valuation_date, code).
+        """
+        rates = []
+        for partition in self._get_partitions(source_currency, date_from, date_to):
+            # Providers deleted since archiving are ignored, as their DB rows would be
+            known = [index for index, name in enumerate(partition['providers'].tolist()) if name in priorities]
+            if not known:
+                continue
+            known.sort(key=lambda index: priorities[partition['providers'][index]])
+            known_priorities = np.array([priorities[partition['providers'][index]] for index in known])
+            cube = partition['rates'][known]
+            has_rate = ~np.isnan(cube)
+            first = has_rate.argmax(axis=0)
+            resolved = np.take_along_axis(cube, first[np.newaxis], axis=0)[0]
+            day_index, currency_index = np.nonzero(has_rate.any(axis=0).T)
+            rates += zip(
+                partition['dates'][day_index].tolist(),
+                partition['currencies'][currency_index].tolist(),
+                resolved[currency_index, day_index].tolist(),
+                known_priorities[first[currency_index, day_index]].tolist(),
+            )
+        return sorted(rates)
+
+    def get_provider_days(
+            self, provider_name: str, source_currency: str, date_from: datetime.date, date_to: datetime.date,
+            min_rates: int
+            ) -> set[datetime.date]:
+        """
+        Days with at least `min_rates` archived rates from the provider.
+        """
+        days = set()
+        for partition in self._get_partitions(source_currency, date_from, date_to):
+            provider_index = np.flatnonzero(partition['providers'] == provider_name)
+            if len(provider_index):
+                counts = (~np.isnan(partition['rates'][provider_index[0]])).sum(axis=0)
+                days.update(partition['dates'][counts >= min_rates].tolist())
+        return days
+
+
+def get_rate_archive() -> RateArchive:
+    return RateArchive(settings.RATE_ARCHIVE['DIR'])
+
+
+def get_archived_rates(source_currency: str, date_from: datetime.date, date_to: datetime.date) -> list[tuple]:
+    archive = get_rate_archive()
+    entries = archive.get_entries()
+    if not entries or date_from > max(entry['date_to'] for entry in entries):
+        return []
+    priorities = dict(Provider.objects.values_list('name', 'priority'))
+    return archive.get_rates(source_currency, date_from, date_to, priorities)
+
+
+def archive_rates(horizon_days: int | None = None) -> int:
+    """
+    Moves daily rates older than `horizon_days` (RATE_ARCHIVE['HORIZON_DAYS'] by default) from the DB
+    to the archive, one source currency month at a time. A partition is written before its rows are deleted,
+    so an interrupted run is simply repeated. Returns the number of archived rows.
+    """
+    horizon_days = settings.RATE_ARCHIVE['HORIZON_DAYS'] if horizon_days is None else horizon_days
+    cutoff = timezone.now().date() - datetime.timedelta(days=horizon_days)
+    archive = get_rate_archive()
+    started_at = timezone.now()
+    cold_rates = CurrencyExchangeRate.objects.filter(valuation_date__lt=cutoff)
+    partitions = cold_rates.annotate(month=TruncMonth('valuation_date')).values_list(
+        'source_currency__code', 'month'
+    ).distinct().order_by('source_currency__code', 'month')
+
+    archived = 0
+    for source_currency, month in partitions:
+        date_to = min(_month_end(month), cutoff - datetime.timedelta(days=1))
+        # Rows updated while archiving stay in the DB, they are newer than the archived ones
+        month_rates = cold_rates.filter(
+            source_currency__code=source_currency, valuation_date__range=[month, date_to], updated_at__lte=started_at,
+        )
+        rows = list(month_rates.values_list(
+            'provider__name', 'exchanged_currency__code', 'valuation_date', 'rate_value'
+        ))
+        if not rows:
+            continue
+        entry = archive.write_partition(source_currency, month, rows)
+        month_rates.delete()
+        refresh_resolved_rates(Currency.objects.get(code=source_currency).id, month, date_to)
+        archived += len(rows)
+        logger.info(f'Archived {len(rows)} rates of {source_currency} to {entry["path"]}')
+    return archived
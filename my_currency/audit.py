@@ -0,0 +1,145 @@
+import atexit
+import queue
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from my_currency import logger
+from my_currency.models import Currency, ExchangeCurrency, Provider
+
+
+class ConversionAuditBuffer:
+    """
+    Write-behind buffer of conversions. Records are queued in memory and inserted with `bulk_create`
+    by a background thread every `flush_size` records or `flush_interval` seconds. When the queue is full,
+    records are dropped and counted instead of slowing requests down. The rest is flushed at exit.
+    """
+    def __init__(self, max_queue_size: int, flush_size: int, flush_interval: float, autostart: bool = True):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.autostart = autostart
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+
+    def record(self, conversion: dict) -> None:
+        """
+        Queues a `convert_amount` result, never blocks.
+        """
+        if self.autostart and self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(conversion)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        if self._queue.qsize() >= self.flush_size:
+            self._flush_event.set()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='conversion-audit', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._flush_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+            close_old_connections()
+
+    def flush(self) -> int:
+        """
+        Inserts everything queued so far in batches of `flush_size`. Returns the number of inserted records.
+        """
+        inserted = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.flush_size)
+                if not batch:
+                    return inserted
+                try:
+                    ExchangeCurrency.objects.bulk_create(self._to_objects(batch))
+                except (DatabaseError, KeyError) as e:
+                    with self._stats_lock:
+                        self.failed += len(batch)
+                    logger.error(f'Failed to write {len(batch)} conversion audit records: {e!r}')
+                    continue
+                inserted += len(batch)
+                with self._stats_lock:
+                    self.flushed += len(batch)
+
+    def _drain(self, max_items: int) -> list[dict]:
+        batch = []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _to_objects(self, batch: list[dict]) -> list[ExchangeCurrency]:
+        # created_at is the flush time, at most `flush_interval` seconds after the conversion
+        currency_ids = dict(Currency.objects.values_list('code', 'id'))
+        provider_ids = dict(Provider.objects.values_list('name', 'id'))
+        return [
+            ExchangeCurrency(
+                provider_id=provider_ids[conversion['provider_name']],
+                source_currency_id=currency_ids[conversion['source_currency']],
+                exchanged_currency_id=currency_ids[conversion['exchanged_currency']],
+                source_amount=conversion['source_amount'],
+                exchanged_amount=conversion['exchanged_amount'],
+                rate_value=conversion['rate_value'],
+            )
+            for conversion in batch
+        ]
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self._queue.qsize(),
+            'dropped': self.dropped,
+            'flushed': self.flushed,
+            'failed': self.failed,
+        }
+
+
+_conversion_audit = None
+_conversion_audit_lock = threading.Lock()
+
+
+def get_conversion_audit() -> ConversionAuditBuffer:
+    global _conversion_audit
+    with _conversion_audit_lock:
+        if _conversion_audit is None:
+            audit_settings = settings.CONVERSION_AUDIT
+            _conversion_audit = ConversionAuditBuffer(
+                max_queue_size=audit_settings['MAX_QUEUE_SIZE'],
+                flush_size=audit_settings['FLUSH_SIZE'],
+                flush_interval=audit_settings['FLUSH_INTERVAL'],
+            )
+        return _conversion_audit
+
+
+def set_conversion_audit(buffer: ConversionAuditBuffer | None) -> None:
+    global _conversion_audit
+    with _conversion_audit_lock:
+        _conversion_audit = buffer
@@ -0,0 +1,131 @@
+import datetime
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import connections
+
+from my_currency import logger
+from my_currency.exceptions import CurrencyBeaconException
+from my_currency.models import (BackfillChunk, BackfillJob, BackfillStatus,
+                                Currency, Provider)
+from my_currency.planner import (get_missing_ranges, get_stored_days,
+                                 plan_chunks)
+from my_currency.utils import fill_date_range
+
+UNFINISHED_STATUSES = [BackfillStatus.PENDING, BackfillStatus.RUNNING, BackfillStatus.FAILED]
+
+
+def create_backfill_job(source_currency: str, date_from: datetime.date, date_to: datetime.date) -> BackfillJob:
+    """
+    Plans the backfill and checkpoints every chunk as pending.
+    """
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    job = BackfillJob.objects.create(
+        provider=provider,
+        source_currency=Currency.objects.get(code=source_currency),
+        date_from=date_from,
+        date_to=date_to,
+    )
+    chunks = plan_chunks(provider.name, source_currency, date_from, date_to)
+    BackfillChunk.objects.bulk_create(
+        [BackfillChunk(job=job, date_from=chunk_start, date_to=chunk_end) for chunk_start, chunk_end in chunks]
+    )
+    if not chunks:
+        job.status = BackfillStatus.COMPLETED
+        job.save(update_fields=['status', 'updated_at'])
+    logger.info(f'Backfill job {job.id} created: {source_currency} {date_from} → {date_to}, {len(chunks)} chunks')
+    return job
+
+
+def run_backfill_job(job: BackfillJob) -> BackfillJob:
+    """
+    Runs every unfinished chunk of the job, BACKFILL['MAX_WORKERS'] at a time.
+    """
+    chunks = list(
+        job.chunks.select_related('job__provider', 'job__source_currency')
+        .filter(status__in=UNFINISHED_STATUSES).order_by('-date_from')
+    )
+    logger.info(f'Running backfill job {job.id}: {len(chunks)} unfinished chunks')
+    job.status = BackfillStatus.RUNNING
+    job.save(update_fields=['status', 'updated_at'])
+
+    max_workers = settings.BACKFILL['MAX_WORKERS']
+    if max_workers == 1:
+        for chunk in chunks:
+            run_chunk(chunk)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backfill') as executor:
+            # Chunk spans keep the caller's trace
+            wait([executor.submit(copy_context().run, _run_chunk_in_worker, chunk) for chunk in chunks])
+
+    statuses = set(job.chunks.values_list('status', flat=True))
+    job.status = BackfillStatus.FAILED if statuses - {BackfillStatus.COMPLETED} else BackfillStatus.COMPLETED
+    job.save(update_fields=['status', 'updated_at'])
+    logger.info(f'Backfill job {job.id} {job.status}')
+    return job
+
+
+def resume_backfill_jobs(job_id: int | None = None) -> list[BackfillJob]:
+    """
+    Continues jobs with unfinished chunks, e.g. after the process died or chunks ran out of retries.
+    Chunks left `running` are taken over, so don't resume a job which is still running somewhere else.
+    """
+    jobs = BackfillJob.objects.filter(chunks__status__in=UNFINISHED_STATUSES).distinct().order_by('id')
+    if job_id is not None:
+        jobs = jobs.filter(id=job_id)
+    return [run_backfill_job(job) for job in jobs]
+
+
+def run_chunk(chunk: BackfillChunk) -> None:
+    """
+    Fetches and stores the days of the chunk which are not stored yet, retrying provider errors with
+    exponential backoff. Finished days are never fetched again, so reruns of finished work cost no provider calls.
+    """
+    job = chunk.job
+    source_currency = job.source_currency.code
+    chunk_name = f'{chunk.date_from} → {chunk.date_to} of job {job.id}'
+    max_attempts = settings.BACKFILL['MAX_ATTEMPTS']
+    backoff = settings.BACKFILL['BACKOFF']
+
+    for attempt in range(1, max_attempts + 1):
+        stored_days = get_stored_days(job.provider.name, source_currency, chunk.date_from, chunk.date_to)
+        missing_ranges = get_missing_ranges(chunk.date_from, chunk.date_to, stored_days)
+        if not missing_ranges:
+            break
+
+        chunk.status = BackfillStatus.RUNNING
+        chunk.attempts += 1
+        chunk.save(update_fields=['status', 'attempts', 'updated_at'])
+        try:
+            for range_start, range_end in missing_ranges:
+                fill_date_range(range_start, range_end, source_currency)
+            break
+        except CurrencyBeaconException as e:
+            chunk.last_error = str(e)
+            if attempt == max_attempts:
+                logger.error(f'Backfill chunk {chunk_name} failed after {attempt} attempts: {e}')
+                chunk.status = BackfillStatus.FAILED
+                chunk.save(update_fields=['status', 'last_error', 'updated_at'])
+                return
+            delay = backoff * 2 ** (attempt - 1) + random.uniform(0, backoff)
+            logger.warning(f'Backfill chunk {chunk_name} failed: {e}. Retrying in {delay:.1f}s')
+            chunk.save(update_fields=['last_error', 'updated_at'])
+            time.sleep(delay)
+
+    chunk.status = BackfillStatus.COMPLETED
+    chunk.last_error = ''
+    chunk.save(update_fields=['status', 'last_error', 'updated_at'])
+
+
+def _run_chunk_in_worker(chunk: BackfillChunk) -> None:
+    try:
+        run_chunk(chunk)
+    except Exception as e:
+        # Worker exceptions would be lost otherwise, the chunk is left for resume
+        logger.exception(f'Backfill chunk {chunk.date_from} → {chunk.date_to} of job {chunk.job_id} crashed')
+        BackfillChunk.objects.filter(id=chunk.id).update(status=BackfillStatus.FAILED, last_error=repr(e))
+    finally:
+        connections.close_all()
@@ -0,0 +1,56 @@
+"""
+Columnar binary format of currency rates, made to be loaded into NumPy without parsing:
+
+    magic (4 bytes) | version (uint16) | reserved (uint16) | header length (uint32) | JSON header
+    | dates: `<M8[D]` (int64 days since 1970-01-01) | rates: `<f8`, (currencies x days) row-major
+
+All integers are little-endian. The JSON header is padded with spaces, so both arrays start at 8-byte aligned offsets
+and every currency's column of rates is contiguous.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'MCRC'
+VERSION = 1
+MEDIA_TYPE = 'application/vnd.my-currency.rates.columnar'
+PREAMBLE = struct.Struct('<4sHHI')
+DATES_DTYPE = np.dtype('<M8[D]')
+RATES_DTYPE = np.dtype('<f8')
+
+
+def encode_columns(header: dict, dates: np.ndarray, rates: np.ndarray) -> bytes:
+    """
+    `header` is any JSON serialisable metadata, `rates` has a row per currency and a column per day of `dates`.
+    """
+    if rates.shape[1:] != dates.shape:
+        raise ValueError(f'Rates of shape {rates.shape} don\'t match {len(dates)} dates')
+    header = dict(header, num_days=len(dates), num_currencies=len(rates),
+                  dates_dtype=DATES_DTYPE.str, rates_dtype=RATES_DTYPE.str)
+    header_bytes = json.dumps(header, separators=(',', ':')).encode()
+    header_bytes += b' ' * (-(PREAMBLE.size + len(header_bytes)) % 8)
+    return b''.join([
+        PREAMBLE.pack(MAGIC, VERSION, 0, len(header_bytes)),
+        header_bytes,
+        np.ascontiguousarray(dates, dtype=DATES_DTYPE).tobytes(),
+        np.ascontiguousarray(rates, dtype=RATES_DTYPE).tobytes(),
+    ])
+
+
+def decode_columns(data: bytes) -> tuple[dict, np.ndarray, np.ndarray]:
+    """
+    Reference reader, the arrays are read-only views of `data` (no copy).
+    """
+    magic, version, _, header_size = PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'Not a columnar rates payload (magic {magic!r}, version {version})')
+    header = json.loads(bytes(data[PREAMBLE.size:PREAMBLE.size + header_size]))
+    offset = PREAMBLE.size + header_size
+    num_days, num_currencies = header['num_days'], header['num_currencies']
+    dates = np.frombuffer(data, dtype=header['dates_dtype'], count=num_days, offset=offset)
+    offset += dates.nbytes
+    rates = np.frombuffer(
+        data, dtype=header['rates_dtype'], count=num_days * num_currencies, offset=offset
+    ).reshape(num_currencies, num_days)
+    return header, dates, rates
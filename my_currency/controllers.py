@@ -1,13 +1,52 @@
+from __future__ import annotations
+
+import time
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 
 from my_currency import logger
+from my_currency.alerts import check_alerts
+from my_currency.analytics import (build_rate_matrix, compute_rate_analytics,
+                                   cross_rate_matrix, rows_to_columns,
+                                   to_json_list)
+from my_currency.archive import get_archived_rates
 from my_currency.constants import Currencies
-from my_currency.currency_clients import (currency_beacon_client,
-                                          mocked_currency_client)
-from my_currency.exceptions import CurrencyBeaconException, NoProviderException
-from my_currency.models import Currency, CurrencyExchangeRate, Provider
-from my_currency.schemas import Rates
+from my_currency.coverage import is_range_covered, record_coverage
+from my_currency.exceptions import (CurrencyBeaconException,
+                                    NoProviderException,
+                                    ProviderUnavailableException,
+                                    QuotaExceededException)
+from my_currency.hedging import hedged_call, latency_tracker
+from my_currency.models import (Currency, CurrencyExchangeRate, Provider,
+                                ResolvedExchangeRate)
+from my_currency.pagination import encode_rates_cursor
+from my_currency.profiling import provider_timer
+from my_currency.providers import get_provider_client
+from my_currency.resolved_rates import refresh_resolved_rates
+from my_currency.snapshots import record_snapshot
+from my_currency.tracing import start_span
+
+if TYPE_CHECKING:
+    # Only the provider clients need pydantic at runtime
+    from my_currency.schemas import Rates
+
+
+MIXED_PROVIDERS = 'mixed'
+
+
+def get_provider_name(served_by: dict[str, str]) -> str:
+    """
+    The provider which served every day, `mixed` when fallbacks served some of them.
+    """
+    provider_names = set(served_by.values())
+    return MIXED_PROVIDERS if len(provider_names) > 1 else next(iter(provider_names), '')
 
 
 class CurrencyExchangeController:
@@ -16,12 +55,13 @@ class CurrencyExchangeController:
 
     def _prepare_currency_rates_response_from_db(
             self, source_currency: str, date_from: datetime.date, date_to: datetime.date, 
-            rates: list[CurrencyExchangeRate], provider_name: str
+            rates: list[tuple], provider_name: str
             ) -> dict:
         logger.info('Preparing response obj from DB objects...')
-        rates_data = defaultdict(dict)
-        for rate in rates:
-            rates_data[rate.valuation_date][rate.exchanged_currency.code] = rate.rate_value
+        with start_span('prepare_response_from_db', source_currency=source_currency, rows=len(rates)):
+            rates_data = defaultdict(dict)
+            for valuation_date, exchanged_currency, rate_value in rates:
+                rates_data[valuation_date][exchanged_currency] = rate_value
 
         output = {
             'provider_name': provider_name,
@@ -37,10 +77,11 @@ class CurrencyExchangeController:
             rates: dict[str, Rates], provider_name: str
             ) -> dict:
         logger.info('Preparing response obj from provider...')
-        rates_data = defaultdict(dict)
-        for day, rate in rates.items():
-            for currency_code, rate_value in rate.model_dump().items():
-                rates_data[day][currency_code] = rate_value
+        with start_span('prepare_response_from_provider', provider=provider_name, days=len(rates)):
+            rates_data = defaultdict(dict)
+            for day, rate in rates.items():
+                for currency_code, rate_value in rate.model_dump().items():
+                    rates_data[day][currency_code] = rate_value
 
         output = {
             'provider_name': provider_name,
@@ -53,12 +94,36 @@ class CurrencyExchangeController:
 
     def _get_rates_from_db(
             self, source_currency: str, date_from: datetime.date, date_to: datetime.date
-            ) -> list[CurrencyExchangeRate]:
+            ) -> list[tuple]:
+        """
+        (valuation_date, exchanged currency code, rate_value) of the highest priority provider per day,
+        read in the order of the resolved rates index. Archived days are merged in by provider priority,
+        rows still in the DB win over archived ones of the same priority.
+        """
         logger.info('Fetching rates from DB...')
-        rates = CurrencyExchangeRate.objects.select_related('source_currency', 'exchanged_currency').filter(
-            source_currency__code=source_currency,
-            valuation_date__range=[date_from, date_to]
-        )
+        with start_span('get_rates_from_db', source_currency=source_currency) as span:
+            hot_rates = ResolvedExchangeRate.objects.filter(
+                source_currency__code=source_currency,
+                valuation_date__range=[date_from, date_to]
+            ).order_by('valuation_date', 'exchanged_currency')
+            archived_rates = get_archived_rates(source_currency, date_from, date_to)
+            if archived_rates:
+                priorities = dict(Provider.objects.values_list('id', 'priority'))
+                resolved = {
+                    (valuation_date, code): (priorities[provider_id], rate_value)
+                    for valuation_date, code, rate_value, provider_id in hot_rates.values_list(
+                        'valuation_date', 'exchanged_currency__code', 'rate_value', 'provider_id'
+                    )
+                }
+                for valuation_date, code, rate_value, priority in archived_rates:
+                    hot = resolved.get((valuation_date, code))
+                    if hot is None or priority < hot[0]:
+                        resolved[(valuation_date, code)] = (priority, rate_value)
+                rates = sorted((*key, rate_value) for key, (_, rate_value) in resolved.items())
+                span.set_attribute('archived_rows', len(archived_rates))
+            else:
+                rates = list(hot_rates.values_list('valuation_date', 'exchanged_currency__code', 'rate_value'))
+            span.set_attribute('rows', len(rates))
         return rates
 
     def save_rates_to_db(self, rates: list[Rates], source_currency: str, provider_id: int) -> None:
@@ -80,90 +145,452 @@ class CurrencyExchangeController:
                         )
                     )
 
-        CurrencyExchangeRate.objects.bulk_create(
-            rate_objects, update_conflicts=True, 
-            unique_fields=['provider', 'source_currency', 'exchanged_currency', 'valuation_date'],
-            update_fields=['rate_value'],
-        )
+        if not rate_objects:
+            return
+        # Days are dates or ISO strings depending on the source
+        days = sorted(str(rate_object.valuation_date) for rate_object in rate_objects)
+        with start_span('save_rates_to_db', source_currency=source_currency, rows=len(rate_objects)), \
+                transaction.atomic():
+            CurrencyExchangeRate.objects.bulk_create(
+                rate_objects, update_conflicts=True, 
+                unique_fields=['provider', 'source_currency', 'exchanged_currency', 'valuation_date'],
+                update_fields=['rate_value', 'updated_at'],
+            )
+            refresh_resolved_rates(
+                currencies_dict[source_currency],
+                datetime.fromisoformat(days[0]).date(), datetime.fromisoformat(days[-1]).date(),
+            )
+            check_alerts(source_currency, {day: rate.model_dump() for day, rate in rates.items()})
         logger.info(f'Rates saved to DB for {source_currency}')
+
+    def save_timeseries_to_db(
+            self, rates: dict[str, Rates], source_currency: str, provider_id: int,
+            date_from: datetime.date, date_to: datetime.date
+            ) -> None:
+        """
+        Saves rates fetched for a range and records the range as covered, including days the provider had no rates for.
+        """
+        self.save_rates_to_db(rates, source_currency, provider_id)
+        record_coverage(provider_id, source_currency, date_from, date_to, rates.keys())
                     
-    def currency_rates_list(self, source_currency: str, date_from: datetime.date, date_to: datetime.date) -> dict:
-        logger.info(f'Fetching rates for {source_currency} from {date_from} to {date_to}')
+    def _get_complete_rates_from_db(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date
+            ) -> list[tuple] | None:
+        """
+        Stored rates of the range, None when some days still have to be fetched from a provider.
+        """
+        covered = is_range_covered(source_currency, date_from, date_to)
         expected_number_of_rates = self._get_expected_number_of_rates(date_from, date_to)
         rates = self._get_rates_from_db(source_currency, date_from, date_to)
         num_rates = len(rates)
-        if num_rates == expected_number_of_rates:
-            logger.info(f'Expected: {expected_number_of_rates}, got: all.')
-            response_rates = self._prepare_currency_rates_response_from_db(
-                source_currency=source_currency,
-                date_from=date_from,
-                date_to=date_to,
-                rates=rates,
-                provider_name='DB'
-            )
-        else:
-            logger.info(f'Expected: {expected_number_of_rates}, got: {num_rates}. Fetching from provider...')
-            while True:
-                try:
-                    provider = next(self.providers)
-                except StopIteration:
-                    logger.error(NoProviderException.default_message)
-                    raise NoProviderException()
-                
+        # Rows stored without coverage records (older data, imports) are still complete when all of them exist
+        if covered or num_rates == expected_number_of_rates:
+            logger.info(f'Covered: {covered}, expected: {expected_number_of_rates}, got: {num_rates}.')
+            return rates
+        logger.info(f'Expected: {expected_number_of_rates}, got: {num_rates}. Fetching from provider...')
+        return None
+
+    def currency_rates_list(self, source_currency: str, date_from: datetime.date, date_to: datetime.date) -> dict:
+        logger.info(f'Fetching rates for {source_currency} from {date_from} to {date_to}')
+        with start_span('currency_rates_list', source_currency=source_currency) as list_span:
+            rates = self._get_complete_rates_from_db(source_currency, date_from, date_to)
+            if rates is not None:
+                response_rates = self._prepare_currency_rates_response_from_db(
+                    source_currency=source_currency,
+                    date_from=date_from,
+                    date_to=date_to,
+                    rates=rates,
+                    provider_name='DB'
+                )
+                response_rates['served_by'] = dict.fromkeys(map(str, response_rates['data']), 'DB')
+            else:
+                rates, served_by = self._fetch_timeseries(source_currency, date_from, date_to)
+                response_rates = self._prepare_currency_rates_response_from_provider(
+                    source_currency=source_currency,
+                    date_from=date_from,
+                    date_to=date_to,
+                    rates=rates,
+                    # Per-day providers are in `served_by` when failing days were served by fallbacks
+                    provider_name=get_provider_name(served_by),
+                )
+                response_rates['served_by'] = served_by
+            list_span.set_attribute('provider', response_rates['provider_name'])
+        return response_rates
+
+    def _fetch_timeseries(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date
+            ) -> tuple[dict[str, Rates], dict[str, str]]:
+        """
+        Fetches the range from providers in priority order. Failing ranges are bisected, sub-ranges which succeed
+        are kept (and persisted), only the days still failing go to the next provider.
+        A provider which is down (or out of quota) fails over its whole remaining range at once.
+        Returns rates by day and the provider name which served every day.
+        """
+        rates, served_by = {}, {}
+        pending = [(date_from, date_to)]
+        while pending:
+            provider = self._next_provider()
+            failed = []
+            for index, (range_from, range_to) in enumerate(pending):
                 try:
-                    rates = provider['client'].timeseries(
-                        base_currency=source_currency,
-                        start_date=date_from,
-                        end_date=date_to
+                    failed.extend(
+                        self._bisect_timeseries(provider, source_currency, range_from, range_to, rates, served_by)
                     )
+                except (QuotaExceededException, ProviderUnavailableException) as e:
+                    logger.error(f'{provider["client"].provider_name} is unavailable, failing over: {e}')
+                    # Days of the current range which weren't served yet, and the untouched ranges
+                    failed.extend(
+                        (day, day)
+                        for day in (range_from + timedelta(days=i) for i in range((range_to - range_from).days + 1))
+                        if str(day) not in served_by
+                    )
+                    failed.extend(pending[index + 1:])
                     break
-                except CurrencyBeaconException:
-                    logger.error(f'Error fetching rates from {provider["client"].provider_name}')
-            if provider['client'].provider_name == Provider.ProviderNames.CURRENCY_BEACON.value:
-                self.save_rates_to_db(rates, source_currency, provider['id'])
-            response_rates = self._prepare_currency_rates_response_from_provider(
-                source_currency=source_currency,
-                date_from=date_from,
-                date_to=date_to,
-                rates=rates,
-                provider_name=provider['client'].provider_name
-            )
+
+            # Adjacent failing ranges are asked from the next provider in one call
+            pending = []
+            for range_from, range_to in failed:
+                if pending and pending[-1][1] + timedelta(days=1) == range_from:
+                    pending[-1] = (pending[-1][0], range_to)
+                else:
+                    pending.append((range_from, range_to))
+
+        rates = dict(sorted(rates.items(), key=lambda item: str(item[0])))
+        return rates, served_by
+
+    def _fetch_timeseries_range(
+            self, provider: dict, source_currency: str, date_from: datetime.date, date_to: datetime.date,
+            rates: dict[str, Rates], served_by: dict[str, str]
+            ) -> bool:
+        """
+        Adds rates of the range to `rates`, False when the provider failed for this range.
+        Errors which don't depend on the range are raised.
+        """
+        provider_name = provider['client'].provider_name
+        try:
+            with start_span('provider_timeseries', provider=provider_name) as span, \
+                    provider_timer(provider_name, 'timeseries'):
+                range_rates = provider['client'].timeseries(
+                    base_currency=source_currency,
+                    start_date=date_from,
+                    end_date=date_to
+                )
+                span.set_attribute('days', len(range_rates))
+        except (QuotaExceededException, ProviderUnavailableException):
+            raise
+        except CurrencyBeaconException:
+            logger.error(f'Error fetching rates from {provider_name} from {date_from} to {date_to}')
+            return False
+
+        if self._is_persisted_provider(provider):
+            self.save_timeseries_to_db(range_rates, source_currency, provider['id'], date_from, date_to)
+        rates.update(range_rates)
+        served_by.update(dict.fromkeys(map(str, range_rates), provider_name))
+        return True
+
+    def _bisect_timeseries(
+            self, provider: dict, source_currency: str, date_from: datetime.date, date_to: datetime.date,
+            rates: dict[str, Rates], served_by: dict[str, str], depth: int = 0
+            ) -> list[tuple[datetime.date, datetime.date]]:
+        """
+        Adds rates of the range to `rates`. A failing range is split in halves up to TIMESERIES_BISECT_MAX_DEPTH times
+        or down to single days, every failing half is split further. Returns the ranges which failed.
+        """
+        if depth == 0 and self._fetch_timeseries_range(
+                provider, source_currency, date_from, date_to, rates, served_by
+                ):
+            return []
+        if date_from == date_to or depth >= settings.TIMESERIES_BISECT_MAX_DEPTH:
+            return [(date_from, date_to)]
+
+        middle = date_from + timedelta(days=(date_to - date_from).days // 2)
+        failed = []
+        for half_from, half_to in [(date_from, middle), (middle + timedelta(days=1), date_to)]:
+            if not self._fetch_timeseries_range(provider, source_currency, half_from, half_to, rates, served_by):
+                failed.extend(self._bisect_timeseries(
+                    provider, source_currency, half_from, half_to, rates, served_by, depth + 1
+                ))
+        return failed
+
+    def currency_rates_columns(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date
+            ) -> dict:
+        """
+        Rates of the range as columns: a datetime64 vector of days and a (currencies x days) float64 matrix,
+        NaN for missing rates. Stored ranges are read into the arrays without building the `{day: {code: rate}}` dict.
+        """
+        currencies = Currencies.values()
+        with start_span('currency_rates_columns', source_currency=source_currency) as span:
+            rates = self._get_complete_rates_from_db(source_currency, date_from, date_to)
+            if rates is not None:
+                provider_name = 'DB'
+                dates, matrix = rows_to_columns(rates, currencies)
+            else:
+                response_rates = self.currency_rates_list(source_currency, date_from, date_to)
+                provider_name = response_rates['provider_name']
+                days, matrix = build_rate_matrix(response_rates['data'], currencies)
+                dates, matrix = np.array(days, dtype='datetime64[D]'), matrix.T
+            span.set_attribute('days', len(dates))
+
+        return {
+            'provider_name': provider_name,
+            'source_currency': source_currency,
+            'date_from': date_from,
+            'date_to': date_to,
+            'currencies': currencies,
+            'dates': dates,
+            'rates': np.ascontiguousarray(matrix, dtype=np.float64),
+        }
+
+    def currency_rates_page(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date, page_size: int,
+            position: tuple[datetime.date, str] | None = None
+            ) -> dict:
+        """
+        Returns `page_size` rates ordered by (valuation_date, exchanged_currency) after `position`.
+        Only the days the page can cover are read or fetched, so every page costs the same.
+        """
+        window_from = position[0] if position else date_from
+        # One extra day covers the rest of a partially returned day
+        num_days = page_size // len(Currencies.values()) + 2
+        window_to = min(date_to, window_from + timedelta(days=num_days - 1))
+        response_rates = self.currency_rates_list(source_currency, window_from, window_to)
+
+        entries = sorted(
+            (str(day), currency_code, rate_value)
+            for day, day_rates in response_rates['data'].items()
+            for currency_code, rate_value in day_rates.items()
+        )
+        if position:
+            last_day, last_currency_code = str(position[0]), position[1]
+            entries = [entry for entry in entries if (entry[0], entry[1]) > (last_day, last_currency_code)]
+
+        page_entries = entries[:page_size]
+        next_cursor = None
+        if len(entries) > page_size:
+            next_cursor = encode_rates_cursor(*page_entries[-1][:2])
+        elif window_to < date_to:
+            # Window is exhausted, the next page starts from the beginning of the following day
+            next_cursor = encode_rates_cursor(str(window_to + timedelta(days=1)), '')
+
+        rates_data = defaultdict(dict)
+        for day, currency_code, rate_value in page_entries:
+            rates_data[day][currency_code] = rate_value
+
+        response_rates.update({
+            'date_from': date_from,
+            'date_to': date_to,
+            'data': rates_data,
+            'served_by': {day: response_rates['served_by'][day] for day in rates_data},
+            'next': next_cursor,
+        })
         return response_rates
-    
 
-    def convert_amount(self, source_currency: str, exchanged_currency: str, amount: float) -> float:
-        logger.info(f'Converting {amount} from {source_currency} to {exchanged_currency}')
+    def currency_rates_analytics(
+            self, source_currency: str, date_from: datetime.date, date_to: datetime.date,
+            windows: list[int], targets: list[str]
+            ) -> dict:
+        """
+        Rate evolution of `source_currency` against `targets`. Ranges fully in the past never change,
+        so their results are memoised in the cache, unless some days came from a non-persisted provider.
+        """
+        cache_key = None
+        if date_to < timezone.now().date():
+            cache_key = (
+                f'rate-analytics:{source_currency}:{date_from}:{date_to}:'
+                f'{",".join(map(str, windows))}:{",".join(targets)}'
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f'Rate analytics for {source_currency} from {date_from} to {date_to} found in cache')
+                return cached
+
+        rates = self.currency_rates_list(source_currency, date_from, date_to)
+        dates, matrix = build_rate_matrix(rates['data'], targets)
+        analytics = compute_rate_analytics(matrix, windows)
+
+        def by_target(values):
+            return dict(zip(targets, to_json_list(values.T)))
+
+        output = {
+            'provider_name': rates['provider_name'],
+            'source_currency': source_currency,
+            'date_from': date_from,
+            'date_to': date_to,
+            'dates': dates,
+            'daily_returns': by_target(analytics['daily_returns']),
+            'rolling': {
+                str(window): {name: by_target(values) for name, values in window_analytics.items()}
+                for window, window_analytics in analytics['rolling'].items()
+            },
+            'max_drawdown': dict(zip(targets, to_json_list(analytics['max_drawdown']))),
+            'correlation': {
+                target: dict(zip(targets, row))
+                for target, row in zip(targets, to_json_list(analytics['correlation']))
+            },
+        }
+        # Rates of non-persisted (mocked) providers are not memoised, a provider coming back must be seen
+        if cache_key is not None and self._is_persisted_data(rates['served_by']):
+            cache.set(cache_key, output, settings.RATE_ANALYTICS_CACHE_TIMEOUT)
+        return output
+
+    def currency_rates_matrix(self, date_from: datetime.date, date_to: datetime.date, currencies: list[str]) -> dict:
+        """
+        Rates of every pair of `currencies` per day. Only the rates of one base currency are read
+        (or fetched), the rest is derived by inversion and cross-multiplication.
+        """
+        base_currency = settings.CURRENCY_RATES_MATRIX_BASE
+        rates = self.currency_rates_list(base_currency, date_from, date_to)
+        dates, base_rates = build_rate_matrix(rates['data'], currencies)
+        return {
+            'provider_name': rates['provider_name'],
+            'base_currency': base_currency,
+            'date_from': date_from,
+            'date_to': date_to,
+            'currencies': currencies,
+            'dates': dates,
+            'rates': to_json_list(cross_rate_matrix(base_rates).round(6)),
+        }
+
+    def _get_latest_rate_from_db(self, source_currency: str, exchanged_currency: str) -> CurrencyExchangeRate | None:
+        logger.info('Fetching latest rate from DB...')
+        fresh_since = timezone.now() - timedelta(seconds=settings.LATEST_RATES_MAX_AGE)
+        return CurrencyExchangeRate.objects.select_related('provider').filter(
+            source_currency__code=source_currency,
+            exchanged_currency__code=exchanged_currency,
+            valuation_date=timezone.now().date(),
+            updated_at__gte=fresh_since,
+        ).order_by('provider__priority').first()
+
+    def latest_rates(self, source_currency: str, keep_history: bool = False) -> dict:
+        """
+        Latest rates of `source_currency` against all currencies: today's fresh rates of the highest priority
+        provider from DB, a provider call otherwise. `keep_history` is for callers outside of the request path.
+        """
+        fresh_since = timezone.now() - timedelta(seconds=settings.LATEST_RATES_MAX_AGE)
+        rates = CurrencyExchangeRate.objects.select_related('provider', 'exchanged_currency').filter(
+            source_currency__code=source_currency,
+            valuation_date=timezone.now().date(),
+            updated_at__gte=fresh_since,
+        ).order_by('provider__priority')
+        rates_by_provider = defaultdict(dict)
+        for rate in rates:
+            rates_by_provider[rate.provider.name][rate.exchanged_currency.code] = float(rate.rate_value)
+        for provider_name, provider_rates in rates_by_provider.items():
+            if len(provider_rates) == len(Currencies.values()):
+                return {'provider_name': provider_name, 'source_currency': source_currency, 'rates': provider_rates}
+
+        provider, rates = self._fetch_latest_rates(source_currency, keep_history)
+        return {
+            'provider_name': provider['client'].provider_name,
+            'source_currency': source_currency,
+            'rates': rates.model_dump(),
+        }
+
+    def _next_provider(self) -> dict:
+        try:
+            return next(self.providers)
+        except StopIteration:
+            logger.error(NoProviderException.default_message)
+            raise NoProviderException()
+
+    def _next_provider_or_none(self) -> dict | None:
+        return next(self.providers, None)
+
+    def _get_latest_rates(self, provider: dict, source_currency: str) -> Rates:
+        provider_name = provider['client'].provider_name
+        started = time.perf_counter()
+        with start_span('provider_latest', provider=provider_name), provider_timer(provider_name, 'latest'):
+            rates = provider['client'].latest(base_currency=source_currency)
+        latency_tracker.record(provider_name, time.perf_counter() - started)
+        return rates
+
+    def _fetch_latest_rates(self, source_currency: str, keep_history: bool = False) -> tuple[dict, Rates]:
+        provider, rates = self._call_latest_rates(source_currency)
+        if keep_history and self._is_persisted_provider(provider):
+            # Kept as intraday history, the daily table has one value per day. Only the refresher and the stream
+            # poller keep it and check alerts, the locked upsert and the outbox write would slow conversions down
+            record_snapshot(provider['id'], source_currency, rates.model_dump())
+            check_alerts(source_currency, {timezone.now().date(): rates.model_dump()})
+        return provider, rates
+
+    def _call_latest_rates(self, source_currency: str) -> tuple[dict, Rates]:
+        if settings.HEDGING['ENABLED']:
+            provider, rates = hedged_call(
+                self._next_provider(), self._next_provider_or_none,
+                lambda provider: self._get_latest_rates(provider, source_currency),
+            )
+            if provider is not None:
+                return provider, rates
+
         while True:
+            provider = self._next_provider()
             try:
-                provider = next(self.providers)
-            except StopIteration:
-                logger.error(NoProviderException.default_message)
-                raise NoProviderException()
-            rates = provider['client'].latest(base_currency=source_currency)
+                rates = self._get_latest_rates(provider, source_currency)
+            except CurrencyBeaconException:
+                logger.error(f'Error fetching latest rates from {provider["client"].provider_name}')
+                continue
             if rates:
-                break
+                return provider, rates
+
+    def refresh_latest_rates(self, source_currency: str) -> str:
+        """
+        Fetches latest rates and stores them as today's daily rates, so that conversions can be served from DB.
+        """
+        logger.info(f'Refreshing latest rates for {source_currency}')
+        provider, rates = self._fetch_latest_rates(source_currency, keep_history=True)
+        if self._is_persisted_provider(provider):
+            self.save_rates_to_db({timezone.now().date(): rates}, source_currency, provider['id'])
+        return provider['client'].provider_name
+
+    def convert_amount(self, source_currency: str, exchanged_currency: str, amount: float) -> float:
+        logger.info(f'Converting {amount} from {source_currency} to {exchanged_currency}')
+        rate = self._get_latest_rate_from_db(source_currency, exchanged_currency)
+        if rate is not None:
+            provider_name = rate.provider.name
+            rate_value = float(rate.rate_value)
+        else:
+            logger.info('No fresh rate in DB. Fetching from provider...')
+            provider, rates = self._fetch_latest_rates(source_currency)
+            provider_name = provider['client'].provider_name
+            rate_value = getattr(rates, exchanged_currency)
+
         response = {
-            'provider_name': provider['client'].provider_name,
+            'provider_name': provider_name,
             'source_currency': source_currency,
             'exchanged_currency': exchanged_currency,
             'source_amount': float(amount),
-            'exchanged_amount': float(amount) * getattr(rates, exchanged_currency),
-            'rate_value': getattr(rates, exchanged_currency),
+            'exchanged_amount': float(amount) * rate_value,
+            'rate_value': rate_value,
         }
 
         return response
 
     def _get_providers(self):
-        PROVIDER_MAP = {
-            Provider.ProviderNames.CURRENCY_BEACON.value: currency_beacon_client,
-            Provider.ProviderNames.MOCK.value: mocked_currency_client,
-        }
         providers_obj = list(Provider.objects.filter(is_active=True).order_by('priority'))
-        provider_clients = [{'id': provider.id, 'client': PROVIDER_MAP[provider.name]} for provider in providers_obj]
-        for provider in provider_clients:
-            logger.info(f'Checking provider {provider["client"].provider_name}...')
-            yield provider
+        for provider in providers_obj:
+            client = get_provider_client(provider.name)
+            if client is None:
+                continue
+            logger.info(f'Checking provider {provider.name}...')
+            yield {'id': provider.id, 'client': client}
     
+    def _is_persisted_provider(self, provider: dict) -> bool:
+        # Only real provider data is stored, mocked rates are returned to the client as is
+        return provider['client'].persist_rates
+
+    def _is_persisted_data(self, served_by: dict[str, str]) -> bool:
+        """
+        Whether every day was served from the DB or by a provider whose rates are stored.
+        """
+        for provider_name in set(served_by.values()):
+            if provider_name == 'DB':
+                continue
+            client = get_provider_client(provider_name)
+            if client is None or not client.persist_rates:
+                return False
+        return True
+
     def _get_expected_number_of_rates(self, date_from: datetime.date, date_to: datetime.date) -> int:
         days_diff = (date_to - date_from).days
         return (days_diff + 1) * len(Currencies.values())
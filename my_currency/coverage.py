@@ -0,0 +1,106 @@
+import datetime
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from my_currency.models import Currency, RateCoverage
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def _to_ranges(days: Iterable[datetime.date]) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Groups days into sorted inclusive ranges of consecutive days.
+    """
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] + ONE_DAY == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _active_coverage():
+    return RateCoverage.objects.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+
+
+def is_range_covered(source_currency: str, date_from: datetime.date, date_to: datetime.date) -> bool:
+    """
+    Whether every day of the range was fetched from some provider, with or without rates.
+    Looks at the few coverage intervals overlapping the range instead of counting rate rows.
+    """
+    intervals = _active_coverage().filter(
+        source_currency__code=source_currency, date_from__lte=date_to, date_to__gte=date_from,
+    ).order_by('date_from').values_list('date_from', 'date_to')
+
+    next_day = date_from
+    for interval_from, interval_to in intervals:
+        if interval_from > next_day:
+            return False
+        next_day = max(next_day, interval_to + ONE_DAY)
+        if next_day > date_to:
+            return True
+    return next_day > date_to
+
+
+def get_covered_days(
+        provider_name: str, source_currency: str, date_from: datetime.date, date_to: datetime.date
+        ) -> set[datetime.date]:
+    covered_days = set()
+    intervals = _active_coverage().filter(
+        provider__name=provider_name, source_currency__code=source_currency,
+        date_from__lte=date_to, date_to__gte=date_from,
+    ).values_list('date_from', 'date_to')
+    for interval_from, interval_to in intervals:
+        day = max(interval_from, date_from)
+        while day <= min(interval_to, date_to):
+            covered_days.add(day)
+            day += ONE_DAY
+    return covered_days
+
+
+def record_coverage(
+        provider_id: int, source_currency: str, date_from: datetime.date, date_to: datetime.date,
+        days_with_rates: Iterable
+        ) -> None:
+    """
+    Records a fetched range: days with rates are merged into the provider's coverage intervals,
+    days without rates are stored as empty and expire after RATE_COVERAGE_EMPTY_TTL seconds.
+    Today and future days may still be published, they are never stored as empty.
+    """
+    source_currency_id = Currency.objects.values_list('id', flat=True).get(code=source_currency)
+    days_with_rates = {datetime.date.fromisoformat(str(day)) for day in days_with_rates}
+    days_with_rates = {day for day in days_with_rates if date_from <= day <= date_to}
+    all_days = {date_from + datetime.timedelta(days=offset) for offset in range((date_to - date_from).days + 1)}
+    now = timezone.now()
+    empty_days = {day for day in all_days - days_with_rates if day < now.date()}
+    empty_expires_at = now + datetime.timedelta(seconds=settings.RATE_COVERAGE_EMPTY_TTL)
+
+    with transaction.atomic():
+        provider_coverage = RateCoverage.objects.filter(provider_id=provider_id, source_currency_id=source_currency_id)
+        provider_coverage.filter(expires_at__lte=now).delete()
+
+        for range_from, range_to in _to_ranges(days_with_rates):
+            # Overlapping and adjacent intervals are merged, so lookups stay a handful of rows
+            overlapping = provider_coverage.filter(
+                is_empty=False, date_from__lte=range_to + ONE_DAY, date_to__gte=range_from - ONE_DAY,
+            )
+            for interval_from, interval_to in overlapping.values_list('date_from', 'date_to'):
+                range_from, range_to = min(range_from, interval_from), max(range_to, interval_to)
+            overlapping.delete()
+            provider_coverage.filter(is_empty=True, date_from__gte=range_from, date_to__lte=range_to).delete()
+            RateCoverage.objects.create(
+                provider_id=provider_id, source_currency_id=source_currency_id, date_from=range_from, date_to=range_to,
+            )
+
+        RateCoverage.objects.bulk_create([
+            RateCoverage(
+                provider_id=provider_id, source_currency_id=source_currency_id, date_from=range_from,
+                date_to=range_to, is_empty=True, expires_at=empty_expires_at,
+            )
+            for range_from, range_to in _to_ranges(empty_days)
+        ])
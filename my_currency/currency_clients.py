@@ -6,14 +6,27 @@ import requests
 
 from my_currency import logger
 from my_currency.constants import Currencies
-from my_currency.exceptions import CurrencyBeaconException
+from my_currency.exceptions import (CurrencyBeaconException,
+                                    ProviderUnavailableException)
 from my_currency.models import Provider
+from my_currency.planner import split_date_range
+from my_currency.provider_cache import get_response_cache, is_replay_only
+from my_currency.quota import ProviderQuota, get_provider_limits
 from my_currency.schemas import (CurrenciesResponse, Currency,
                                  HistoricalResponse, LatestResponse, Rates,
                                  TimeseriesResponse)
 
+# Statuses (besides 5xx) which fail the same way for any request
+UNAVAILABLE_STATUS_CODES = (401, 403, 429)
+
 
 class BaseCurrencyClient:
+    """
+    Provider clients are declared in settings.CURRENCY_PROVIDERS (or entry points) and created by the provider registry.
+    """
+    # Whether the rates are stored in the DB
+    persist_rates = True
+
     def __init__(self):
         self.symbols = Currencies.values()
         self.symbols_str = ','.join(self.symbols)
@@ -27,34 +40,46 @@ class BaseCurrencyClient:
 
 class MockedCurrencyClient(BaseCurrencyClient):
     provider_name = Provider.ProviderNames.MOCK.value
-   
-    def _generate_rates(self, base_currency: str) -> Rates:
+    persist_rates = False
+
+    def __init__(self, seed: int | None = None):
+        super().__init__()
+        self.seed = settings.MOCKED_CURRENCY_CLIENT_SEED if seed is None else seed
+
+    def _generate_rates(self, base_currency: str, date: str) -> Rates:
+        # Same seed, base and date always give the same rates, so benchmarks are reproducible
+        rng = random.Random(f'{self.seed}:{base_currency}:{date}')
         return Rates(
-            CHF=round(random.uniform(0.9, 1.1), 6) if base_currency != Currencies.CHF else 1.0,
-            EUR=round(random.uniform(0.9, 1.1), 6) if base_currency != Currencies.EUR else 1.0,
-            GBP=round(random.uniform(0.9, 1.1), 6) if base_currency != Currencies.GBP else 1.0,
-            USD=round(random.uniform(0.9, 1.1), 6) if base_currency != Currencies.USD else 1.0
+            CHF=round(rng.uniform(0.9, 1.1), 6) if base_currency != Currencies.CHF else 1.0,
+            EUR=round(rng.uniform(0.9, 1.1), 6) if base_currency != Currencies.EUR else 1.0,
+            GBP=round(rng.uniform(0.9, 1.1), 6) if base_currency != Currencies.GBP else 1.0,
+            USD=round(rng.uniform(0.9, 1.1), 6) if base_currency != Currencies.USD else 1.0
         )
 
     def latest(self, base_currency: str) -> Rates:
-        return self._generate_rates(base_currency)
+        return self._generate_rates(base_currency, datetime.date.today().strftime(self.date_format))
 
     def historical(self, base_currency: str, date: str) -> Rates:
-        return self._generate_rates(base_currency)
+        return self._generate_rates(base_currency, date)
 
     def timeseries(self, base_currency: str, start_date: datetime.date, end_date: datetime.date) -> dict[str, Rates]:
         rates = {}
         current_date = start_date
         while current_date <= end_date:
-            rates[current_date.strftime(self.date_format)] = self._generate_rates(base_currency)
+            date = current_date.strftime(self.date_format)
+            rates[date] = self._generate_rates(base_currency, date)
             current_date = current_date + datetime.timedelta(days=1)
         return rates
 
 class CurrencyBeaconClient(BaseCurrencyClient):
-    api_key = settings.CURRENCY_BEACON_API_KEY
     base_url = 'https://api.currencybeacon.com/v1'
     provider_name = Provider.ProviderNames.CURRENCY_BEACON.value
 
+    def __init__(self):
+        super().__init__()
+        self.api_key = settings.CURRENCY_BEACON_API_KEY
+        self.quota = ProviderQuota(self.provider_name)
+
     def latest(self, base_currency: str) -> Rates:
         url = f'{self.base_url}/latest'
         params = {
@@ -62,9 +87,8 @@ class CurrencyBeaconClient(BaseCurrencyClient):
             'base': base_currency,
             'symbols': self.symbols_str,
         }
-        response = requests.get(url, params=params)
-        response = self._handle_response(response)
-        validated_response = LatestResponse(**response.json())
+        response = self._get(url, params)
+        validated_response = LatestResponse(**response)
         return validated_response.rates
 
     def historical(self, base_currency: str, date: str) -> Rates:
@@ -75,9 +99,9 @@ class CurrencyBeaconClient(BaseCurrencyClient):
             'symbols': self.symbols_str,
             'date': date,
         }
-        response = requests.get(url, params=params)
-        response = self._handle_response(response)
-        validated_response = HistoricalResponse(**response.json())
+        # Past days never change
+        response = self._get(url, params, cacheable=date < datetime.date.today().strftime(self.date_format))
+        validated_response = HistoricalResponse(**response)
         return validated_response.rates
         
     def currencies(self) -> list[Currency]:
@@ -86,12 +110,19 @@ class CurrencyBeaconClient(BaseCurrencyClient):
             'api_key': self.api_key,
             'type': 'fiat'
         }
-        response = requests.get(url, params=params)
-        response = self._handle_response(response)
-        validated_response = CurrenciesResponse(**response.json())
+        response = self._get(url, params)
+        validated_response = CurrenciesResponse(**response)
         return validated_response.response
     
     def timeseries(self, base_currency: str, start_date: datetime.date, end_date: datetime.date) -> dict[str, Rates]:
+        # Ranges longer than the provider allows are fetched window by window
+        max_range_days = get_provider_limits(self.provider_name)['max_range_days']
+        rates = {}
+        for window_start, window_end in reversed(split_date_range(start_date, end_date, max_range_days)):
+            rates.update(self._timeseries(base_currency, window_start, window_end))
+        return rates
+
+    def _timeseries(self, base_currency: str, start_date: datetime.date, end_date: datetime.date) -> dict[str, Rates]:
         url = f'{self.base_url}/timeseries'
         params = {
             'api_key': self.api_key,
@@ -100,18 +131,45 @@ class CurrencyBeaconClient(BaseCurrencyClient):
             'start_date': start_date.strftime(self.date_format),
             'end_date': end_date.strftime(self.date_format),
         }
-        response = requests.get(url, params=params)
-        response = self._handle_response(response)
-        validated_response = TimeseriesResponse(**response.json())
+        # Ranges including today (or the future) may still change
+        response = self._get(url, params, cacheable=end_date < datetime.date.today())
+        validated_response = TimeseriesResponse(**response)
         return validated_response.response
     
+    def _get(self, url: str, params: dict, cacheable: bool = False) -> dict:
+        """
+        Calls the API and returns the JSON body. Cacheable responses are recorded in the provider response cache,
+        cache hits cost no quota. In replay-only mode nothing goes to the network.
+        """
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            body = response_cache.get(url, params)
+            if body is not None:
+                logger.info(f'Serving {url} from provider response cache')
+                return body
+            if is_replay_only():
+                raise CurrencyBeaconException(f'No recorded response for {url} in replay-only mode')
+
+        self.quota.acquire()
+        try:
+            response = requests.get(url, params=params, timeout=settings.PROVIDER_REQUEST_TIMEOUT)
+        except requests.ConnectionError as e:
+            logger.warning(f'Currency Beacon API is unreachable: {e}')
+            raise ProviderUnavailableException(f'Connection error: {e}')
+        except requests.RequestException as e:
+            # Read timeouts of long ranges may succeed for shorter ones
+            logger.warning(f'Currency Beacon API request failed: {e}')
+            raise CurrencyBeaconException(f'Request error: {e}')
+        body = self._handle_response(response).json()
+        if cacheable and response_cache is not None:
+            response_cache.set(url, params, body)
+        return body
+
     def _handle_response(self, response: requests.Response) -> requests.Response:
         if response.status_code == 200:
             return response
         else:
             logger.warning(f'Received error from Currency Beacon API: {response.status_code}, {response.text}')
+            if response.status_code in UNAVAILABLE_STATUS_CODES or response.status_code >= 500:
+                raise ProviderUnavailableException(f'Error: {response.status_code}, {response.text}')
             raise CurrencyBeaconException(f'Error: {response.status_code}, {response.text}')
-
-
-currency_beacon_client = CurrencyBeaconClient()
-mocked_currency_client = MockedCurrencyClient()
@@ -0,0 +1,80 @@
+import json
+from decimal import Decimal
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import _UnvalidatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+
+def _to_str(value):
+    return str(value)
+
+
+def _to_float(value):
+    return float(value)
+
+
+def _dict_keys_to_str(value):
+    return {str(key): val for key, val in value.items()}
+
+
+_drf_default = encoders.JSONEncoder().default
+
+
+def _default(obj):
+    # Decimals from the DB are by far the most common non-native value, check them before DRF fallbacks
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _drf_default(obj)
+
+
+class PrecompiledSerializerEncoder:
+    """
+    Writes JSON for plain response dicts without running DRF field machinery.
+
+    Field conversions are resolved once from the serializer declaration, the output is byte-identical
+    to `JSONRenderer().render(serializer_class(data).data)`.
+    The serializer itself stays the source of truth for the OpenAPI schema.
+    """
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.serializer_class = serializer_class
+        self.fields = [
+            (field_name, self._compile_field(field)) for field_name, field in serializer_class().fields.items()
+        ]
+        self._encode = json.JSONEncoder(
+            ensure_ascii=JSONRenderer.ensure_ascii,
+            allow_nan=not JSONRenderer.strict,
+            separators=(',', ':') if JSONRenderer.compact else (', ', ': '),
+            default=_default,
+        ).encode
+
+    def _compile_field(self, field: serializers.Field):
+        if isinstance(field, serializers.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: choices.get(str(value), value)
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if output_format is None:
+                return lambda value: value
+            if output_format.lower() == ISO_8601:
+                return lambda value: value if isinstance(value, str) else value.isoformat()
+            return lambda value: value if isinstance(value, str) else value.strftime(output_format)
+        if isinstance(field, serializers.FloatField):
+            return _to_float
+        if isinstance(field, serializers.CharField):
+            return _to_str
+        if isinstance(field, serializers.DictField) and isinstance(field.child, _UnvalidatedField):
+            return _dict_keys_to_str
+        raise TypeError(f'Field {field.__class__.__name__} is not supported by {self.__class__.__name__}')
+
+    def encode(self, data: dict) -> bytes:
+        output = {}
+        for field_name, to_representation in self.fields:
+            value = data[field_name]
+            output[field_name] = None if value is None else to_representation(value)
+
+        ret = self._encode(output)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
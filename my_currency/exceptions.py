@@ -6,3 +6,12 @@ class NoProviderException(Exception):
 
 class CurrencyBeaconException(Exception):
     pass
+
+class QuotaExceededException(CurrencyBeaconException):
+    pass
+
+class ProviderUnavailableException(CurrencyBeaconException):
+    """
+    Errors which don't depend on the requested range (auth, server errors, connection): smaller ranges fail as well.
+    """
+    pass
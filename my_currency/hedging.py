@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import connections
+
+from my_currency import logger
+from my_currency.exceptions import CurrencyBeaconException
+
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """
+    Durations of the last LATENCY_WINDOW successful calls per provider.
+    """
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, provider_name: str, duration: float) -> None:
+        with self._lock:
+            self._latencies[provider_name].append(duration)
+
+    def percentile(self, provider_name: str, percentile: float, min_samples: int = 1) -> float | None:
+        with self._lock:
+            latencies = sorted(self._latencies[provider_name])
+        if len(latencies) < max(min_samples, 1):
+            return None
+        index = min(int(len(latencies) * percentile / 100), len(latencies) - 1)
+        return latencies[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+
+
+class HedgeBudget:
+    """
+    Caps extra load: every primary call earns `ratio` of a hedge, a hedge spends one. Unused budget is capped
+    at `max_tokens`, so a quiet period doesn't allow a burst of hedges.
+    """
+    def __init__(self, ratio: float, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0.0
+        self._lock = threading.Lock()
+
+    def on_call(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+latency_tracker = LatencyTracker()
+_budget = None
+_executor = None
+_slots = None
+_init_lock = threading.Lock()
+
+
+def _get_budget() -> HedgeBudget:
+    global _budget
+    with _init_lock:
+        if _budget is None:
+            _budget = HedgeBudget(settings.HEDGING['MAX_EXTRA_LOAD'])
+        return _budget
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.HEDGING['MAX_WORKERS'], thread_name_prefix='hedge')
+        return _executor
+
+
+def _get_slots() -> threading.BoundedSemaphore:
+    global _slots
+    with _init_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.HEDGING['MAX_WORKERS'])
+        return _slots
+
+
+def reset_hedging() -> None:
+    global _budget, _slots
+    latency_tracker.clear()
+    with _init_lock:
+        _budget = None
+        _slots = None
+
+
+def get_hedge_delay(provider_name: str) -> float:
+    """
+    Seconds to wait for `provider_name` before hedging: its HEDGING['PERCENTILE'] latency,
+    HEDGING['DEFAULT_DELAY'] until there are HEDGING['MIN_SAMPLES'] samples.
+    """
+    hedging = settings.HEDGING
+    delay = latency_tracker.percentile(provider_name, hedging['PERCENTILE'], hedging['MIN_SAMPLES'])
+    if delay is None:
+        return hedging['DEFAULT_DELAY']
+    return max(delay, hedging['MIN_DELAY'])
+
+
+def _run_in_worker(slots: threading.BoundedSemaphore, func, *args):
+    try:
+        return func(*args)
+    finally:
+        slots.release()
+        # Worker threads must not keep DB connections of their own open
+        connections.close_all()
+
+
+def _submit(call, provider: dict) -> Future | None:
+    """
+    Runs `call(provider)` in the pool, None when every worker is busy (e.g. with hung providers),
+    calls never queue behind them.
+    """
+    slots = _get_slots()
+    if not slots.acquire(blocking=False):
+        return None
+    return _get_executor().submit(copy_context().run, _run_in_worker, slots, call, provider)
+
+
+def hedged_call(primary, get_hedge, call):
+    """
+    Runs `call(primary)` and, if it doesn't finish within the hedge delay of the primary,
+    `call(hedge)` in parallel for the provider returned by `get_hedge()`. The first successful result wins,
+    the other call is cancelled if it hasn't started or ignored otherwise. Nothing is awaited longer than
+    HEDGING['TIMEOUT'] seconds. When every worker is busy, the primary is called on the caller's thread without a hedge.
+
+    `call` returns a falsy value or raises CurrencyBeaconException for a failed attempt. Returns `(provider, result)`,
+    `(None, None)` if every attempt failed.
+    """
+    budget = _get_budget()
+    budget.on_call()
+    deadline = time.monotonic() + settings.HEDGING['TIMEOUT']
+
+    primary_future = _submit(call, primary)
+    if primary_future is None:
+        logger.warning(f'Hedging workers are busy, calling {primary["client"].provider_name} without hedging')
+        try:
+            result = call(primary)
+        except CurrencyBeaconException as e:
+            logger.error(f'Error fetching rates from {primary["client"].provider_name}: {e}')
+            return None, None
+        return (primary, result) if result else (None, None)
+
+    futures = {primary_future: primary}
+    done, _ = wait(futures, timeout=get_hedge_delay(primary['client'].provider_name))
+    if not done and budget.try_spend():
+        hedge = get_hedge()
+        hedge_future = _submit(call, hedge) if hedge is not None else None
+        if hedge_future is not None:
+            logger.info(
+                f'{primary["client"].provider_name} is slow, hedging with {hedge["client"].provider_name}'
+            )
+            futures[hedge_future] = hedge
+
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            logger.error(f'No provider answered within {settings.HEDGING["TIMEOUT"]}s')
+            for future in pending:
+                future.cancel()
+            break
+        for future in done:
+            try:
+                result = future.result()
+            except CurrencyBeaconException as e:
+                logger.error(f'Error fetching rates from {futures[future]["client"].provider_name}: {e}')
+                continue
+            if result:
+                for other in pending:
+                    other.cancel()
+                return futures[future], result
+    return None, None
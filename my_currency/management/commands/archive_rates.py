@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from my_currency.archive import archive_rates
+
+
+class Command(BaseCommand):
+    help = 'Moves daily rates older than the horizon from the DB to compressed monthly archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=settings.RATE_ARCHIVE['HORIZON_DAYS'])
+
+    def handle(self, *args, **kwargs):
+        archived = archive_rates(kwargs['horizon_days'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} rates'))
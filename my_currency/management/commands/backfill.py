@@ -0,0 +1,39 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_currency.backfill import (create_backfill_job, resume_backfill_jobs,
+                                  run_backfill_job)
+from my_currency.models import BackfillJob, BackfillStatus
+
+
+class Command(BaseCommand):
+    help = 'Backfills historical rates with per-chunk checkpoints, --resume continues unfinished jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source-currency')
+        parser.add_argument('--date-from', type=datetime.date.fromisoformat)
+        parser.add_argument('--date-to', type=datetime.date.fromisoformat)
+        parser.add_argument('--resume', action='store_true', help='Continue unfinished chunks of existing jobs')
+        parser.add_argument('--job', type=int, help='Resume only this job')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['resume']:
+            jobs = resume_backfill_jobs(kwargs['job'])
+            if not jobs:
+                self.stdout.write('Nothing to resume')
+        else:
+            if not all(kwargs[name] for name in ('source_currency', 'date_from', 'date_to')):
+                raise CommandError('--source-currency, --date-from and --date-to are required to start a backfill')
+            job = create_backfill_job(kwargs['source_currency'], kwargs['date_from'], kwargs['date_to'])
+            jobs = [run_backfill_job(job)]
+
+        for job in jobs:
+            self._write_job(job)
+
+    def _write_job(self, job: BackfillJob) -> None:
+        style = self.style.SUCCESS if job.status == BackfillStatus.COMPLETED else self.style.ERROR
+        self.stdout.write(style(f'Job {job.id}: {job}'))
+        for chunk in job.chunks.order_by('-date_from'):
+            error = f', last error: {chunk.last_error}' if chunk.last_error else ''
+            self.stdout.write(f'  {chunk}, attempts: {chunk.attempts}{error}')
@@ -0,0 +1,106 @@
+import datetime
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from my_currency.constants import Currencies
+from my_currency.coverage import record_coverage
+from my_currency.models import Currency, CurrencyExchangeRate, Provider
+from my_currency.resolved_rates import refresh_resolved_rates
+from my_currency.synthetic import cross_rates, generate_usd_rates
+
+INSERT_FIELDS = ('provider', 'source_currency', 'exchanged_currency', 'valuation_date', 'rate_value',
+                 'created_at', 'updated_at')
+
+
+class Command(BaseCommand):
+    help = 'Fills CurrencyExchangeRate with seeded random-walk rates for load and scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=float, default=1)
+        parser.add_argument('--date-to', type=datetime.date.fromisoformat, default=None)
+        parser.add_argument('--currencies', default=','.join(Currencies.values()))
+        parser.add_argument('--providers', default=None, help='Comma separated provider names, all by default')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--volatility', type=float, default=0.005, help='Daily volatility of log rates')
+        parser.add_argument('--batch-size', type=int, default=20000)
+
+    def handle(self, *args, **kwargs):
+        date_to = kwargs['date_to'] or timezone.now().date()
+        num_days = max(int(kwargs['years'] * 365), 1)
+        days = [date_to - datetime.timedelta(days=num_days - 1 - day) for day in range(num_days)]
+
+        currencies = dict(
+            Currency.objects.filter(code__in=kwargs['currencies'].split(',')).values_list('code', 'id')
+        )
+        providers = Provider.objects.order_by('priority')
+        if kwargs['providers']:
+            providers = providers.filter(name__in=kwargs['providers'].split(','))
+        providers = list(providers.values_list('name', 'id'))
+        if not currencies or not providers:
+            raise CommandError('No currencies or providers found, run fill_init_data first')
+
+        codes = sorted(currencies)
+        currency_ids = np.array([currencies[code] for code in codes])
+        rows_per_day = len(codes) ** 2
+        days_per_batch = max(kwargs['batch_size'] // rows_per_day, 1)
+        rng = np.random.default_rng(kwargs['seed'])
+
+        started = time.perf_counter()
+        num_rows = 0
+        for provider_name, provider_id in providers:
+            # Every provider gets its own walk, close to the others thanks to the same starting levels
+            rates = np.round(cross_rates(generate_usd_rates(num_days, codes, rng, kwargs['volatility'])), 6)
+            for batch_start in range(0, num_days, days_per_batch):
+                batch_days = days[batch_start:batch_start + days_per_batch]
+                batch_rates = rates[batch_start:batch_start + days_per_batch]
+                num_rows += self._insert_batch(provider_id, currency_ids, batch_days, batch_rates)
+            if set(Currencies.values()) <= set(codes):
+                for code in codes:
+                    record_coverage(provider_id, code, days[0], days[-1], days)
+            self.stdout.write(f'{provider_name}: {num_days} days x {len(codes)} x {len(codes)} currencies generated')
+
+        for code in codes:
+            refresh_resolved_rates(currencies[code], days[0], days[-1])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{num_rows} rows generated in {elapsed:.1f}s ({num_rows / elapsed:.0f} rows/s)'
+        ))
+
+    def _insert_batch(
+            self, provider_id: int, currency_ids: np.ndarray, days: list[datetime.date], rates: np.ndarray
+            ) -> int:
+        num_currencies = len(currency_ids)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        valuation_dates = [connection.ops.adapt_datefield_value(day) for day in days]
+
+        num_rows = rates.size
+        rows = zip(
+            [provider_id] * num_rows,
+            np.tile(np.repeat(currency_ids, num_currencies), len(days)).tolist(),
+            np.tile(currency_ids, num_currencies * len(days)).tolist(),
+            np.repeat(np.array(valuation_dates, dtype=object), num_currencies ** 2).tolist(),
+            rates.ravel().tolist(),
+            [now] * num_rows,
+            [now] * num_rows,
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(self._get_insert_sql(), list(rows))
+        return num_rows
+
+    def _get_insert_sql(self) -> str:
+        opts = CurrencyExchangeRate._meta
+        fields = [opts.get_field(field_name) for field_name in INSERT_FIELDS]
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        # Reruns skip rows which already exist
+        return (
+            f'{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} '
+            f'{connection.ops.quote_name(opts.db_table)} ({columns}) VALUES ({placeholders}) '
+            f'{connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None)}'
+        )
@@ -0,0 +1,95 @@
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_currency.constants import Currencies
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import Provider
+from my_currency.rate_files import (iter_csv_entries, iter_json_entries,
+                                    parse_csv_entries, parse_json_entries)
+
+READERS = {
+    'json': (iter_json_entries, parse_json_entries),
+    'csv': (iter_csv_entries, parse_csv_entries),
+}
+MAX_REPORTED_ERRORS = 10
+
+
+class Command(BaseCommand):
+    help = 'Imports rate dumps (CSV or JSON in the Currency Beacon timeseries shape) into CurrencyExchangeRate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument('--source-currency', required=True, choices=Currencies.values())
+        parser.add_argument('--provider', default=Provider.ProviderNames.CURRENCY_BEACON.value)
+        parser.add_argument('--format', choices=READERS, help='Taken from the file extension by default')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parsing processes, 0 parses inline')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Days per parsing task and per DB write')
+
+    def handle(self, *args, **kwargs):
+        try:
+            self.provider = Provider.objects.get(name=kwargs['provider'])
+        except Provider.DoesNotExist:
+            raise CommandError(f'Provider {kwargs["provider"]} does not exist')
+        self.controller = CurrencyExchangeController()
+        self.source_currency = kwargs['source_currency']
+        self.batch_size = kwargs['batch_size']
+
+        executor = ProcessPoolExecutor(kwargs['workers']) if kwargs['workers'] > 0 else None
+        try:
+            for path in kwargs['paths']:
+                file_format = kwargs['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+                if file_format not in READERS:
+                    raise CommandError(f'Unknown format of {path}, use --format')
+                self._import_file(path, *READERS[file_format], executor, max(kwargs['workers'], 1))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _import_file(self, path: str, read, parse, executor: ProcessPoolExecutor | None, workers: int) -> None:
+        started = time.perf_counter()
+        num_days = num_rows = 0
+        errors = []
+        batches = self._batched(read(path))
+
+        if executor is None:
+            results = (parse(batch) for batch in batches)
+        else:
+            results = self._parse_in_pool(executor, parse, batches, max_pending=workers * 2)
+
+        # Single writer: parsed batches are upserted one by one, reruns update the same rows
+        for rates, batch_errors in results:
+            errors.extend(batch_errors)
+            if rates:
+                self.controller.save_rates_to_db(rates, self.source_currency, self.provider.id)
+                num_days += len(rates)
+                num_rows += len(rates) * len(Currencies.values())
+
+        elapsed = time.perf_counter() - started
+        for error in errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f'Invalid rates {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{path}: {num_days} days, {num_rows} rows in {elapsed:.1f}s '
+            f'({num_rows / max(elapsed, 1e-9):.0f} rows/s), {len(errors)} invalid days'
+        ))
+
+    def _batched(self, entries):
+        iterator = iter(entries)
+        while batch := list(itertools.islice(iterator, self.batch_size)):
+            yield batch
+
+    def _parse_in_pool(self, executor: ProcessPoolExecutor, parse, batches, max_pending: int):
+        """
+        Keeps at most `max_pending` batches in flight, so the file is never fully in memory. Results keep file order.
+        """
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(parse, batch))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
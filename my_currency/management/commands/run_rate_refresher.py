@@ -0,0 +1,30 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from my_currency.refresher import RateRefresher
+
+
+class Command(BaseCommand):
+    help = 'Periodically prefetches latest and daily rates, only one replica refreshes at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=settings.RATE_REFRESHER['INTERVAL'])
+        parser.add_argument('--jitter', type=int, default=settings.RATE_REFRESHER['JITTER'])
+        parser.add_argument('--lock-ttl', type=int, default=settings.RATE_REFRESHER['LOCK_TTL'])
+        parser.add_argument('--once', action='store_true', help='Run a single refresh cycle and exit')
+
+    def handle(self, *args, **kwargs):
+        refresher = RateRefresher(
+            interval=kwargs['interval'],
+            jitter=kwargs['jitter'],
+            lock_ttl=kwargs['lock_ttl'],
+        )
+        if kwargs['once']:
+            refresher.run_once()
+            return
+
+        signal.signal(signal.SIGTERM, refresher.stop)
+        signal.signal(signal.SIGINT, refresher.stop)
+        refresher.run_forever()
@@ -0,0 +1,89 @@
+import cProfile
+import hmac
+import random
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from my_currency import logger
+from my_currency.profiling import RequestProfile, write_profile
+from my_currency.routers import has_written, pin_to_primary, reset_pinning
+
+PIN_COOKIE_NAME = 'pin_primary_db'
+PROFILE_HEADER = 'HTTP_X_PROFILE_TOKEN'
+PROFILE_QUERY_PARAM = 'profile'
+
+
+class ReplicaPinningMiddleware:
+    """
+    Resets DB pinning per request. Clients who wrote something are pinned to primary for
+    REPLICA_PIN_SECONDS with a cookie, so their next reads don't hit a lagging replica.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_pinning()
+        if request.COOKIES.get(PIN_COOKIE_NAME):
+            pin_to_primary()
+
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(PIN_COOKIE_NAME, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True)
+            return response
+        finally:
+            reset_pinning()
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles requests carrying REQUEST_PROFILING['TOKEN'] in the `X-Profile-Token` header or the `profile`
+    query param, sampled at REQUEST_PROFILING['SAMPLE_RATE']. cProfile stats with SQL and provider timings
+    are written to REQUEST_PROFILING['DIR'] and summarised in the `Server-Timing` header.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._is_profiled(request):
+            return self.get_response(request)
+
+        request_profile = RequestProfile()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Only one cProfile can run at a time, concurrent profiled requests get timings only
+            profiler = None
+
+        started = time.perf_counter()
+        try:
+            with request_profile.activate():
+                response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        total = time.perf_counter() - started
+
+        response['Server-Timing'] = request_profile.server_timing(total)
+        summary = {'method': request.method, 'path': request.get_full_path(), **request_profile.summary(total)}
+        name = f'{timezone.now():%Y%m%dT%H%M%S%f}-{request.method}-{re.sub(r"[^A-Za-z0-9]+", "_", request.path)}'
+        profiling_settings = settings.REQUEST_PROFILING
+        try:
+            write_profile(Path(profiling_settings['DIR']), name, profiler, summary, profiling_settings['MAX_FILES'])
+        except OSError as e:
+            logger.warning(f'Could not write request profile {name}: {e}')
+        return response
+
+    def _is_profiled(self, request) -> bool:
+        expected_token = settings.REQUEST_PROFILING['TOKEN']
+        if not expected_token:
+            return False
+        token = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+        if not token or not hmac.compare_digest(token, expected_token):
+            return False
+        return random.random() < settings.REQUEST_PROFILING['SAMPLE_RATE']
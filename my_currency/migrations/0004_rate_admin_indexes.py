@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-19 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0003_provider_limits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='currencyexchangerate',
+            name='valuation_date',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='currencyexchangerate',
+            index=models.Index(fields=['valuation_date', 'id'], name='rate_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='currencyexchangerate',
+            index=models.Index(fields=['source_currency', 'valuation_date'], name='rate_source_date_idx'),
+        ),
+    ]
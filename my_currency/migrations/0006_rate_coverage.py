@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 13:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0005_backfill_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_from', models.DateField()),
+                ('date_to', models.DateField()),
+                ('is_empty', models.BooleanField(default=False)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coverage', to='my_currency.provider')),
+                ('source_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coverage', to='my_currency.currency')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_currency', 'date_from'], name='coverage_source_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0006_rate_coverage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResolvedExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valuation_date', models.DateField()),
+                ('rate_value', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('exchanged_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='my_currency.currency')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resolved_rates', to='my_currency.provider')),
+                ('source_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resolved_rates', to='my_currency.currency')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_currency', 'valuation_date', 'exchanged_currency'), name='unique_resolved_rate')],
+            },
+        ),
+        migrations.RunSQL(
+            '''
+            INSERT INTO my_currency_resolvedexchangerate
+                (source_currency_id, exchanged_currency_id, valuation_date, provider_id, rate_value)
+            SELECT source_currency_id, exchanged_currency_id, valuation_date, provider_id, rate_value FROM (
+                SELECT rate.*, ROW_NUMBER() OVER (
+                    PARTITION BY source_currency_id, exchanged_currency_id, valuation_date ORDER BY provider.priority
+                ) AS precedence
+                FROM my_currency_currencyexchangerate rate
+                JOIN my_currency_provider provider ON provider.id = rate.provider_id
+            ) ranked
+            WHERE precedence = 1
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 14:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0007_resolved_exchange_rates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1m', 'Minute'), ('1h', 'Hour'), ('1d', 'Day')], max_length=2)),
+                ('bucket_start', models.DateTimeField()),
+                ('rate_value', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('rate_min', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('rate_max', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('samples', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exchanged_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='my_currency.currency')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='my_currency.provider')),
+                ('source_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='my_currency.currency')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_currency', 'resolution', 'bucket_start', 'exchanged_currency', 'provider'), name='unique_rate_snapshot')],
+            },
+        ),
+    ]
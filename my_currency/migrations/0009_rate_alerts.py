@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0008_rate_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscriber', models.CharField(max_length=100)),
+                ('condition', models.CharField(choices=[('above', 'Rate rises above threshold'), ('below', 'Rate falls below threshold'), ('daily_change', 'Rate moves more than threshold % from the previous day')], max_length=20)),
+                ('threshold', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exchanged_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='my_currency.currency')),
+                ('source_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_subscriptions', to='my_currency.currency')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlertOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valuation_date', models.DateField()),
+                ('crossing', models.CharField(choices=[('up', 'Upwards'), ('down', 'Downwards')], max_length=4)),
+                ('rate_value', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('reference_value', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='my_currency.alertsubscription')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['delivered_at', 'id'], name='alert_outbox_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('subscription', 'valuation_date', 'crossing'), name='unique_alert_crossing')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+import my_currency.providers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_currency', '0009_rate_alerts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='provider',
+            name='name',
+            field=models.CharField(max_length=20, unique=True, validators=[my_currency.providers.validate_provider_name]),
+        ),
+    ]
@@ -1,15 +1,22 @@
 from django.db import models
 
+from my_currency.providers import validate_provider_name
+
 
 class Provider(models.Model):
+    # Built-in providers, others are declared in settings.CURRENCY_PROVIDERS or by entry points
     class ProviderNames(models.TextChoices):
         CURRENCY_BEACON = 'currency_beacon', 'Currency Beacon'
         MOCK = 'mock', 'Mock'
 
-    name = models.CharField(choices=ProviderNames.choices, max_length=20, unique=True)
+    name = models.CharField(max_length=20, unique=True, validators=[validate_provider_name])
     description = models.TextField(null=True, blank=True, max_length=200)
     priority = models.PositiveIntegerField(unique=True)
     is_active = models.BooleanField(default=True)
+    # Provider limits, empty values fall back to settings.PROVIDER_LIMITS
+    max_range_days = models.PositiveIntegerField(null=True, blank=True)
+    requests_per_minute = models.PositiveIntegerField(null=True, blank=True)
+    requests_per_month = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -32,10 +39,14 @@ class CurrencyExchangeRate(models.Model):
                 name='unique_main'
             )
         ]
+        indexes = [
+            models.Index(fields=['valuation_date', 'id'], name='rate_date_id_idx'),
+            models.Index(fields=['source_currency', 'valuation_date'], name='rate_source_date_idx'),
+        ]
     provider = models.ForeignKey(Provider, related_name='exchanges', on_delete=models.CASCADE)
     source_currency = models.ForeignKey(Currency, related_name='exchanges', on_delete=models.CASCADE)
     exchanged_currency = models.ForeignKey(Currency, on_delete=models.CASCADE)
-    valuation_date = models.DateField(db_index=True)
+    valuation_date = models.DateField()
     rate_value = models.DecimalField(db_index=True, decimal_places=6, max_digits=18)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -43,6 +54,63 @@ class CurrencyExchangeRate(models.Model):
     def __str__(self):
         return f'{self.source_currency} to {self.exchanged_currency} on {self.valuation_date}'
     
+class ResolvedExchangeRate(models.Model):
+    """
+    One rate per (source, target, day): the one of the provider with the highest priority (lowest `priority`).
+    Refreshed from CurrencyExchangeRate on ingest and rebuilt when provider priorities change.
+    """
+    class Meta:
+        constraints = [
+            # Leading columns serve the range reads of a source currency
+            models.UniqueConstraint(
+                fields=['source_currency', 'valuation_date', 'exchanged_currency'], name='unique_resolved_rate'
+            )
+        ]
+
+    source_currency = models.ForeignKey(Currency, related_name='resolved_rates', on_delete=models.CASCADE)
+    exchanged_currency = models.ForeignKey(Currency, related_name='+', on_delete=models.CASCADE)
+    valuation_date = models.DateField()
+    provider = models.ForeignKey(Provider, related_name='resolved_rates', on_delete=models.CASCADE)
+    rate_value = models.DecimalField(decimal_places=6, max_digits=18)
+
+    def __str__(self):
+        return f'{self.source_currency} to {self.exchanged_currency} on {self.valuation_date} ({self.provider})'
+
+
+class SnapshotResolution(models.TextChoices):
+    MINUTE = '1m', 'Minute'
+    HOUR = '1h', 'Hour'
+    DAY = '1d', 'Day'
+
+
+class RateSnapshot(models.Model):
+    """
+    Intraday latest rates bucketed by time. `rate_value` is the last rate seen in the bucket.
+    Minute buckets are rolled up into hours and hours into days, finer buckets are deleted after their retention.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_currency', 'resolution', 'bucket_start', 'exchanged_currency', 'provider'],
+                name='unique_rate_snapshot'
+            )
+        ]
+
+    provider = models.ForeignKey(Provider, related_name='snapshots', on_delete=models.CASCADE)
+    source_currency = models.ForeignKey(Currency, related_name='snapshots', on_delete=models.CASCADE)
+    exchanged_currency = models.ForeignKey(Currency, related_name='+', on_delete=models.CASCADE)
+    resolution = models.CharField(choices=SnapshotResolution.choices, max_length=2)
+    bucket_start = models.DateTimeField()
+    rate_value = models.DecimalField(decimal_places=6, max_digits=18)
+    rate_min = models.DecimalField(decimal_places=6, max_digits=18)
+    rate_max = models.DecimalField(decimal_places=6, max_digits=18)
+    samples = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source_currency} to {self.exchanged_currency} at {self.bucket_start} ({self.resolution})'
+
+
 class ExchangeCurrency(models.Model):
     provider = models.ForeignKey(Provider, related_name='exchange_currencies', on_delete=models.CASCADE)
     source_currency = models.ForeignKey(Currency, related_name='exchange_currencies', on_delete=models.CASCADE)
@@ -55,3 +123,153 @@ class ExchangeCurrency(models.Model):
 
     def __str__(self):
         return f'{self.source_amount} {self.source_currency} to {self.exchanged_currency} '
+
+
+class RateCoverage(models.Model):
+    """
+    Date ranges already fetched from a provider for a source currency. Empty ranges (provider had no rates)
+    expire, so they are retried later, but they don't cause a provider call on every request.
+    """
+    class Meta:
+        indexes = [
+            models.Index(fields=['source_currency', 'date_from'], name='coverage_source_date_idx'),
+        ]
+
+    provider = models.ForeignKey(Provider, related_name='coverage', on_delete=models.CASCADE)
+    source_currency = models.ForeignKey(Currency, related_name='coverage', on_delete=models.CASCADE)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    is_empty = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        empty = ' (empty)' if self.is_empty else ''
+        return f'{self.provider} {self.source_currency} {self.date_from} → {self.date_to}{empty}'
+
+
+class AlertCondition(models.TextChoices):
+    ABOVE = 'above', 'Rate rises above threshold'
+    BELOW = 'below', 'Rate falls below threshold'
+    DAILY_CHANGE = 'daily_change', 'Rate moves more than threshold % from the previous day'
+
+
+class AlertCrossing(models.TextChoices):
+    UP = 'up', 'Upwards'
+    DOWN = 'down', 'Downwards'
+
+
+class AlertSubscription(models.Model):
+    """
+    Alert on a currency pair. Fires when a new rate crosses the threshold, not on every rate beyond it.
+    """
+    subscriber = models.CharField(max_length=100)
+    source_currency = models.ForeignKey(Currency, related_name='alert_subscriptions', on_delete=models.CASCADE)
+    exchanged_currency = models.ForeignKey(Currency, related_name='+', on_delete=models.CASCADE)
+    condition = models.CharField(choices=AlertCondition.choices, max_length=20)
+    threshold = models.DecimalField(decimal_places=6, max_digits=18)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.subscriber}: {self.source_currency}/{self.exchanged_currency} {self.condition} {self.threshold}'
+
+
+class AlertOutbox(models.Model):
+    """
+    Triggered alerts waiting for delivery, written in batches and delivered in batches.
+    One alert per subscription, day and direction: processes seeing the same crossing don't alert twice.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['subscription', 'valuation_date', 'crossing'], name='unique_alert_crossing'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['delivered_at', 'id'], name='alert_outbox_pending_idx'),
+        ]
+
+    subscription = models.ForeignKey(AlertSubscription, related_name='alerts', on_delete=models.CASCADE)
+    valuation_date = models.DateField()
+    crossing = models.CharField(choices=AlertCrossing.choices, max_length=4)
+    rate_value = models.DecimalField(decimal_places=6, max_digits=18)
+    # Previous rate the threshold was crossed from, or the previous day's rate for daily changes
+    reference_value = models.DecimalField(decimal_places=6, max_digits=18)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.subscription} at {self.rate_value} on {self.valuation_date}'
+
+
+class SchedulerLock(models.Model):
+    """
+    Lease-based lock for leader election between replicas of long-running commands.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    owner = models.CharField(max_length=100, blank=True)
+    expires_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name} held by {self.owner} until {self.expires_at}'
+
+
+class QuotaBucket(models.Model):
+    """
+    Token bucket state of a provider, shared by all threads and processes through the DB.
+    Updated with compare-and-swap on `version`.
+    """
+    name = models.CharField(max_length=20, unique=True)
+    tokens = models.FloatField(default=0)
+    refilled_at = models.DateTimeField()
+    month_start = models.DateField()
+    month_requests = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.tokens:.2f} tokens, {self.month_requests} requests this month'
+
+
+class BackfillStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    RUNNING = 'running', 'Running'
+    COMPLETED = 'completed', 'Completed'
+    FAILED = 'failed', 'Failed'
+
+
+class BackfillJob(models.Model):
+    """
+    Historical backfill of one source currency, progress is checkpointed per chunk.
+    """
+    provider = models.ForeignKey(Provider, related_name='backfill_jobs', on_delete=models.CASCADE)
+    source_currency = models.ForeignKey(Currency, related_name='backfill_jobs', on_delete=models.CASCADE)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    status = models.CharField(choices=BackfillStatus.choices, max_length=10, default=BackfillStatus.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Backfill {self.source_currency} {self.date_from} → {self.date_to}: {self.status}'
+
+
+class BackfillChunk(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'date_from'], name='unique_backfill_chunk'),
+        ]
+
+    job = models.ForeignKey(BackfillJob, related_name='chunks', on_delete=models.CASCADE)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    status = models.CharField(choices=BackfillStatus.choices, max_length=10, default=BackfillStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.date_from} → {self.date_to}: {self.status}'
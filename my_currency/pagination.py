@@ -0,0 +1,29 @@
+import base64
+import binascii
+import datetime
+
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on primary key for CRUD endpoints, page size is REST_FRAMEWORK['PAGE_SIZE'].
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+def encode_rates_cursor(valuation_date: str, currency_code: str) -> str:
+    """
+    Opaque cursor of the last returned (valuation_date, exchanged_currency) position.
+    """
+    return base64.urlsafe_b64encode(f'{valuation_date},{currency_code}'.encode()).decode()
+
+
+def decode_rates_cursor(cursor: str) -> tuple[datetime.date, str]:
+    try:
+        valuation_date, currency_code = base64.urlsafe_b64decode(cursor.encode()).decode().split(',')
+        return datetime.date.fromisoformat(valuation_date), currency_code
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
@@ -0,0 +1,84 @@
+import datetime
+
+from django.db.models import Count
+
+from my_currency.archive import get_rate_archive
+from my_currency.constants import Currencies
+from my_currency.coverage import get_covered_days
+from my_currency.models import CurrencyExchangeRate
+from my_currency.quota import get_provider_limits
+
+
+def split_date_range(
+        date_from: datetime.date, date_to: datetime.date, max_days: int | None
+        ) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Splits an inclusive date range into inclusive windows of at most `max_days`, most recent first.
+    """
+    if not max_days:
+        return [(date_from, date_to)]
+
+    windows = []
+    window_end = date_to
+    while window_end >= date_from:
+        window_start = max(window_end - datetime.timedelta(days=max_days - 1), date_from)
+        windows.append((window_start, window_end))
+        window_end = window_start - datetime.timedelta(days=1)
+    return windows
+
+
+def get_stored_days(
+        provider_name: str, source_currency: str, date_from: datetime.date, date_to: datetime.date
+        ) -> set[datetime.date]:
+    """
+    Days which already have rates for all currencies from the provider (in the DB or archived), or were fetched
+    from it according to the coverage ledger.
+    """
+    archived_days = get_rate_archive().get_provider_days(
+        provider_name, source_currency, date_from, date_to, len(Currencies.values())
+    )
+    return get_covered_days(provider_name, source_currency, date_from, date_to) | archived_days | set(
+        CurrencyExchangeRate.objects.filter(
+            provider__name=provider_name,
+            source_currency__code=source_currency,
+            valuation_date__range=[date_from, date_to],
+        ).values('valuation_date').annotate(
+            num_rates=Count('id')
+        ).filter(
+            num_rates__gte=len(Currencies.values())
+        ).values_list('valuation_date', flat=True)
+    )
+
+
+def get_missing_ranges(
+        date_from: datetime.date, date_to: datetime.date, stored_days: set[datetime.date]
+        ) -> list[tuple[datetime.date, datetime.date]]:
+    ranges = []
+    range_start = None
+    day = date_from
+    while day <= date_to:
+        if day in stored_days:
+            if range_start is not None:
+                ranges.append((range_start, day - datetime.timedelta(days=1)))
+                range_start = None
+        elif range_start is None:
+            range_start = day
+        day += datetime.timedelta(days=1)
+    if range_start is not None:
+        ranges.append((range_start, date_to))
+    return ranges
+
+
+def plan_chunks(
+        provider_name: str, source_currency: str, date_from: datetime.date, date_to: datetime.date
+        ) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Plans provider requests for a backfill: skips days already stored, cuts the rest into windows
+    of the provider's `max_range_days` and orders them most recent first.
+    """
+    max_range_days = get_provider_limits(provider_name)['max_range_days']
+    stored_days = get_stored_days(provider_name, source_currency, date_from, date_to)
+    chunks = []
+    for range_start, range_end in get_missing_ranges(date_from, date_to, stored_days):
+        chunks.extend(split_date_range(range_start, range_end, max_range_days))
+    return sorted(chunks, reverse=True)
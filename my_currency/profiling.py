@@ -0,0 +1,101 @@
+import json
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.db import connections
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Collects SQL and provider call timings of one profiled request.
+    """
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.provider_calls = []
+
+    def _execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - started
+
+    @contextmanager
+    def activate(self):
+        token = _current_profile.set(self)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._execute_wrapper))
+                yield self
+        finally:
+            _current_profile.reset(token)
+
+    @property
+    def provider_time(self) -> float:
+        return sum(call['duration'] for call in self.provider_calls)
+
+    def server_timing(self, total: float) -> str:
+        """
+        `Server-Timing` header value, durations in milliseconds.
+        """
+        metrics = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries"',
+            f'provider;dur={self.provider_time * 1000:.1f};desc="{len(self.provider_calls)} calls"',
+        ]
+        return ', '.join(metrics)
+
+    def summary(self, total: float) -> dict:
+        return {
+            'total': total,
+            'sql_count': self.sql_count,
+            'sql_time': self.sql_time,
+            'provider_time': self.provider_time,
+            'provider_calls': self.provider_calls,
+        }
+
+
+@contextmanager
+def provider_timer(provider_name: str, operation: str):
+    """
+    Records the duration of a provider call into the current request profile, if there is one.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        profile.provider_calls.append({
+            'provider': provider_name,
+            'operation': operation,
+            'duration': time.perf_counter() - started,
+            'failed': failed,
+        })
+
+
+def write_profile(directory: Path, name: str, stats, summary: dict, max_files: int) -> None:
+    """
+    Writes cProfile stats and the summary next to each other, keeping the newest `max_files` profiles.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    if stats is not None:
+        stats.dump_stats(directory / f'{name}.prof')
+    (directory / f'{name}.json').write_text(json.dumps(summary, indent=2))
+
+    summaries = sorted(directory.glob('*.json'), key=lambda path: (path.stat().st_mtime, path.name), reverse=True)
+    for path in summaries[max_files:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.prof').unlink(missing_ok=True)
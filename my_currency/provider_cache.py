@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from my_currency import logger
+
+# Query params which don't change the answer and must not end up on disk
+IGNORED_PARAMS = ('api_key',)
+
+
+class ResponseCache:
+    """
+    Provider response bodies stored as files keyed by URL and params. Reads refresh the file mtime,
+    writes evict the least recently used files above `max_bytes`.
+    """
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, url: str, params: dict) -> Path:
+        key_params = {key: str(value) for key, value in params.items() if key not in IGNORED_PARAMS}
+        key = json.dumps({'url': url, 'params': key_params}, sort_keys=True)
+        return self.directory / f'{hashlib.sha256(key.encode()).hexdigest()}.json'
+
+    def get(self, url: str, params: dict) -> dict | None:
+        """
+        Recorded JSON body, None on a miss. Unreadable files count as a miss and are removed.
+        """
+        path = self._path(url, params)
+        try:
+            body = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f'Removing unreadable provider response {path}: {e!r}')
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            # Not `touch()`, which would recreate a file evicted since the read as an empty one
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return body
+
+    def set(self, url: str, params: dict, body: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file first, concurrent readers never see half of a response
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, suffix='.tmp', delete=False) as f:
+            f.write(json.dumps(body))
+        os.replace(f.name, self._path(url, params))
+        self._evict()
+
+    def _evict(self) -> None:
+        files = []
+        total_size = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        for _, size, path in sorted(files):
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total_size -= size
+            logger.info(f'Evicted provider response {path}')
+
+
+def get_response_cache() -> ResponseCache | None:
+    """
+    Cache configured in settings.PROVIDER_RESPONSE_CACHE, None when MODE is `off`.
+    """
+    cache_settings = settings.PROVIDER_RESPONSE_CACHE
+    if cache_settings['MODE'] == 'off':
+        return None
+    return ResponseCache(cache_settings['DIR'], cache_settings['MAX_BYTES'])
+
+
+def is_replay_only() -> bool:
+    return settings.PROVIDER_RESPONSE_CACHE['MODE'] == 'replay'
@@ -0,0 +1,70 @@
+import threading
+from importlib.metadata import entry_points
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+
+from my_currency import logger
+
+ENTRY_POINT_GROUP = 'my_currency.providers'
+
+
+class ProviderRegistry:
+    """
+    Provider clients by `Provider.name`, declared in settings.CURRENCY_PROVIDERS (dotted paths) or by installed packages
+    as `my_currency.providers` entry points. Settings take precedence. A client class is imported and instantiated
+    on first use, once per process.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaders = None
+        self._clients = {}
+
+    def _get_loaders(self) -> dict:
+        if self._loaders is None:
+            loaders = {entry_point.name: entry_point.load for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+            for name, client_path in settings.CURRENCY_PROVIDERS.items():
+                loaders[name] = lambda client_path=client_path: import_string(client_path)
+            self._loaders = loaders
+        return self._loaders
+
+    def names(self) -> list[str]:
+        return list(self._get_loaders())
+
+    def get_client(self, name: str):
+        """
+        Client of the provider `name`, None when no client is declared for it.
+        """
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            if name not in self._clients:
+                loader = self._get_loaders().get(name)
+                if loader is None:
+                    logger.error(f'No client declared for provider {name}')
+                    return None
+                self._clients[name] = loader()()
+                logger.info(f'Provider client {name} loaded')
+            return self._clients[name]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._loaders = None
+            self._clients = {}
+
+
+registry = ProviderRegistry()
+
+
+def get_provider_client(name: str):
+    return registry.get_client(name)
+
+
+def validate_provider_name(name: str) -> None:
+    """
+    Provider rows are only useful for providers with a declared client.
+    """
+    if name not in registry.names():
+        raise ValidationError(f'No client is declared for provider {name}, add it to CURRENCY_PROVIDERS')
@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from my_currency import logger
+from my_currency.exceptions import QuotaExceededException
+from my_currency.models import Provider, QuotaBucket
+
+LIMIT_FIELDS = ('max_range_days', 'requests_per_minute', 'requests_per_month')
+LIMITS_CACHE_TTL = 60
+
+_limits_cache = {}
+
+
+def get_provider_limits(provider_name: str) -> dict:
+    """
+    Limits declared on the Provider row, falling back to settings.PROVIDER_LIMITS. Cached for LIMITS_CACHE_TTL seconds.
+    """
+    cached = _limits_cache.get(provider_name)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    limits = dict.fromkeys(LIMIT_FIELDS)
+    limits.update(settings.PROVIDER_LIMITS.get(provider_name, {}))
+    provider_limits = Provider.objects.filter(name=provider_name).values(*LIMIT_FIELDS).first() or {}
+    limits.update({field: value for field, value in provider_limits.items() if value is not None})
+
+    _limits_cache[provider_name] = (time.monotonic() + LIMITS_CACHE_TTL, limits)
+    return limits
+
+
+def clear_provider_limits_cache() -> None:
+    _limits_cache.clear()
+
+
+class ProviderQuota:
+    """
+    Token bucket refilled at `requests_per_minute` with a monthly cap of `requests_per_month`.
+    """
+    def __init__(self, provider_name: str):
+        self.provider_name = provider_name
+
+    def acquire(self, max_wait: float | None = None) -> None:
+        max_wait = settings.PROVIDER_QUOTA_MAX_WAIT if max_wait is None else max_wait
+        limits = get_provider_limits(self.provider_name)
+        if not limits['requests_per_minute'] and not limits['requests_per_month']:
+            return
+
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._try_acquire(limits)
+            if wait == 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise QuotaExceededException(f'Rate limit of {self.provider_name} reached')
+            logger.info(f'Rate limit of {self.provider_name} reached, waiting {wait:.2f}s')
+            time.sleep(wait)
+
+    def _try_acquire(self, limits: dict) -> float:
+        """
+        Takes a token if available. Returns 0 on success, otherwise seconds to wait before retrying.
+        """
+        now = timezone.now()
+        month_start = now.date().replace(day=1)
+        per_minute = limits['requests_per_minute']
+        bucket, _ = QuotaBucket.objects.get_or_create(
+            name=self.provider_name,
+            defaults={'tokens': per_minute or 0, 'refilled_at': now, 'month_start': month_start},
+        )
+
+        month_requests = bucket.month_requests if bucket.month_start == month_start else 0
+        if limits['requests_per_month'] and month_requests >= limits['requests_per_month']:
+            raise QuotaExceededException(f'Monthly quota of {self.provider_name} is exhausted')
+
+        tokens = bucket.tokens
+        if per_minute:
+            refill_rate = per_minute / 60
+            elapsed = max((now - bucket.refilled_at).total_seconds(), 0)
+            tokens = min(per_minute, tokens + elapsed * refill_rate)
+            if tokens < 1:
+                return (1 - tokens) / refill_rate
+            tokens -= 1
+
+        updated = QuotaBucket.objects.filter(name=self.provider_name, version=bucket.version).update(
+            tokens=tokens,
+            refilled_at=now,
+            month_start=month_start,
+            month_requests=month_requests + 1,
+            version=F('version') + 1,
+        )
+        # Another thread or process changed the bucket in between, retry shortly
+        return 0 if updated else 0.01
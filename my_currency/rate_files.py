@@ -0,0 +1,72 @@
+"""
+Streaming readers of rate dumps in the `TimeseriesResponse` shape. Parsing functions don't touch Django,
+so they can run in worker processes.
+"""
+import csv
+import re
+from collections.abc import Iterator
+
+from pydantic import ValidationError
+
+from my_currency.schemas import Rates
+
+READ_SIZE = 1024 * 1024
+# One day of the `response` object: "2023-10-01": {"CHF": 0.91, ...}
+DAY_ENTRY_RE = re.compile(r'"(\d{4}-\d{2}-\d{2})"\s*:\s*(\{[^{}]*\})')
+# Longest tail of the buffer kept while no day entry is found in it
+MAX_TAIL_SIZE = 64 * 1024
+
+
+def iter_json_entries(path: str, read_size: int = READ_SIZE) -> Iterator[tuple[str, str]]:
+    """
+    Yields `(day, rates_json)` from a JSON timeseries dump, reading it in `read_size` blocks.
+    Currency Beacon repeats the days of `response` at the top level, every day is yielded once.
+    """
+    buffer = ''
+    seen_days = set()
+    with open(path) as f:
+        while block := f.read(read_size):
+            buffer += block
+            end = 0
+            for match in DAY_ENTRY_RE.finditer(buffer):
+                end = match.end()
+                day = match.group(1)
+                if day not in seen_days:
+                    seen_days.add(day)
+                    yield day, match.group(2)
+            # The rest may hold the beginning of an entry cut by the block boundary
+            buffer = buffer[end:] if end else buffer[-MAX_TAIL_SIZE:]
+
+
+def iter_csv_entries(path: str) -> Iterator[tuple[str, list[str]]]:
+    """
+    Yields `(header, row)` of a CSV dump with a `date` column followed by one column per currency.
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        for row in reader:
+            if row:
+                yield header, row
+
+
+def parse_json_entries(entries: list[tuple[str, str]]) -> tuple[dict[str, Rates], list[str]]:
+    rates, errors = {}, []
+    for day, rates_json in entries:
+        try:
+            rates[day] = Rates.model_validate_json(rates_json)
+        except ValidationError as e:
+            errors.append(f'{day}: {e.errors()[0]["msg"]}')
+    return rates, errors
+
+
+def parse_csv_entries(entries: list[tuple[list[str], list[str]]]) -> tuple[dict[str, Rates], list[str]]:
+    rates, errors = {}, []
+    for header, row in entries:
+        record = dict(zip(header, row))
+        day = record.pop('date', '')
+        try:
+            rates[day] = Rates(**record)
+        except ValidationError as e:
+            errors.append(f'{day}: {e.errors()[0]["msg"]}')
+    return rates, errors
@@ -0,0 +1,93 @@
+import os
+import random
+import socket
+from datetime import timedelta
+from threading import Event
+
+from django.db.models import Q
+from django.utils import timezone
+
+from my_currency import logger
+from my_currency.alerts import deliver_alerts
+from my_currency.constants import Currencies
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.exceptions import NoProviderException
+from my_currency.models import Currency, SchedulerLock
+from my_currency.snapshots import maintain_snapshots
+
+
+def acquire_lock(name: str, owner: str, ttl: int) -> bool:
+    """
+    Takes or renews the lease if it is free, expired or already ours.
+    Conditional UPDATE keeps it atomic across replicas.
+    """
+    now = timezone.now()
+    SchedulerLock.objects.get_or_create(name=name, defaults={'owner': '', 'expires_at': now})
+    acquired = SchedulerLock.objects.filter(name=name).filter(Q(owner=owner) | Q(expires_at__lte=now)).update(
+        owner=owner, expires_at=now + timedelta(seconds=ttl)
+    )
+    return acquired == 1
+
+
+def release_lock(name: str, owner: str) -> None:
+    SchedulerLock.objects.filter(name=name, owner=owner).update(expires_at=timezone.now())
+
+
+class RateRefresher:
+    lock_name = 'rate_refresher'
+
+    def __init__(self, interval: int, jitter: int, lock_ttl: int):
+        self.interval = interval
+        self.jitter = jitter
+        self.lock_ttl = lock_ttl
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self.stop_event = Event()
+
+    def run_forever(self) -> None:
+        logger.info(f'Rate refresher {self.owner} started, interval: {self.interval}s, jitter: {self.jitter}s')
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    # DB or network errors end the cycle, the next one starts after the interval
+                    logger.exception(f'Rate refresher cycle failed: {e}')
+                self.stop_event.wait(self.interval + random.uniform(0, self.jitter))
+        finally:
+            release_lock(self.lock_name, self.owner)
+            logger.info(f'Rate refresher {self.owner} stopped')
+
+    def stop(self, *args) -> None:
+        self.stop_event.set()
+
+    def run_once(self) -> bool:
+        if not acquire_lock(self.lock_name, self.owner, self.lock_ttl):
+            logger.info(f'Rate refresher {self.owner} is not the leader, skipping')
+            return False
+
+        self.refresh()
+        return True
+
+    def refresh(self) -> None:
+        today = timezone.now().date()
+        yesterday = today - timedelta(days=1)
+        for source_currency in self._get_base_currencies():
+            try:
+                CurrencyExchangeController().refresh_latest_rates(source_currency)
+                # Fetches from provider and stores only when DB misses some of yesterday's rates
+                CurrencyExchangeController().currency_rates_list(source_currency, yesterday, yesterday)
+            except NoProviderException as e:
+                logger.error(f'Failed to refresh rates for {source_currency}: {e}')
+            except Exception as e:
+                logger.exception(f'Failed to refresh rates for {source_currency}: {e}')
+        # Each task runs even when the previous one failed
+        for name, task in [('snapshot maintenance', maintain_snapshots), ('alert delivery', deliver_alerts)]:
+            try:
+                task()
+            except Exception as e:
+                logger.exception(f'Rate refresher {name} failed: {e}')
+
+    def _get_base_currencies(self) -> list[str]:
+        return list(
+            Currency.objects.filter(code__in=Currencies.values()).order_by('code').values_list('code', flat=True)
+        )
@@ -0,0 +1,62 @@
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from my_currency.columnar import MEDIA_TYPE, encode_columns
+from my_currency.encoders import PrecompiledSerializerEncoder
+from my_currency.serializers import (ConvertAmountResponseSerializer,
+                                     CurrencyRatesResponseSerializer)
+
+
+class PrecompiledJSONRenderer(JSONRenderer):
+    """
+    Renders successful responses of raw controller dicts with a precompiled encoder.
+    Error responses and indented output (browsable API) go through the regular serializer + JSONRenderer path.
+    """
+    encoder: PrecompiledSerializerEncoder = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if data is None or (response is not None and not status.is_success(response.status_code)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            data = self.encoder.serializer_class(data).data
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return self.encoder.encode(data)
+
+
+class CurrencyRatesJSONRenderer(PrecompiledJSONRenderer):
+    encoder = PrecompiledSerializerEncoder(CurrencyRatesResponseSerializer)
+
+
+class ConvertAmountJSONRenderer(PrecompiledJSONRenderer):
+    encoder = PrecompiledSerializerEncoder(ConvertAmountResponseSerializer)
+
+
+class CurrencyRatesColumnarRenderer(BaseRenderer):
+    """
+    Renders `CurrencyExchangeController.currency_rates_columns` output in the columnar binary format (columnar.py).
+    Error responses are rendered as JSON.
+    """
+    media_type = MEDIA_TYPE
+    format = 'columnar'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if response is not None and not status.is_success(response.status_code):
+            response['Content-Type'] = 'application/json'
+            return JSONRenderer().render(data)
+
+        header = {
+            'provider_name': data['provider_name'],
+            'source_currency': data['source_currency'],
+            'date_from': str(data['date_from']),
+            'date_to': str(data['date_to']),
+            'currencies': data['currencies'],
+        }
+        return encode_columns(header, data['dates'], data['rates'])
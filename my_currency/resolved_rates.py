@@ -0,0 +1,52 @@
+import datetime
+
+from django.db import connection, transaction
+
+from my_currency import logger
+from my_currency.models import (CurrencyExchangeRate, Provider,
+                                ResolvedExchangeRate)
+
+
+def refresh_resolved_rates(
+        source_currency_id: int | None = None, date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None
+        ) -> int:
+    """
+    Recomputes ResolvedExchangeRate for a source currency and date range (everything by default):
+    rows are deleted and inserted again from the provider with the highest priority per (source, target, day).
+    Returns the number of resolved rows.
+    """
+    quote_name = connection.ops.quote_name
+    conditions, params = [], []
+    if source_currency_id is not None:
+        conditions.append('source_currency_id = %s')
+        params.append(source_currency_id)
+    if date_from is not None:
+        conditions.append('valuation_date >= %s')
+        params.append(connection.ops.adapt_datefield_value(date_from))
+    if date_to is not None:
+        conditions.append('valuation_date <= %s')
+        params.append(connection.ops.adapt_datefield_value(date_to))
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+
+    resolved_table = quote_name(ResolvedExchangeRate._meta.db_table)
+    columns = 'source_currency_id, exchanged_currency_id, valuation_date, provider_id, rate_value'
+    insert_sql = f'''
+        INSERT INTO {resolved_table} ({columns})
+        SELECT {columns} FROM (
+            SELECT rate.*, ROW_NUMBER() OVER (
+                PARTITION BY source_currency_id, exchanged_currency_id, valuation_date ORDER BY provider.priority
+            ) AS precedence
+            FROM {quote_name(CurrencyExchangeRate._meta.db_table)} rate
+            JOIN {quote_name(Provider._meta.db_table)} provider ON provider.id = rate.provider_id
+            {where}
+        ) ranked
+        WHERE precedence = 1
+    '''
+    # Filters only use partition columns, so they apply before ranking
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {resolved_table} {where}', params)
+        cursor.execute(insert_sql, params)
+        num_rows = cursor.rowcount
+    logger.info(f'Resolved {num_rows} rates for source {source_currency_id} from {date_from} to {date_to}')
+    return num_rows
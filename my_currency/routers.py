@@ -0,0 +1,52 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def pin_to_primary() -> None:
+    _state.pinned = True
+
+
+def record_write() -> None:
+    _state.pinned = True
+    _state.written = True
+
+
+def reset_pinning() -> None:
+    _state.pinned = False
+    _state.written = False
+
+
+def is_pinned_to_primary() -> bool:
+    return getattr(_state, 'pinned', False)
+
+
+def has_written() -> bool:
+    return getattr(_state, 'written', False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends writes to `default` and reads to one of settings.DATABASE_REPLICAS.
+    After a write, reads of the same thread stay on `default` until the pinning is reset (read-your-writes).
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or is_pinned_to_primary() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
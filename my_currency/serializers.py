@@ -1,7 +1,11 @@
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_serializer
 from rest_framework import serializers
 
 from my_currency.constants import Currencies
-from my_currency.models import Currency, Provider
+from my_currency.models import (AlertSubscription, Currency, Provider,
+                                SnapshotResolution)
+from my_currency.pagination import decode_rates_cursor
 
 
 class CurrencyRatesRequestSerializer(serializers.Serializer):
@@ -15,18 +19,145 @@ class CurrencyRatesRequestSerializer(serializers.Serializer):
         return data
 
 
+class CurrencyRatesListRequestSerializer(CurrencyRatesRequestSerializer):
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=settings.CURRENCY_RATES_MAX_PAGE_SIZE,
+        default=settings.CURRENCY_RATES_PAGE_SIZE,
+    )
+
+    def validate_cursor(self, value):
+        try:
+            return decode_rates_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError('Invalid cursor.')
+
+    def validate(self, data):
+        data = super().validate(data)
+        if 'cursor' in data and not data['date_from'] <= data['cursor'][0] <= data['date_to']:
+            raise serializers.ValidationError({'cursor': 'Cursor is outside of the requested range.'})
+        return data
+
+
+# Returned by `list` actions as a single object, not as a list
+@extend_schema_serializer(many=False)
 class CurrencyRatesResponseSerializer(serializers.Serializer):
-    provider_name = serializers.CharField()
+    provider_name = serializers.CharField(help_text='Provider (or DB) which served the rates, `mixed` if several did.')
     date_from = serializers.DateField()
     date_to = serializers.DateField()
     source_currency = serializers.CharField()
     data = serializers.DictField()
+    served_by = serializers.DictField(help_text='Provider name (or DB) which served every day of `data`.')
+    next = serializers.CharField(allow_null=True)
+
+class RateStreamRequestSerializer(serializers.Serializer):
+    source_currency = serializers.ChoiceField(choices=Currencies.values(), required=True)
 
 class ConvertAmountRequestSerializer(serializers.Serializer):
     amount = serializers.FloatField(required=True)
     source_currency = serializers.ChoiceField(choices=Currencies.values(), required=True)
     exchanged_currency = serializers.ChoiceField(choices=Currencies.values(), required=True)
 
+class CurrencyRatesAnalyticsRequestSerializer(CurrencyRatesRequestSerializer):
+    windows = serializers.ListField(
+        child=serializers.IntegerField(min_value=2, max_value=365), required=False, default=[7, 30], max_length=5
+    )
+    targets = serializers.MultipleChoiceField(choices=Currencies.values(), required=False)
+
+    def to_internal_value(self, data):
+        # Query params come as comma separated lists: ?windows=7,30&targets=EUR,GBP
+        if hasattr(data, 'getlist'):
+            data = {key: data.get(key) for key in data}
+            for field_name in ('windows', 'targets'):
+                if data.get(field_name):
+                    data[field_name] = data[field_name].split(',')
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        data = super().validate(data)
+        targets = data.get('targets') or set(Currencies.values()) - {data['source_currency']}
+        data['targets'] = sorted(targets)
+        data['windows'] = sorted(set(data['windows']))
+        return data
+
+
+@extend_schema_serializer(many=False)
+class CurrencyRatesAnalyticsResponseSerializer(serializers.Serializer):
+    provider_name = serializers.CharField()
+    source_currency = serializers.CharField()
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    dates = serializers.ListField(child=serializers.DateField())
+    daily_returns = serializers.DictField(child=serializers.ListField(child=serializers.FloatField(allow_null=True)))
+    rolling = serializers.DictField(
+        child=serializers.DictField(
+            child=serializers.DictField(child=serializers.ListField(child=serializers.FloatField(allow_null=True)))
+        ),
+        help_text='{window: {"mean" | "volatility": {target: values per date}}}',
+    )
+    max_drawdown = serializers.DictField(child=serializers.FloatField(allow_null=True))
+    correlation = serializers.DictField(child=serializers.DictField(child=serializers.FloatField(allow_null=True)))
+
+
+class CurrencyRatesMatrixRequestSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=True, input_formats=['%Y-%m-%d'])
+    date_to = serializers.DateField(required=True, input_formats=['%Y-%m-%d'])
+    currencies = serializers.MultipleChoiceField(choices=Currencies.values(), required=False)
+
+    def to_internal_value(self, data):
+        # ?currencies=USD,EUR,GBP
+        if hasattr(data, 'getlist'):
+            data = {key: data.get(key) for key in data}
+            if data.get('currencies'):
+                data['currencies'] = data['currencies'].split(',')
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({'date_from': 'date_from must be before end date_to.'})
+        if (data['date_to'] - data['date_from']).days >= settings.CURRENCY_RATES_MATRIX_MAX_DAYS:
+            raise serializers.ValidationError(
+                {'date_to': f'Range is limited to {settings.CURRENCY_RATES_MATRIX_MAX_DAYS} days.'}
+            )
+        data['currencies'] = sorted(data.get('currencies') or Currencies.values())
+        return data
+
+
+@extend_schema_serializer(many=False)
+class CurrencyRatesMatrixResponseSerializer(serializers.Serializer):
+    provider_name = serializers.CharField()
+    base_currency = serializers.CharField(help_text='Currency the matrix was derived from')
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    currencies = serializers.ListField(child=serializers.CharField())
+    dates = serializers.ListField(child=serializers.DateField())
+    rates = serializers.ListField(
+        child=serializers.ListField(child=serializers.ListField(child=serializers.FloatField(allow_null=True))),
+        help_text='rates[date][source][target], indexes follow `dates` and `currencies`',
+    )
+
+
+class RateSnapshotsRequestSerializer(serializers.Serializer):
+    source_currency = serializers.ChoiceField(choices=Currencies.values(), required=True)
+    time_from = serializers.DateTimeField(required=True)
+    time_to = serializers.DateTimeField(required=True)
+
+    def validate(self, data):
+        if data['time_from'] > data['time_to']:
+            raise serializers.ValidationError({'time_from': 'time_from must be before time_to.'})
+        return data
+
+
+@extend_schema_serializer(many=False)
+class RateSnapshotsResponseSerializer(serializers.Serializer):
+    source_currency = serializers.CharField()
+    resolution = serializers.ChoiceField(choices=SnapshotResolution.choices)
+    time_from = serializers.DateTimeField()
+    time_to = serializers.DateTimeField()
+    data = serializers.DictField(help_text='{bucket start: {code: last rate in the bucket}}')
+
+
+@extend_schema_serializer(many=False)
 class ConvertAmountResponseSerializer(serializers.Serializer):
     provider_name = serializers.CharField()
     source_currency = serializers.ChoiceField(choices=Currencies.values())
@@ -35,6 +166,12 @@ class ConvertAmountResponseSerializer(serializers.Serializer):
     exchanged_amount = serializers.FloatField()
     rate_value = serializers.FloatField()
 
+class ConversionAuditStatsSerializer(serializers.Serializer):
+    queue_depth = serializers.IntegerField()
+    dropped = serializers.IntegerField()
+    flushed = serializers.IntegerField()
+    failed = serializers.IntegerField()
+
 class ErrorResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
 
@@ -53,3 +190,18 @@ class ProviderModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Provider
         fields = '__all__'
+
+class AlertSubscriptionModelSerializer(serializers.ModelSerializer):
+    source_currency = serializers.SlugRelatedField(slug_field='code', queryset=Currency.objects.all())
+    exchanged_currency = serializers.SlugRelatedField(slug_field='code', queryset=Currency.objects.all())
+
+    class Meta:
+        model = AlertSubscription
+        fields = '__all__'
+        # Form posts leave out unchecked booleans
+        extra_kwargs = {'is_active': {'default': True}}
+
+    def validate_threshold(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Threshold must be positive.')
+        return value
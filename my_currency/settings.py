@@ -9,6 +9,92 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 CURRENCY_BEACON_API_KEY = os.environ.get('CURRENCY_BEACON_API_KEY', None)
 
+# Provider clients by `Provider.name`, imported on first use. Installed packages can add providers
+# with `my_currency.providers` entry points, these settings take precedence
+CURRENCY_PROVIDERS = {
+    'currency_beacon': 'my_currency.currency_clients.CurrencyBeaconClient',
+    'mock': 'my_currency.currency_clients.MockedCurrencyClient',
+}
+
+# Per-provider limits, values set on the Provider model take precedence
+PROVIDER_LIMITS = {
+    'currency_beacon': {
+        'max_range_days': 365,
+        'requests_per_minute': 60,
+        'requests_per_month': 5000,
+    },
+}
+# On-disk cache of Currency Beacon answers for past dates. MODE: `off`, `record` (read-through,
+# stores cacheable answers) or `replay` (recorded answers only, no network calls)
+PROVIDER_RESPONSE_CACHE = {
+    'MODE': os.environ.get('PROVIDER_RESPONSE_CACHE_MODE', 'off'),
+    'DIR': os.environ.get('PROVIDER_RESPONSE_CACHE_DIR', BASE_DIR / 'provider_cache'),
+    'MAX_BYTES': int(os.environ.get('PROVIDER_RESPONSE_CACHE_MAX_BYTES', 200 * 1024 * 1024)),
+}
+# Failing provider timeseries ranges are split in halves at most this many times before the days go to the next provider
+TIMESERIES_BISECT_MAX_DEPTH = int(os.environ.get('TIMESERIES_BISECT_MAX_DEPTH', 4))
+# Seconds to connect to and read from a provider API
+PROVIDER_REQUEST_TIMEOUT = float(os.environ.get('PROVIDER_REQUEST_TIMEOUT', 10))
+# Max seconds a provider call waits for a free token before failing over to the next provider
+PROVIDER_QUOTA_MAX_WAIT = int(os.environ.get('PROVIDER_QUOTA_MAX_WAIT', 10))
+
+# Background refresher (`manage.py run_rate_refresher`), intervals are in seconds
+RATE_REFRESHER = {
+    'INTERVAL': int(os.environ.get('RATE_REFRESHER_INTERVAL', 300)),
+    'JITTER': int(os.environ.get('RATE_REFRESHER_JITTER', 30)),
+    'LOCK_TTL': int(os.environ.get('RATE_REFRESHER_LOCK_TTL', 900)),
+}
+# Today's rates younger than this are used for conversions instead of calling a provider
+LATEST_RATES_MAX_AGE = int(os.environ.get('LATEST_RATES_MAX_AGE', 600))
+# Server-sent events of latest rates: one poll per base currency every POLL_INTERVAL seconds,
+# clients keep at most QUEUE_SIZE undelivered updates
+RATE_STREAM = {
+    'POLL_INTERVAL': float(os.environ.get('RATE_STREAM_POLL_INTERVAL', 5)),
+    'HEARTBEAT': float(os.environ.get('RATE_STREAM_HEARTBEAT', 15)),
+    'QUEUE_SIZE': int(os.environ.get('RATE_STREAM_QUEUE_SIZE', 10)),
+}
+# Intraday snapshots of latest rates: seconds each resolution is kept for (None: forever). Minutes must be kept longer
+# than an hour and hours longer than a day, so complete buckets can be rolled up.
+# Queries return at most MAX_POINTS buckets
+RATE_SNAPSHOTS = {
+    'RETENTION': {
+        '1m': int(os.environ.get('RATE_SNAPSHOTS_MINUTE_RETENTION', 2 * 24 * 60 * 60)),
+        '1h': int(os.environ.get('RATE_SNAPSHOTS_HOUR_RETENTION', 90 * 24 * 60 * 60)),
+        '1d': None,
+    },
+    'MAX_POINTS': int(os.environ.get('RATE_SNAPSHOTS_MAX_POINTS', 1500)),
+}
+# Rate alerts: rates of days older than MAX_AGE_DAYS (backfills, imports) are not checked. The refresher delivers
+# triggered alerts with BACKEND in batches of BATCH_SIZE, failed ones are retried MAX_ATTEMPTS times
+ALERTS = {
+    'BACKEND': os.environ.get('ALERTS_BACKEND', 'my_currency.alerts.LogAlertBackend'),
+    'BATCH_SIZE': int(os.environ.get('ALERTS_BATCH_SIZE', 500)),
+    'MAX_ATTEMPTS': int(os.environ.get('ALERTS_MAX_ATTEMPTS', 5)),
+    'MAX_AGE_DAYS': int(os.environ.get('ALERTS_MAX_AGE_DAYS', 1)),
+}
+# Daily rates older than HORIZON_DAYS are moved by the `archive_rates` command to compressed monthly files in DIR,
+# reads merge them with the rows still in the DB
+RATE_ARCHIVE = {
+    'DIR': os.environ.get('RATE_ARCHIVE_DIR', BASE_DIR / 'rate_archive'),
+    'HORIZON_DAYS': int(os.environ.get('RATE_ARCHIVE_HORIZON_DAYS', 90)),
+}
+# Days a provider returned no rates for are not fetched again for this many seconds
+RATE_COVERAGE_EMPTY_TTL = int(os.environ.get('RATE_COVERAGE_EMPTY_TTL', 24 * 60 * 60))
+
+# Latest rates: when the primary provider is slower than its PERCENTILE latency (DEFAULT_DELAY seconds until
+# MIN_SAMPLES calls are seen), the next provider is queried in parallel. At most MAX_EXTRA_LOAD hedges per call
+HEDGING = {
+    'ENABLED': os.environ.get('HEDGING_ENABLED', 'false').lower() == 'true',
+    'PERCENTILE': float(os.environ.get('HEDGING_PERCENTILE', 95)),
+    'MIN_SAMPLES': int(os.environ.get('HEDGING_MIN_SAMPLES', 20)),
+    'DEFAULT_DELAY': float(os.environ.get('HEDGING_DEFAULT_DELAY', 0.5)),
+    'MIN_DELAY': float(os.environ.get('HEDGING_MIN_DELAY', 0.05)),
+    'MAX_EXTRA_LOAD': float(os.environ.get('HEDGING_MAX_EXTRA_LOAD', 0.1)),
+    'MAX_WORKERS': int(os.environ.get('HEDGING_MAX_WORKERS', 8)),
+    # Hedged calls still running after TIMEOUT seconds are abandoned for the next providers
+    'TIMEOUT': float(os.environ.get('HEDGING_TIMEOUT', 15)),
+}
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'your-secret-key'
 
@@ -31,6 +117,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'my_currency.middleware.RequestProfilingMiddleware',
+    'my_currency.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,7 +150,53 @@ WSGI_APPLICATION = 'my_currency.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'my_currency.pagination.IdCursorPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 100)),
 }
+# Number of rates (days x currencies) per page of `currency-rates`
+CURRENCY_RATES_PAGE_SIZE = int(os.environ.get('CURRENCY_RATES_PAGE_SIZE', 1000))
+CURRENCY_RATES_MAX_PAGE_SIZE = 10000
+# Analytics of ranges in the past are memoised for this many seconds
+RATE_ANALYTICS_CACHE_TIMEOUT = int(os.environ.get('RATE_ANALYTICS_CACHE_TIMEOUT', 24 * 60 * 60))
+# Longest range of the cross-rate matrix endpoint, in days
+CURRENCY_RATES_MATRIX_MAX_DAYS = int(os.environ.get('CURRENCY_RATES_MATRIX_MAX_DAYS', 366))
+# Max days of a currency-rates response in the columnar binary format (not paginated)
+CURRENCY_RATES_COLUMNAR_MAX_DAYS = int(os.environ.get('CURRENCY_RATES_COLUMNAR_MAX_DAYS', 3660))
+# Base currency stored and fetched for the matrix, other pairs are derived from it
+CURRENCY_RATES_MATRIX_BASE = os.environ.get('CURRENCY_RATES_MATRIX_BASE', 'USD')
+
+# Historical backfill: chunks run MAX_WORKERS at a time, provider errors are retried MAX_ATTEMPTS times
+# with exponential backoff starting at BACKOFF seconds
+BACKFILL = {
+    'MAX_WORKERS': int(os.environ.get('BACKFILL_MAX_WORKERS', 4)),
+    'MAX_ATTEMPTS': int(os.environ.get('BACKFILL_MAX_ATTEMPTS', 5)),
+    'BACKOFF': float(os.environ.get('BACKFILL_BACKOFF', 2.0)),
+}
+
+# Conversions are written to ExchangeCurrency in the background, see my_currency/audit.py
+CONVERSION_AUDIT = {
+    'MAX_QUEUE_SIZE': int(os.environ.get('CONVERSION_AUDIT_MAX_QUEUE_SIZE', 10000)),
+    'FLUSH_SIZE': int(os.environ.get('CONVERSION_AUDIT_FLUSH_SIZE', 500)),
+    'FLUSH_INTERVAL': float(os.environ.get('CONVERSION_AUDIT_FLUSH_INTERVAL', 1.0)),
+}
+
+# Opt-in per-request profiling, disabled while TOKEN is empty
+REQUEST_PROFILING = {
+    'TOKEN': os.environ.get('REQUEST_PROFILING_TOKEN', ''),
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 1.0)),
+    'DIR': os.environ.get('REQUEST_PROFILING_DIR', BASE_DIR / 'profiles'),
+    'MAX_FILES': int(os.environ.get('REQUEST_PROFILING_MAX_FILES', 100)),
+}
+
+# Phase-level spans of the controller. EXPORTER is a dotted path called with OPTIONS, tracing is disabled without it
+TRACING_FILE = os.environ.get('TRACING_FILE', '')
+TRACING = {
+    'EXPORTER': 'my_currency.tracing.JsonLinesSpanExporter' if TRACING_FILE else None,
+    'OPTIONS': {'path': TRACING_FILE},
+}
+
+# Mocked provider returns the same rates for the same seed, base currency and date
+MOCKED_CURRENCY_CLIENT_SEED = int(os.environ.get('MOCKED_CURRENCY_CLIENT_SEED', 0))
 SPECTACULAR_SETTINGS = {
     'TITLE': 'My Currency API',
     'DESCRIPTION': 'My Currency API for currency conversion and exchange rates',
@@ -71,12 +205,30 @@ SPECTACULAR_SETTINGS = {
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# `replica` points to the same SQLite file locally and mirrors `default` in tests,
+# in production set DB_REPLICA_NAME (and DATABASE_REPLICAS=replica) to a real replica.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_REPLICA_NAME', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_REPLICA_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
+DATABASE_ROUTERS = ['my_currency.routers.PrimaryReplicaRouter']
+# Aliases reads are sent to, nothing is routed to replicas when empty
+DATABASE_REPLICAS = [alias for alias in os.environ.get('DATABASE_REPLICAS', '').split(',') if alias]
+# Clients are kept on primary for this long after a write
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
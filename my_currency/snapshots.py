@@ -0,0 +1,188 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from my_currency import logger
+from my_currency.models import (Currency, CurrencyExchangeRate, RateSnapshot,
+                                SnapshotResolution)
+from my_currency.resolved_rates import refresh_resolved_rates
+
+RESOLUTION_SECONDS = {
+    SnapshotResolution.MINUTE: 60,
+    SnapshotResolution.HOUR: 60 * 60,
+    SnapshotResolution.DAY: 24 * 60 * 60,
+}
+# (finer, coarser) in the order they are rolled up
+ROLLUPS = [
+    (SnapshotResolution.MINUTE, SnapshotResolution.HOUR),
+    (SnapshotResolution.HOUR, SnapshotResolution.DAY),
+]
+SNAPSHOT_KEY_FIELDS = ['provider', 'source_currency', 'exchanged_currency', 'resolution', 'bucket_start']
+SNAPSHOT_UPDATE_FIELDS = ['rate_value', 'rate_min', 'rate_max', 'samples', 'updated_at']
+
+
+def get_bucket_start(moment: datetime.datetime, resolution: str) -> datetime.datetime:
+    seconds = RESOLUTION_SECONDS[resolution]
+    return datetime.datetime.fromtimestamp(int(moment.timestamp()) // seconds * seconds, tz=datetime.timezone.utc)
+
+
+def _merge(snapshot: RateSnapshot, other: RateSnapshot) -> None:
+    """
+    Adds a later `other` bucket into `snapshot`.
+    """
+    snapshot.rate_value = other.rate_value
+    snapshot.rate_min = min(snapshot.rate_min, other.rate_min)
+    snapshot.rate_max = max(snapshot.rate_max, other.rate_max)
+    snapshot.samples += other.samples
+
+
+def _save_snapshots(snapshots: list[RateSnapshot]) -> None:
+    RateSnapshot.objects.bulk_create(
+        snapshots, update_conflicts=True, unique_fields=SNAPSHOT_KEY_FIELDS, update_fields=SNAPSHOT_UPDATE_FIELDS,
+    )
+
+
+def record_snapshot(
+        provider_id: int, source_currency: str, rates: dict[str, float], at: datetime.datetime | None = None
+        ) -> None:
+    """
+    Adds latest rates of `source_currency` to the minute bucket of `at` (now by default).
+    """
+    bucket_start = get_bucket_start(at or timezone.now(), SnapshotResolution.MINUTE)
+    currencies = dict(Currency.objects.values_list('code', 'id'))
+    with transaction.atomic():
+        existing = {
+            snapshot.exchanged_currency_id: snapshot
+            for snapshot in RateSnapshot.objects.select_for_update().filter(
+                provider_id=provider_id, source_currency_id=currencies[source_currency],
+                resolution=SnapshotResolution.MINUTE, bucket_start=bucket_start,
+            )
+        }
+        snapshots = []
+        for code, rate_value in rates.items():
+            if code not in currencies:
+                continue
+            rate_value = round(float(rate_value), 6)
+            snapshot = RateSnapshot(
+                provider_id=provider_id, source_currency_id=currencies[source_currency],
+                exchanged_currency_id=currencies[code], resolution=SnapshotResolution.MINUTE,
+                bucket_start=bucket_start, rate_value=rate_value, rate_min=rate_value, rate_max=rate_value,
+            )
+            previous = existing.get(currencies[code])
+            if previous is not None:
+                previous.rate_min, previous.rate_max = float(previous.rate_min), float(previous.rate_max)
+                _merge(previous, snapshot)
+                snapshot = previous
+            snapshots.append(snapshot)
+        _save_snapshots(snapshots)
+
+
+def roll_up(finer: str, coarser: str, now: datetime.datetime) -> list[RateSnapshot]:
+    """
+    Aggregates `finer` buckets into complete `coarser` ones. The latest coarser bucket is recomputed,
+    older ones are final. Returns the written coarser snapshots.
+    """
+    latest = RateSnapshot.objects.filter(resolution=coarser).aggregate(Max('bucket_start'))['bucket_start__max']
+    finer_snapshots = RateSnapshot.objects.filter(resolution=finer, bucket_start__lt=get_bucket_start(now, coarser))
+    if latest is not None:
+        finer_snapshots = finer_snapshots.filter(bucket_start__gte=latest)
+
+    aggregated = {}
+    for snapshot in finer_snapshots.order_by('bucket_start').iterator():
+        bucket_start = get_bucket_start(snapshot.bucket_start, coarser)
+        key = (snapshot.provider_id, snapshot.source_currency_id, snapshot.exchanged_currency_id, bucket_start)
+        if key in aggregated:
+            _merge(aggregated[key], snapshot)
+        else:
+            snapshot.pk, snapshot.resolution, snapshot.bucket_start = None, coarser, bucket_start
+            aggregated[key] = snapshot
+
+    snapshots = list(aggregated.values())
+    _save_snapshots(snapshots)
+    logger.info(f'Rolled up {len(snapshots)} {coarser} snapshots')
+    return snapshots
+
+
+def feed_daily_rates(snapshots: list[RateSnapshot]) -> None:
+    """
+    Stores closing rates of daily snapshots as daily rates, days already stored are kept as they are.
+    """
+    days_by_source = defaultdict(list)
+    rates = []
+    for snapshot in snapshots:
+        valuation_date = snapshot.bucket_start.date()
+        days_by_source[snapshot.source_currency_id].append(valuation_date)
+        rates.append(CurrencyExchangeRate(
+            provider_id=snapshot.provider_id, source_currency_id=snapshot.source_currency_id,
+            exchanged_currency_id=snapshot.exchanged_currency_id, valuation_date=valuation_date,
+            rate_value=snapshot.rate_value,
+        ))
+    with transaction.atomic():
+        CurrencyExchangeRate.objects.bulk_create(rates, ignore_conflicts=True)
+        for source_currency_id, days in days_by_source.items():
+            refresh_resolved_rates(source_currency_id, min(days), max(days))
+
+
+def apply_retention(now: datetime.datetime) -> None:
+    for resolution, retention in settings.RATE_SNAPSHOTS['RETENTION'].items():
+        if retention is None:
+            continue
+        deleted, _ = RateSnapshot.objects.filter(
+            resolution=resolution, bucket_start__lt=now - datetime.timedelta(seconds=retention)
+        ).delete()
+        if deleted:
+            logger.info(f'Deleted {deleted} {resolution} snapshots after retention')
+
+
+def maintain_snapshots(now: datetime.datetime | None = None) -> None:
+    """
+    Downsamples snapshots (1m -> 1h -> 1d), feeds daily rates and deletes expired buckets.
+    """
+    now = now or timezone.now()
+    for finer, coarser in ROLLUPS:
+        snapshots = roll_up(finer, coarser, now)
+        if coarser == SnapshotResolution.DAY and snapshots:
+            feed_daily_rates(snapshots)
+    apply_retention(now)
+
+
+def choose_resolution(time_from: datetime.datetime, time_to: datetime.datetime, now: datetime.datetime) -> str:
+    """
+    The finest resolution still retained at `time_from` which returns at most MAX_POINTS buckets for the span,
+    days otherwise.
+    """
+    span = (time_to - time_from).total_seconds()
+    for resolution, seconds in RESOLUTION_SECONDS.items():
+        retention = settings.RATE_SNAPSHOTS['RETENTION'][resolution]
+        retained = retention is None or time_from >= now - datetime.timedelta(seconds=retention)
+        if retained and span / seconds <= settings.RATE_SNAPSHOTS['MAX_POINTS']:
+            return resolution
+    return SnapshotResolution.DAY
+
+
+def get_snapshots(source_currency: str, time_from: datetime.datetime, time_to: datetime.datetime) -> dict:
+    """
+    Closing rates of `source_currency` per bucket, of the highest priority provider.
+    """
+    resolution = choose_resolution(time_from, time_to, timezone.now())
+    snapshots = RateSnapshot.objects.filter(
+        source_currency__code=source_currency, resolution=resolution,
+        bucket_start__gte=get_bucket_start(time_from, resolution), bucket_start__lte=time_to,
+    ).order_by('bucket_start', 'provider__priority').values_list(
+        'bucket_start', 'exchanged_currency__code', 'rate_value'
+    )
+    data = defaultdict(dict)
+    for bucket_start, exchanged_currency, rate_value in snapshots:
+        data[bucket_start.isoformat()].setdefault(exchanged_currency, float(rate_value))
+
+    return {
+        'source_currency': source_currency,
+        'resolution': resolution,
+        'time_from': time_from,
+        'time_to': time_to,
+        'data': data,
+    }
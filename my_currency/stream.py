@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+
+from my_currency import logger
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.exceptions import NoProviderException
+from my_currency.serializers import RateStreamRequestSerializer
+
+
+def _fetch_latest_rates(source_currency: str) -> dict:
+    try:
+        return CurrencyExchangeController().latest_rates(source_currency, keep_history=True)
+    finally:
+        # Runs in a worker thread outside of the request cycle, nothing else closes its connections
+        close_old_connections()
+
+
+class Subscription:
+    """
+    Bounded queue of one client. When the client doesn't keep up, the oldest update is dropped,
+    so it always ends up with the latest rates and never slows the poller down.
+    """
+    def __init__(self, max_size: int):
+        self.queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def put(self, update: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(update)
+
+    async def get(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RateChannel:
+    """
+    One poller per base currency, started with the first subscriber and stopped after the last one leaves.
+    Provider calls depend on the number of base currencies, not on the number of clients.
+    """
+    def __init__(self, source_currency: str, fetch=None):
+        self.source_currency = source_currency
+        self.fetch = fetch or _fetch_latest_rates
+        self.subscriptions = set()
+        self.last_update = None
+        self._task = None
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(settings.RATE_STREAM['QUEUE_SIZE'])
+        if self.last_update is not None:
+            subscription.put(self.last_update)
+        self.subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, update: dict) -> None:
+        if update == self.last_update:
+            return
+        self.last_update = update
+        for subscription in self.subscriptions:
+            subscription.put(update)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                # Not thread-sensitive: polls must not queue behind sync middleware and views
+                self.publish(await sync_to_async(self.fetch, thread_sensitive=False)(self.source_currency))
+            except NoProviderException as e:
+                logger.error(f'Rate stream of {self.source_currency} failed to fetch rates: {e}')
+            except Exception as e:
+                # The poller is shared by all subscribers of the currency, it keeps polling whatever fails
+                logger.exception(f'Rate stream of {self.source_currency} failed: {e}')
+            await asyncio.sleep(settings.RATE_STREAM['POLL_INTERVAL'])
+
+
+_channels = {}
+
+
+def get_channel(source_currency: str) -> RateChannel:
+    # Channels belong to the running event loop, tasks can't be shared between loops
+    key = (asyncio.get_running_loop(), source_currency)
+    for closed_key in [channel_key for channel_key in _channels if channel_key[0].is_closed()]:
+        del _channels[closed_key]
+    if key not in _channels:
+        _channels[key] = RateChannel(source_currency)
+    return _channels[key]
+
+
+def format_event(update: dict) -> str:
+    return f'event: rates\ndata: {json.dumps(update, separators=(",", ":"))}\n\n'
+
+
+async def rate_events(channel: RateChannel):
+    subscription = channel.subscribe()
+    try:
+        while True:
+            update = await subscription.get(timeout=settings.RATE_STREAM['HEARTBEAT'])
+            # Comment lines keep proxies from closing idle connections
+            yield ': keep-alive\n\n' if update is None else format_event(update)
+    finally:
+        channel.unsubscribe(subscription)
+
+
+async def currency_rates_stream(request):
+    """
+    Server-sent events with the latest rates of `source_currency`, sent whenever they change.
+    """
+    serializer = RateStreamRequestSerializer(data=request.GET)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    channel = get_channel(serializer.validated_data['source_currency'])
+    response = StreamingHttpResponse(rate_events(channel), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
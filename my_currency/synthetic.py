@@ -0,0 +1,29 @@
+import numpy as np
+
+# Approximate value of one USD, starting points of the random walks
+USD_RATE_LEVELS = {
+    'USD': 1.0,
+    'EUR': 0.92,
+    'GBP': 0.79,
+    'CHF': 0.88,
+}
+
+
+def generate_usd_rates(
+        num_days: int, currencies: list[str], rng: np.random.Generator, volatility: float = 0.005
+        ) -> np.ndarray:
+    """
+    Seeded geometric random walk of USD rates, shape (num_days, currencies). USD stays 1.
+    """
+    levels = np.log([USD_RATE_LEVELS.get(code, 1.0) for code in currencies])
+    steps = rng.normal(0, volatility, size=(num_days, len(currencies)))
+    steps[0] = 0
+    steps[:, [code == 'USD' for code in currencies]] = 0
+    return np.exp(levels + np.cumsum(steps, axis=0))
+
+
+def cross_rates(usd_rates: np.ndarray) -> np.ndarray:
+    """
+    Rates of every source to every target, shape (days, sources, targets): rate = USD->target / USD->source.
+    """
+    return usd_rates[:, np.newaxis, :] / usd_rates[:, :, np.newaxis]
@@ -3,12 +3,87 @@ import os
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from my_currency.alerts import AlertEngine
+from my_currency.audit import ConversionAuditBuffer, set_conversion_audit
+from my_currency.models import Provider
+from my_currency.providers import get_provider_client, registry
+from my_currency.quota import clear_provider_limits_cache
 from my_currency.tests.factories import CurrencyExchangeRateFactory
+from my_currency.tracing import (InMemorySpanExporter, reset_exporter,
+                                 set_exporter)
 from my_currency.utils import fill_currencies, fill_providers
 
 
+@pytest.fixture(autouse=True)
+def provider_limits_cache():
+    clear_provider_limits_cache()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def conversion_audit():
+    # No background thread in tests, records are flushed explicitly
+    buffer = ConversionAuditBuffer(max_queue_size=100, flush_size=10, flush_interval=1, autostart=False)
+    set_conversion_audit(buffer)
+    yield buffer
+    set_conversion_audit(None)
+
+
+@pytest.fixture(autouse=True)
+def alert_engine(mocker):
+    # Previous rates are kept in memory, every test starts without them
+    engine = AlertEngine()
+    mocker.patch('my_currency.alerts._engine', engine)
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def provider_response_cache(settings, tmp_path):
+    # Provider calls are mocked per test, recorded responses would leak between tests
+    settings.PROVIDER_RESPONSE_CACHE = {'MODE': 'off', 'DIR': tmp_path / 'provider_cache', 'MAX_BYTES': 1024 * 1024}
+    return settings.PROVIDER_RESPONSE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def rate_archive(settings, tmp_path):
+    # Archived partitions of a local run would be merged into the rates read by tests
+    settings.RATE_ARCHIVE = {'DIR': tmp_path / 'rate_archive', 'HORIZON_DAYS': 90}
+    return settings.RATE_ARCHIVE
+
+
+@pytest.fixture(autouse=True)
+def provider_registry():
+    # Clients are created on first use, tests changing CURRENCY_PROVIDERS get fresh ones
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.fixture
+def currency_beacon_client():
+    return get_provider_client(Provider.ProviderNames.CURRENCY_BEACON.value)
+
+
+@pytest.fixture
+def mocked_currency_client():
+    return get_provider_client(Provider.ProviderNames.MOCK.value)
+
+
+@pytest.fixture
+def span_exporter():
+    exporter = InMemorySpanExporter()
+    set_exporter(exporter)
+    yield exporter
+    reset_exporter()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from my_currency.admin import CurrencyExchangeRateAdmin
+from my_currency.models import Currency, CurrencyExchangeRate, Provider
+from my_currency.tests.factories import CurrencyExchangeRateFactory
+
+
+@pytest.mark.django_db
+def test_currency_exchange_rate_admin_keyset_pagination(admin_client, fill_initial_data, mocker):
+    mocker.patch.object(CurrencyExchangeRateAdmin, 'list_per_page', 3)
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    usd = Currency.objects.get(code='USD')
+    for day in range(1, 8):
+        CurrencyExchangeRateFactory(
+            provider=provider, source_currency=usd, exchanged_currency=usd,
+            valuation_date=datetime.date(2024, 1, day),
+        )
+
+    url = reverse('admin:my_currency_currencyexchangerate_changelist')
+    seen = []
+    response = admin_client.get(url)
+    while True:
+        assert response.status_code == 200
+        changelist = response.context['cl']
+        seen.extend(rate.valuation_date.day for rate in changelist.result_list)
+        if changelist.next_page_url is None:
+            break
+        response = admin_client.get(url + changelist.next_page_url)
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert changelist.result_count == CurrencyExchangeRate.objects.count()
+
+
+@pytest.mark.django_db
+def test_currency_exchange_rate_admin_has_no_full_table_queries(admin_client, fill_initial_data):
+    CurrencyExchangeRateFactory.create_batch(3)
+    url = reverse('admin:my_currency_currencyexchangerate_changelist')
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, {'valuation_date__gte': '2024-01-01'})
+    assert response.status_code == 200
+    rate_queries = [query['sql'] for query in queries if CurrencyExchangeRate._meta.db_table in query['sql']]
+    assert not [sql for sql in rate_queries if 'DISTINCT' in sql or 'MIN(' in sql or 'MAX(' in sql]
@@ -0,0 +1,89 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from my_currency.alerts import AlertEngine, ThresholdIndex, deliver_alerts
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import AlertOutbox, Provider
+from my_currency.schemas import Rates
+
+
+def test_threshold_index_returns_crossed_thresholds():
+    index = ThresholdIndex()
+    for subscription_id, threshold in enumerate([1.3, 1.1, 1.2, 1.1]):
+        index.add(threshold, subscription_id)
+
+    assert sorted(index.crossed_upwards(1.05, 1.15)) == [1, 3]
+    assert index.crossed_upwards(1.15, 1.19) == []
+    assert sorted(index.crossed_downwards(1.35, 1.2)) == [0]
+    assert sorted(index.crossed_downwards(1.2, 1.0)) == [1, 2, 3]
+
+
+def _save_rates(day: datetime.date, eur: float) -> None:
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    CurrencyExchangeController().save_rates_to_db(
+        {day: Rates(CHF=0.9, EUR=eur, GBP=0.8, USD=1.0)}, 'USD', provider.id
+    )
+
+
+@pytest.mark.django_db
+def test_alerts_fire_once_per_crossing(api_client, mocker, fill_initial_data):
+    for condition, threshold in [('above', 1.1), ('above', 1.2), ('below', 0.9), ('daily_change', 5)]:
+        response = api_client.post(reverse('alert-subscriptions-list'), {
+            'subscriber': 'quant@example.com', 'source_currency': 'USD', 'exchanged_currency': 'EUR',
+            'condition': condition, 'threshold': threshold,
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+
+    today = timezone.now().date()
+    _save_rates(today - datetime.timedelta(days=1), 1.0)
+    _save_rates(today, 1.15)
+    # Still above the threshold, nothing crossed
+    _save_rates(today, 1.16)
+
+    fired = AlertOutbox.objects.order_by('subscription__threshold').values_list(
+        'subscription__condition', 'rate_value', 'reference_value'
+    )
+    assert [(condition, float(rate), float(reference)) for condition, rate, reference in fired] == [
+        ('above', 1.15, 1.0), ('daily_change', 1.15, 1.0),
+    ]
+
+    # Another process (or a restart) starts from the previous day's rate and sees the same crossings
+    mocker.patch('my_currency.alerts._engine', AlertEngine())
+    _save_rates(today, 1.16)
+    assert AlertOutbox.objects.count() == 2
+
+    backend = mocker.Mock()
+    mocker.patch('my_currency.alerts.import_string', return_value=lambda: backend)
+    assert deliver_alerts(batch_size=1) == 2
+    batches = [call.args[0] for call in backend.send.call_args_list]
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert batches[0][0]['pair'] == 'USD/EUR'
+    assert not AlertOutbox.objects.filter(delivered_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_historical_rates_are_not_checked(api_client, fill_initial_data):
+    api_client.post(reverse('alert-subscriptions-list'), {
+        'subscriber': 'quant@example.com', 'source_currency': 'USD', 'exchanged_currency': 'EUR',
+        'condition': 'above', 'threshold': 1.1,
+    })
+    _save_rates(datetime.date(2020, 1, 1), 1.0)
+    _save_rates(datetime.date(2020, 1, 2), 1.5)
+    assert not AlertOutbox.objects.exists()
+
+
+@pytest.mark.django_db
+def test_latest_rates_are_checked_off_the_request_path(mocker, fill_initial_data, currency_beacon_latest_response):
+    mock_response = mocker.Mock(status_code=200)
+    mock_response.json.return_value = currency_beacon_latest_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+    check_alerts = mocker.patch('my_currency.controllers.check_alerts')
+    CurrencyExchangeController().convert_amount('USD', 'EUR', 10)
+    check_alerts.assert_not_called()
+
+    CurrencyExchangeController().latest_rates('USD', keep_history=True)
+    check_alerts.assert_called_once()
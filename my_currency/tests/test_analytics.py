@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.analytics import compute_rate_analytics
+
+
+def test_compute_rate_analytics():
+    matrix = np.array([[1.0, 2.0], [1.1, 1.8], [0.99, 1.98], [1.2, 2.2]])
+    analytics = compute_rate_analytics(matrix, windows=[2])
+
+    assert np.isnan(analytics['daily_returns'][0]).all()
+    np.testing.assert_allclose(analytics['daily_returns'][1:, 0], [0.1, -0.1, 1.2 / 0.99 - 1])
+    np.testing.assert_allclose(analytics['rolling'][2]['mean'][1:, 1], [1.9, 1.89, 2.09])
+    np.testing.assert_allclose(
+        analytics['rolling'][2]['volatility'][2:, 0], [np.std([0.1, -0.1]), np.std([-0.1, 1.2 / 0.99 - 1])]
+    )
+    np.testing.assert_allclose(analytics['max_drawdown'], [0.99 / 1.1 - 1, -0.1])
+    assert analytics['correlation'][0, 0] == pytest.approx(1)
+
+
+@pytest.mark.django_db
+def test_currency_rates_analytics(api_client, mocker, currency_beacon_timeseries_response, fill_initial_data):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    requests_get = mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    url = reverse('currency-rates-analytics')
+    params = {
+        'source_currency': 'USD',
+        'date_from': '2023-10-01',
+        'date_to': '2023-12-31',
+        'windows': '7,30',
+        'targets': 'EUR,GBP',
+    }
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['dates']) == 92
+    assert set(response.data['rolling']) == {'7', '30'}
+    assert list(response.data['correlation']) == ['EUR', 'GBP']
+    assert response.data['daily_returns']['EUR'][0] is None
+    eur = [rates['EUR'] for rates in currency_beacon_timeseries_response['response'].values()]
+    assert response.data['daily_returns']['EUR'][1] == pytest.approx(eur[1] / eur[0] - 1, rel=1e-5)
+
+    # Past ranges are served from cache
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert requests_get.call_count == 1
+
+
+@pytest.mark.django_db
+def test_analytics_of_mocked_rates_are_not_cached(api_client, mocker, fill_initial_data):
+    mock_response = mocker.Mock(status_code=500, text='Internal Server Error')
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+    cache_set = mocker.patch('my_currency.controllers.cache.set')
+
+    response = api_client.get(reverse('currency-rates-analytics'), {
+        'source_currency': 'USD', 'date_from': '2023-10-01', 'date_to': '2023-10-31', 'windows': '7', 'targets': 'EUR',
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == 'mock'
+    cache_set.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_currency_rates_matrix(api_client, mocker, currency_beacon_timeseries_response, fill_initial_data):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    requests_get = mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    url = reverse('currency-rates-matrix')
+    params = {'date_from': '2023-10-01', 'date_to': '2023-12-31', 'currencies': 'USD,GBP,EUR'}
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['base_currency'] == 'USD'
+    assert response.data['currencies'] == ['EUR', 'GBP', 'USD']
+    assert len(response.data['dates']) == len(response.data['rates']) == 92
+
+    usd_rates = currency_beacon_timeseries_response['response']['2023-10-01']
+    eur, gbp, usd = response.data['rates'][0]
+    assert usd == [round(usd_rates['EUR'], 6), round(usd_rates['GBP'], 6), 1.0]
+    assert eur[1] == pytest.approx(usd_rates['GBP'] / usd_rates['EUR'], abs=1e-6)
+    assert eur[2] == pytest.approx(1 / usd_rates['EUR'], abs=1e-6)
+    assert [row[i] for i, row in enumerate(response.data['rates'][0])] == [1.0, 1.0, 1.0]
+
+    # Stored USD rates serve every base
+    response = api_client.get(url, {**params, 'currencies': 'CHF,GBP'})
+    assert response.data['provider_name'] == 'DB'
+    assert requests_get.call_count == 1
+
+    response = api_client.get(url, {'date_from': '2023-01-01', 'date_to': '2024-12-31'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -74,6 +74,50 @@ def test_get_currency_mock_currency_beacon(api_client, mocker, currency_beacon_t
     assert response.data['provider_name'] == Provider.ProviderNames.CURRENCY_BEACON.value
     assert len(response.data['data']) == 92
 
+@pytest.mark.django_db
+def test_get_currency_rates_cursor_pagination(
+        api_client, mocker, currency_beacon_timeseries_response, fill_initial_data
+        ):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    url = reverse('currency-rates-list')
+    params = {
+        'source_currency': 'USD',
+        'date_from': '2023-10-01',
+        'date_to': '2023-12-31',
+        'page_size': 50,
+    }
+    response = api_client.get(url, params)
+    pages = [response]
+    while response.data['next'] is not None:
+        response = api_client.get(response.data['next'])
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response)
+
+    rates = [
+        (day, currency_code)
+        for page in pages
+        for day, day_rates in page.data['data'].items()
+        for currency_code in day_rates
+    ]
+    assert len(pages) == 8
+    assert len(rates) == 92 * 4
+    assert rates == sorted(set(rates))
+
+@pytest.mark.django_db
+def test_currencies_cursor_pagination(api_client, fill_initial_data):
+    url = reverse('currencies-v1-list')
+    response = api_client.get(url, {'page_size': 3})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 3
+
+    response = api_client.get(response.data['next'])
+    assert len(response.data['results']) == 1
+    assert response.data['next'] is None
+
 @pytest.mark.django_db
 def test_get_currency_lower_currency_beacon_priority(api_client, fill_initial_data):
     # Switching lower priority for currency beacon provider
@@ -200,8 +244,8 @@ def test_currencies_v1_crud(api_client, fill_initial_data):
     url = reverse('currencies-v1-list')
     response = api_client.get(url)
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 4
-    first_currency = response.data[0]['id']
+    assert len(response.data['results']) == 4
+    first_currency = response.data['results'][0]['id']
 
     # Retrieve
     url = reverse('currencies-v1-detail', args=(first_currency,))
@@ -229,7 +273,7 @@ def test_currencies_v1_crud(api_client, fill_initial_data):
     url = reverse('currencies-v1-list')
     response = api_client.get(url)
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 3
+    assert len(response.data['results']) == 3
 
     # Create
     url = reverse('currencies-v1-list')
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from my_currency.archive import get_rate_archive
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import (CurrencyExchangeRate, Provider,
+                                ResolvedExchangeRate)
+from my_currency.planner import get_stored_days
+from my_currency.schemas import Rates
+
+DATE_FROM = datetime.date(2024, 1, 30)
+DATE_TO = datetime.date(2024, 2, 2)
+
+
+@pytest.fixture
+def archived_rates(fill_initial_data):
+    controller = CurrencyExchangeController()
+    days = [DATE_FROM + datetime.timedelta(days=offset) for offset in range(4)]
+    for provider_name, rate_value in [
+        (Provider.ProviderNames.MOCK.value, 2.0), (Provider.ProviderNames.CURRENCY_BEACON.value, 1.0),
+    ]:
+        provider = Provider.objects.get(name=provider_name)
+        rates = {day: Rates(CHF=rate_value, EUR=rate_value, GBP=rate_value, USD=rate_value) for day in days}
+        controller.save_rates_to_db(rates, 'USD', provider.id)
+
+    # Everything before the last day is archived
+    horizon_days = (timezone.now().date() - DATE_TO).days
+    call_command('archive_rates', horizon_days=horizon_days)
+
+
+def get_rates(api_client) -> dict:
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': str(DATE_FROM), 'date_to': str(DATE_TO),
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == 'DB'
+    return {day: day_rates['EUR'] for day, day_rates in response.data['data'].items()}
+
+
+@pytest.mark.django_db
+def test_archived_rates_are_merged_with_hot_rows(api_client, archived_rates):
+    assert set(CurrencyExchangeRate.objects.values_list('valuation_date', flat=True)) == {DATE_TO}
+    assert set(ResolvedExchangeRate.objects.values_list('valuation_date', flat=True)) == {DATE_TO}
+    assert [
+        (entry['path'], entry['date_from'], entry['date_to'], entry['rows'])
+        for entry in get_rate_archive().get_entries()
+    ] == [
+        ('USD/2024-01.npz', DATE_FROM, datetime.date(2024, 1, 31), 16),
+        ('USD/2024-02.npz', datetime.date(2024, 2, 1), datetime.date(2024, 2, 1), 8),
+    ]
+    assert get_rates(api_client) == {'2024-01-30': 1.0, '2024-01-31': 1.0, '2024-02-01': 1.0, '2024-02-02': 1.0}
+
+    # Provider precedence of archived days follows the current priorities
+    currency_beacon = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    api_client.patch(reverse('providers-detail', args=[currency_beacon.id]), {'priority': 99})
+    assert get_rates(api_client) == {'2024-01-30': 2.0, '2024-01-31': 2.0, '2024-02-01': 2.0, '2024-02-02': 2.0}
+
+    # Rows stored again for an archived day win over archived rates of the same priority
+    mock = Provider.objects.get(name=Provider.ProviderNames.MOCK.value)
+    CurrencyExchangeController().save_rates_to_db(
+        {DATE_FROM: Rates(CHF=3.0, EUR=3.0, GBP=3.0, USD=3.0)}, 'USD', mock.id
+    )
+    assert get_rates(api_client)['2024-01-30'] == 3.0
+
+
+@pytest.mark.django_db
+def test_archived_rates_of_higher_priority_win_over_hot_rows(api_client, archived_rates):
+    # The archive has rates of both providers, Currency Beacon has the highest priority
+    mock = Provider.objects.get(name=Provider.ProviderNames.MOCK.value)
+    CurrencyExchangeController().save_rates_to_db(
+        {DATE_FROM: Rates(CHF=3.0, EUR=3.0, GBP=3.0, USD=3.0)}, 'USD', mock.id
+    )
+    assert ResolvedExchangeRate.objects.filter(valuation_date=DATE_FROM, provider=mock).exists()
+    assert get_rates(api_client)['2024-01-30'] == 1.0
+
+
+@pytest.mark.django_db
+def test_archived_days_are_not_backfilled_again(archived_rates):
+    assert get_stored_days(Provider.ProviderNames.CURRENCY_BEACON.value, 'USD', DATE_FROM, DATE_TO) == {
+        DATE_FROM + datetime.timedelta(days=offset) for offset in range(4)
+    }
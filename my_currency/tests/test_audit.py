@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.audit import ConversionAuditBuffer
+from my_currency.models import ExchangeCurrency, Provider
+
+
+def conversion(amount: float) -> dict:
+    return {
+        'provider_name': Provider.ProviderNames.MOCK.value,
+        'source_currency': 'USD',
+        'exchanged_currency': 'EUR',
+        'source_amount': amount,
+        'exchanged_amount': amount * 0.9,
+        'rate_value': 0.9,
+    }
+
+
+@pytest.mark.django_db
+def test_conversion_audit_is_written_behind(
+        api_client, mocker, currency_beacon_latest_response, fill_initial_data, conversion_audit
+        ):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_latest_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    url = reverse('convert-amount-list')
+    for amount in (10, 20, 30):
+        response = api_client.get(url, {'source_currency': 'USD', 'exchanged_currency': 'EUR', 'amount': amount})
+        assert response.status_code == status.HTTP_200_OK
+    assert ExchangeCurrency.objects.count() == 0
+
+    response = api_client.get(reverse('convert-amount-audit-stats'))
+    assert response.data == {'queue_depth': 3, 'dropped': 0, 'flushed': 0, 'failed': 0}
+
+    assert conversion_audit.flush() == 3
+    assert sorted(ExchangeCurrency.objects.values_list('source_amount', flat=True)) == [10, 20, 30]
+    assert conversion_audit.stats() == {'queue_depth': 0, 'dropped': 0, 'flushed': 3, 'failed': 0}
+
+
+@pytest.mark.django_db
+def test_conversion_audit_drops_when_full(fill_initial_data):
+    buffer = ConversionAuditBuffer(max_queue_size=5, flush_size=2, flush_interval=1, autostart=False)
+    for amount in range(8):
+        buffer.record(conversion(amount))
+    assert buffer.stats()['queue_depth'] == 5
+    assert buffer.stats()['dropped'] == 3
+
+    # Final flush on shutdown writes everything left, in batches of flush_size
+    buffer.close()
+    assert ExchangeCurrency.objects.count() == 5
+    assert buffer.stats() == {'queue_depth': 0, 'dropped': 3, 'flushed': 5, 'failed': 0}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_conversion_audit_background_flush(fill_initial_data):
+    buffer = ConversionAuditBuffer(max_queue_size=100, flush_size=2, flush_interval=0.05)
+    buffer.record(conversion(1))
+    buffer.record(conversion(2))
+    buffer.record(conversion(3))
+    buffer.close()
+    assert ExchangeCurrency.objects.count() == 3
@@ -0,0 +1,75 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+
+from my_currency.backfill import create_backfill_job, run_backfill_job
+from my_currency.exceptions import CurrencyBeaconException
+from my_currency.models import BackfillStatus, CurrencyExchangeRate, Provider
+
+
+@pytest.fixture
+def backfill_settings(settings, fill_initial_data):
+    settings.BACKFILL = {'MAX_WORKERS': 1, 'MAX_ATTEMPTS': 2, 'BACKOFF': 0}
+    Provider.objects.filter(name=Provider.ProviderNames.CURRENCY_BEACON.value).update(max_range_days=10)
+
+
+@pytest.fixture
+def provider_timeseries(mocker, currency_beacon_client, mocked_currency_client):
+    """
+    Currency Beacon returning mocked rates, failing for windows starting at the dates in `failing`.
+    """
+    failing = {}
+
+    def timeseries(base_currency, start_date, end_date):
+        if failing.get(start_date, 0) > 0:
+            failing[start_date] -= 1
+            raise CurrencyBeaconException('Error: 500')
+        return mocked_currency_client.timeseries(base_currency, start_date, end_date)
+
+    timeseries_mock = mocker.patch.object(currency_beacon_client, 'timeseries', side_effect=timeseries)
+    timeseries_mock.failing = failing
+    return timeseries_mock
+
+
+@pytest.mark.django_db
+def test_backfill_retries_failed_chunks(backfill_settings, provider_timeseries):
+    provider_timeseries.failing[datetime.date(2024, 1, 6)] = 1
+    job = create_backfill_job('USD', datetime.date(2024, 1, 1), datetime.date(2024, 1, 25))
+    assert job.chunks.count() == 3
+
+    job = run_backfill_job(job)
+    assert job.status == BackfillStatus.COMPLETED
+    assert provider_timeseries.call_count == 4
+    assert dict(job.chunks.values_list('date_from', 'attempts')) == {
+        datetime.date(2024, 1, 16): 1,
+        datetime.date(2024, 1, 6): 2,
+        datetime.date(2024, 1, 1): 1,
+    }
+    assert CurrencyExchangeRate.objects.count() == 25 * 4
+
+
+@pytest.mark.django_db
+def test_backfill_resume(backfill_settings, provider_timeseries):
+    provider_timeseries.failing[datetime.date(2024, 1, 6)] = 2
+    job = run_backfill_job(create_backfill_job('USD', datetime.date(2024, 1, 1), datetime.date(2024, 1, 25)))
+    assert job.status == BackfillStatus.FAILED
+    failed_chunk = job.chunks.get(status=BackfillStatus.FAILED)
+    assert failed_chunk.date_from == datetime.date(2024, 1, 6)
+    assert failed_chunk.last_error == 'Error: 500'
+
+    provider_timeseries.reset_mock()
+    call_command('backfill', resume=True)
+    job.refresh_from_db()
+    assert job.status == BackfillStatus.COMPLETED
+    provider_timeseries.assert_called_once_with(
+        base_currency='USD', start_date=datetime.date(2024, 1, 6), end_date=datetime.date(2024, 1, 15)
+    )
+
+    # Finished work costs no provider calls
+    provider_timeseries.reset_mock()
+    call_command('backfill', resume=True)
+    job = run_backfill_job(create_backfill_job('USD', datetime.date(2024, 1, 1), datetime.date(2024, 1, 25)))
+    assert job.status == BackfillStatus.COMPLETED
+    assert not job.chunks.exists()
+    provider_timeseries.assert_not_called()
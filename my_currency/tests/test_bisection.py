@@ -0,0 +1,116 @@
+import datetime
+
+import pytest
+import requests
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.currency_clients import CurrencyBeaconClient
+from my_currency.exceptions import CurrencyBeaconException
+from my_currency.models import CurrencyExchangeRate, Provider
+from my_currency.schemas import Rates
+
+BAD_DAY = datetime.date(2024, 1, 6)
+
+
+def _patch_timeseries(mocker, fails):
+    def timeseries(self, base_currency, start_date, end_date):
+        if fails(start_date, end_date):
+            raise CurrencyBeaconException('Range failed')
+        num_days = (end_date - start_date).days + 1
+        return {
+            str(start_date + datetime.timedelta(days=i)): Rates(CHF=0.9, EUR=0.95, GBP=0.8, USD=1.0)
+            for i in range(num_days)
+        }
+    return mocker.patch.object(CurrencyBeaconClient, 'timeseries', autospec=True, side_effect=timeseries)
+
+
+@pytest.fixture
+def failing_timeseries(mocker):
+    # Every range containing BAD_DAY fails
+    return _patch_timeseries(mocker, lambda start_date, end_date: start_date <= BAD_DAY <= end_date)
+
+
+@pytest.mark.django_db
+def test_failing_range_is_bisected(api_client, fill_initial_data, failing_timeseries, settings):
+    settings.TIMESERIES_BISECT_MAX_DEPTH = 5
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-10', 'page_size': 40,
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    served_by = response.data['served_by']
+    assert len(served_by) == 10
+    assert served_by.pop(str(BAD_DAY)) == Provider.ProviderNames.MOCK.value
+    assert set(served_by.values()) == {Provider.ProviderNames.CURRENCY_BEACON.value}
+    assert response.data['provider_name'] == 'mixed'
+
+    # Only the sub-ranges served by Currency Beacon are stored
+    stored_days = set(CurrencyExchangeRate.objects.values_list('valuation_date', flat=True))
+    assert len(stored_days) == 9
+    assert BAD_DAY not in stored_days
+
+
+@pytest.mark.django_db
+def test_bisection_depth_is_limited(api_client, fill_initial_data, failing_timeseries, settings):
+    settings.TIMESERIES_BISECT_MAX_DEPTH = 1
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-10', 'page_size': 40,
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    # The first half containing BAD_DAY is served by the mock provider as a whole
+    served_by = response.data['served_by']
+    assert {served_by[f'2024-01-{day:02}'] for day in range(1, 6)} == {Provider.ProviderNames.CURRENCY_BEACON.value}
+    assert {served_by[f'2024-01-{day:02}'] for day in range(6, 11)} == {Provider.ProviderNames.MOCK.value}
+    assert failing_timeseries.call_count == 3
+
+
+@pytest.mark.django_db
+def test_bad_days_in_both_halves_are_bisected(api_client, fill_initial_data, mocker, settings):
+    settings.TIMESERIES_BISECT_MAX_DEPTH = 5
+    bad_days = {datetime.date(2024, 1, 3), datetime.date(2024, 1, 8)}
+    _patch_timeseries(mocker, lambda start_date, end_date: any(start_date <= day <= end_date for day in bad_days))
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-10', 'page_size': 40,
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    served_by = response.data['served_by']
+    assert {day for day, provider_name in served_by.items() if provider_name == Provider.ProviderNames.MOCK.value} \
+        == set(map(str, bad_days))
+    assert len(served_by) == 10
+
+
+@pytest.mark.django_db
+def test_ranges_over_provider_limit_are_bisected(api_client, fill_initial_data, mocker, settings):
+    settings.TIMESERIES_BISECT_MAX_DEPTH = 5
+    # Like a read timeout on long ranges: every range over 3 days fails, both halves of a long range too
+    _patch_timeseries(mocker, lambda start_date, end_date: (end_date - start_date).days + 1 > 3)
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-16', 'page_size': 80,
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    assert response.data['provider_name'] == Provider.ProviderNames.CURRENCY_BEACON.value
+    assert len(response.data['served_by']) == 16
+    assert CurrencyExchangeRate.objects.values('valuation_date').distinct().count() == 16
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('error', [
+    {'status_code': 401, 'text': 'Unauthorized'},
+    requests.ConnectionError('Connection refused'),
+])
+def test_unavailable_provider_is_not_bisected(api_client, fill_initial_data, mocker, error):
+    if isinstance(error, Exception):
+        get = mocker.patch('my_currency.currency_clients.requests.get', side_effect=error)
+    else:
+        get = mocker.patch('my_currency.currency_clients.requests.get', return_value=mocker.Mock(**error))
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-10', 'page_size': 40,
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert get.call_count == 1
+    assert response.data['provider_name'] == Provider.ProviderNames.MOCK.value
+    assert set(response.data['served_by'].values()) == {Provider.ProviderNames.MOCK.value}
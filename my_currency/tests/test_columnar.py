@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.columnar import MEDIA_TYPE, decode_columns
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import Provider
+from my_currency.schemas import Rates
+
+
+@pytest.fixture
+def stored_rates(fill_initial_data):
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    rates = {
+        datetime.date(2024, 1, 1) + datetime.timedelta(days=day): Rates(CHF=0.9 + day, EUR=0.95, GBP=0.8, USD=1.0)
+        for day in range(3)
+    }
+    CurrencyExchangeController().save_rates_to_db(rates, 'USD', provider.id)
+
+
+@pytest.mark.django_db
+def test_columnar_matches_json(api_client, stored_rates):
+    params = {'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-03'}
+    response = api_client.get(reverse('currency-rates-list'), params, HTTP_ACCEPT=MEDIA_TYPE)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == MEDIA_TYPE
+
+    header, dates, rates = decode_columns(response.content)
+    assert header['provider_name'] == 'DB'
+    assert dates.tolist() == [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)]
+    assert rates.flags['C_CONTIGUOUS'] and rates.shape == (4, 3)
+
+    json_data = api_client.get(reverse('currency-rates-list'), params).json()['data']
+    for currency_index, code in enumerate(header['currencies']):
+        assert rates[currency_index].tolist() == [json_data[str(day)][code] for day in dates.tolist()]
+
+
+@pytest.mark.django_db
+def test_columnar_from_provider_and_errors(api_client, fill_initial_data, settings):
+    # Nothing stored, the mock provider serves the range
+    Provider.objects.filter(name=Provider.ProviderNames.CURRENCY_BEACON.value).update(is_active=False)
+    params = {'source_currency': 'EUR', 'date_from': '2024-01-01', 'date_to': '2024-01-10', 'format': 'columnar'}
+    response = api_client.get(reverse('currency-rates-list'), params)
+    header, dates, rates = decode_columns(response.content)
+    assert header['provider_name'] == Provider.ProviderNames.MOCK.value
+    assert len(dates) == 10
+    assert np.isfinite(rates).all()
+
+    settings.CURRENCY_RATES_COLUMNAR_MAX_DAYS = 5
+    response = api_client.get(reverse('currency-rates-list'), params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response['Content-Type'] == 'application/json'
+    assert 'date_to' in response.json()
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from my_currency.coverage import is_range_covered, record_coverage
+from my_currency.models import Provider, RateCoverage
+
+
+@pytest.fixture
+def currency_beacon_gap_response(mocker, currency_beacon_timeseries_response):
+    # Currency Beacon has no rates for 2023-10-02
+    response = currency_beacon_timeseries_response['response']
+    currency_beacon_timeseries_response['response'] = {day: response[day] for day in ('2023-10-01', '2023-10-03')}
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    return mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+
+@pytest.mark.django_db
+def test_empty_days_are_not_refetched(api_client, fill_initial_data, currency_beacon_gap_response):
+    url = reverse('currency-rates-list')
+    params = {'source_currency': 'USD', 'date_from': '2023-10-01', 'date_to': '2023-10-03'}
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == Provider.ProviderNames.CURRENCY_BEACON.value
+    assert currency_beacon_gap_response.call_count == 1
+
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == 'DB'
+    assert sorted(map(str, response.data['data'])) == ['2023-10-01', '2023-10-03']
+    assert currency_beacon_gap_response.call_count == 1
+
+    # Empty days expire and are retried
+    RateCoverage.objects.filter(is_empty=True).update(expires_at=timezone.now())
+    response = api_client.get(url, params)
+    assert response.data['provider_name'] == Provider.ProviderNames.CURRENCY_BEACON.value
+    assert currency_beacon_gap_response.call_count == 2
+
+
+@pytest.mark.django_db
+def test_record_coverage_merges_intervals(fill_initial_data):
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    days = [datetime.date(2024, 1, day) for day in range(1, 32)]
+    record_coverage(provider.id, 'USD', days[0], days[9], days[:10])
+    record_coverage(provider.id, 'USD', days[20], days[30], days[20:])
+    assert not is_range_covered('USD', days[0], days[30])
+    assert is_range_covered('USD', days[2], days[8])
+
+    record_coverage(provider.id, 'USD', days[10], days[19], days[10:15])
+    assert is_range_covered('USD', days[0], days[30])
+    assert not is_range_covered('EUR', days[0], days[30])
+    assert list(RateCoverage.objects.values_list('date_from', 'date_to', 'is_empty').order_by('date_from')) == [
+        (days[0], days[14], False),
+        (days[15], days[19], True),
+        (days[20], days[30], False),
+    ]
+
+
+@pytest.mark.django_db
+def test_unpublished_days_are_not_stored_as_empty(fill_initial_data):
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    today = timezone.now().date()
+    yesterday = today - datetime.timedelta(days=1)
+    record_coverage(provider.id, 'USD', yesterday - datetime.timedelta(days=1), today, [yesterday])
+    assert list(RateCoverage.objects.values_list('date_from', 'date_to', 'is_empty').order_by('date_from')) == [
+        (yesterday - datetime.timedelta(days=1), yesterday - datetime.timedelta(days=1), True),
+        (yesterday, yesterday, False),
+    ]
+    assert not is_range_covered('USD', yesterday, today)
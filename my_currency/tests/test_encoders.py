@@ -0,0 +1,55 @@
+import datetime
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+from my_currency.renderers import (ConvertAmountJSONRenderer,
+                                   CurrencyRatesJSONRenderer)
+from my_currency.serializers import (ConvertAmountResponseSerializer,
+                                     CurrencyRatesResponseSerializer)
+
+
+def test_currency_rates_encoder_matches_serializer_from_db():
+    # DB responses have date keys and Decimal values
+    rates = {
+        'provider_name': 'DB',
+        'source_currency': 'USD',
+        'date_from': datetime.date(2023, 10, 1),
+        'date_to': datetime.date(2023, 10, 2),
+        'data': {
+            datetime.date(2023, 10, 1): {'CHF': Decimal('0.915347'), 'EUR': Decimal('0.944466'), 'USD': Decimal('1')},
+            datetime.date(2023, 10, 2): {'CHF': Decimal('0.918655'), 'EUR': Decimal('0.955101'), 'USD': Decimal('1')},
+        },
+        'served_by': {'2023-10-01': 'DB', '2023-10-02': 'DB'},
+        'next': None,
+    }
+    expected = JSONRenderer().render(CurrencyRatesResponseSerializer(rates).data)
+    assert CurrencyRatesJSONRenderer().render(rates) == expected
+
+
+def test_currency_rates_encoder_matches_serializer_from_provider():
+    # Provider responses have string keys and float values
+    rates = {
+        'provider_name': 'currency_beacon',
+        'source_currency': 'EUR',
+        'date_from': datetime.date(2023, 10, 1),
+        'date_to': datetime.date(2023, 10, 1),
+        'data': {'2023-10-01': {'CHF': 0.96918, 'EUR': 1.0, 'GBP': 0.86791, 'USD': 1.0588}},
+        'served_by': {'2023-10-01': 'currency_beacon'},
+        'next': 'http://testserver/api/v1/currency-rates/?cursor=MjAyMy0xMC0wMSxVU0Q%3D',
+    }
+    expected = JSONRenderer().render(CurrencyRatesResponseSerializer(rates).data)
+    assert CurrencyRatesJSONRenderer().render(rates) == expected
+
+
+def test_convert_amount_encoder_matches_serializer():
+    rate = {
+        'provider_name': 'mock',
+        'source_currency': 'USD',
+        'exchanged_currency': 'GBP',
+        'source_amount': 50.0,
+        'exchanged_amount': 38.301277,
+        'rate_value': 0.76602554,
+    }
+    expected = JSONRenderer().render(ConvertAmountResponseSerializer(rate).data)
+    assert ConvertAmountJSONRenderer().render(rate) == expected
@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+
+from my_currency.currency_clients import MockedCurrencyClient
+from my_currency.models import CurrencyExchangeRate
+
+
+def test_mocked_currency_client_is_seeded():
+    start_date, end_date = datetime.date(2024, 1, 1), datetime.date(2024, 1, 3)
+    rates = MockedCurrencyClient(seed=1).timeseries('USD', start_date, end_date)
+
+    assert rates == MockedCurrencyClient(seed=1).timeseries('USD', start_date, end_date)
+    assert rates['2024-01-02'] == MockedCurrencyClient(seed=1).historical('USD', '2024-01-02')
+    assert rates != MockedCurrencyClient(seed=2).timeseries('USD', start_date, end_date)
+    assert rates['2024-01-01'] != rates['2024-01-02']
+
+
+@pytest.mark.django_db
+def test_generate_rates(fill_initial_data):
+    options = {'years': 0.1, 'date_to': datetime.date(2024, 1, 31), 'seed': 7, 'batch_size': 100}
+    call_command('generate_rates', **options)
+
+    rates = CurrencyExchangeRate.objects.all()
+    num_providers = rates.values('provider').distinct().count()
+    assert rates.count() == 36 * 4 * 4 * num_providers
+    assert rates.values('valuation_date').distinct().count() == 36
+
+    values = {
+        (rate.provider_id, rate.source_currency.code, rate.exchanged_currency.code, rate.valuation_date):
+            float(rate.rate_value)
+        for rate in rates.select_related('source_currency', 'exchanged_currency')
+    }
+    provider_id = rates.first().provider_id
+    day = datetime.date(2024, 1, 15)
+    assert values[(provider_id, 'USD', 'USD', day)] == 1
+    assert values[(provider_id, 'USD', 'EUR', day)] * values[(provider_id, 'EUR', 'USD', day)] == pytest.approx(1, 1e-5)
+
+    # Reruns with the same seed neither duplicate nor change rows
+    call_command('generate_rates', **options)
+    assert rates.count() == len(values)
+    assert values[(provider_id, 'USD', 'EUR', day)] == float(
+        rates.get(provider_id=provider_id, source_currency__code='USD', exchanged_currency__code='EUR',
+                  valuation_date=day).rate_value
+    )
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.hedging import (HedgeBudget, LatencyTracker, _get_slots,
+                                 reset_hedging)
+from my_currency.schemas import Rates
+
+
+@pytest.fixture(autouse=True)
+def hedging(settings):
+    settings.HEDGING = {
+        'ENABLED': True, 'PERCENTILE': 95, 'MIN_SAMPLES': 20, 'DEFAULT_DELAY': 0.01, 'MIN_DELAY': 0.01,
+        'MAX_EXTRA_LOAD': 1, 'MAX_WORKERS': 2, 'TIMEOUT': 5,
+    }
+    reset_hedging()
+    yield settings.HEDGING
+    reset_hedging()
+
+
+@pytest.fixture
+def slow_currency_beacon(mocker, currency_beacon_client, mocked_currency_client):
+    release = threading.Event()
+    rates = mocked_currency_client.latest('USD')
+
+    def latest(base_currency):
+        release.wait(5)
+        return rates
+
+    mocker.patch.object(currency_beacon_client, 'latest', side_effect=latest)
+    yield
+    release.set()
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile('provider', 95) is None
+    for duration in range(1, 21):
+        tracker.record('provider', duration / 10)
+    assert tracker.percentile('provider', 50) == pytest.approx(1.6)
+    assert tracker.percentile('provider', 99) == pytest.approx(2.0)
+    assert tracker.percentile('provider', 50, min_samples=11) is None
+
+
+def test_hedge_budget():
+    budget = HedgeBudget(ratio=0.5, max_tokens=1)
+    assert not budget.try_spend()
+    for _ in range(5):
+        budget.on_call()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+@pytest.mark.django_db
+def test_slow_primary_is_hedged(fill_initial_data, slow_currency_beacon, mocked_currency_client):
+    started = time.monotonic()
+    provider, rates = CurrencyExchangeController()._fetch_latest_rates('USD')
+    assert time.monotonic() - started < 1
+    assert provider['client'].provider_name == 'mock'
+    assert rates == mocked_currency_client.latest('USD')
+
+
+@pytest.mark.django_db
+def test_hedging_respects_extra_load_cap(
+        fill_initial_data, mocker, hedging, currency_beacon_client, mocked_currency_client
+        ):
+    hedging['MAX_EXTRA_LOAD'] = 0
+    reset_hedging()
+
+    rates = mocked_currency_client.latest('USD')
+
+    def latest(base_currency):
+        time.sleep(0.1)
+        return rates
+
+    mocker.patch.object(currency_beacon_client, 'latest', side_effect=latest)
+    mocked_latest = mocker.spy(mocked_currency_client, 'latest')
+    provider, _ = CurrencyExchangeController()._fetch_latest_rates('USD')
+    assert provider['client'].provider_name == 'currency_beacon'
+    mocked_latest.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_hung_providers_are_abandoned_after_timeout(fill_initial_data, slow_currency_beacon, hedging):
+    hedging.update({'MAX_EXTRA_LOAD': 0, 'TIMEOUT': 0.2})
+    reset_hedging()
+
+    started = time.monotonic()
+    provider, _ = CurrencyExchangeController()._fetch_latest_rates('USD')
+    assert time.monotonic() - started < 1
+    assert provider['client'].provider_name == 'mock'
+
+
+@pytest.mark.django_db
+def test_busy_workers_call_primary_on_caller_thread(fill_initial_data, mocker, currency_beacon_client):
+    slots = _get_slots()
+    for _ in range(2):
+        slots.acquire()
+    callers = []
+
+    def latest(base_currency):
+        callers.append(threading.current_thread())
+        return Rates(CHF=0.9, EUR=0.9, GBP=0.8, USD=1.0)
+
+    mocker.patch.object(currency_beacon_client, 'latest', side_effect=latest)
+    provider, _ = CurrencyExchangeController()._fetch_latest_rates('USD')
+    assert provider['client'].provider_name == 'currency_beacon'
+    assert callers == [threading.current_thread()]
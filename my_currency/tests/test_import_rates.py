@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from my_currency.models import CurrencyExchangeRate
+from my_currency.rate_files import iter_json_entries
+
+TIMESERIES_PATH = os.path.join(settings.BASE_DIR, 'my_currency', 'tests', 'fixtures', 'timeseries.json')
+
+
+def test_iter_json_entries_across_read_blocks():
+    with open(TIMESERIES_PATH) as f:
+        expected = json.load(f)['response']
+    entries = list(iter_json_entries(TIMESERIES_PATH, read_size=50))
+    assert [day for day, _ in entries] == list(expected)
+    assert all(json.loads(rates) == expected[day] for day, rates in entries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', [0, 2])
+def test_import_rates(fill_initial_data, tmp_path, workers):
+    csv_path = tmp_path / 'rates.csv'
+    csv_path.write_text(
+        'date,CHF,EUR,GBP,USD\n'
+        '2022-01-01,0.91,0.88,0.74,1\n'
+        '2022-01-02,0.92,0.87,0.75,1\n'
+        '2022-01-03,0.93,,0.76,1\n'
+    )
+    options = {'source_currency': 'USD', 'workers': workers, 'batch_size': 10}
+    call_command('import_rates', TIMESERIES_PATH, str(csv_path), **options)
+    assert CurrencyExchangeRate.objects.count() == (92 + 2) * 4
+    assert float(CurrencyExchangeRate.objects.get(
+        valuation_date='2022-01-02', exchanged_currency__code='GBP'
+    ).rate_value) == 0.75
+
+    # Reruns update the same rows
+    call_command('import_rates', TIMESERIES_PATH, str(csv_path), **options)
+    assert CurrencyExchangeRate.objects.count() == (92 + 2) * 4
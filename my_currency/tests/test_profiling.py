@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.profiling import write_profile
+
+
+@pytest.fixture
+def request_profiling(settings, tmp_path):
+    settings.REQUEST_PROFILING = {'TOKEN': 'secret', 'SAMPLE_RATE': 1.0, 'DIR': tmp_path, 'MAX_FILES': 10}
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_request_profiling(api_client, mocker, currency_beacon_timeseries_response, fill_initial_data,
+                           request_profiling):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    url = reverse('currency-rates-list')
+    params = {'source_currency': 'USD', 'date_from': '2023-10-01', 'date_to': '2023-10-03'}
+    response = api_client.get(url, {**params, 'profile': 'secret'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Server-Timing'].startswith('total;dur=')
+    assert 'provider;dur=' in response['Server-Timing']
+
+    summary_path, = request_profiling.glob('*.json')
+    assert summary_path.with_suffix('.prof').exists()
+    summary = json.loads(summary_path.read_text())
+    assert summary['sql_count'] > 0
+    assert [(call['provider'], call['operation']) for call in summary['provider_calls']] == [
+        ('currency_beacon', 'timeseries')
+    ]
+
+    response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert 'Server-Timing' not in response
+    response = api_client.get(url, params, HTTP_X_PROFILE_TOKEN='wrong')
+    assert 'Server-Timing' not in response
+    assert len(list(request_profiling.glob('*.json'))) == 1
+
+
+def test_write_profile_rotates(tmp_path):
+    for i in range(5):
+        write_profile(tmp_path, f'profile-{i}', None, {'total': i}, max_files=3)
+    assert len(list(tmp_path.glob('*.json'))) == 3
+    assert (tmp_path / 'profile-4.json').exists()
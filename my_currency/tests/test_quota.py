@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from django.db.models import F
+
+from my_currency.currency_clients import CurrencyBeaconClient
+from my_currency.exceptions import QuotaExceededException
+from my_currency.models import Currency, Provider, QuotaBucket
+from my_currency.planner import plan_chunks
+from my_currency.quota import ProviderQuota
+from my_currency.tests.factories import CurrencyExchangeRateFactory
+
+
+@pytest.mark.django_db
+def test_plan_chunks_skips_stored_days(fill_initial_data):
+    provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    provider.max_range_days = 10
+    provider.save()
+    usd = Currency.objects.get(code='USD')
+    for currency in Currency.objects.all():
+        CurrencyExchangeRateFactory(
+            provider=provider, source_currency=usd, exchanged_currency=currency,
+            valuation_date=datetime.date(2024, 1, 15),
+        )
+
+    chunks = plan_chunks(provider.name, 'USD', datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
+    assert chunks == [
+        (datetime.date(2024, 1, 22), datetime.date(2024, 1, 31)),
+        (datetime.date(2024, 1, 16), datetime.date(2024, 1, 21)),
+        (datetime.date(2024, 1, 5), datetime.date(2024, 1, 14)),
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 4)),
+    ]
+
+
+@pytest.mark.django_db
+def test_provider_quota_limits(fill_initial_data):
+    Provider.objects.filter(name=Provider.ProviderNames.CURRENCY_BEACON.value).update(
+        requests_per_minute=2, requests_per_month=3
+    )
+    quota = ProviderQuota(Provider.ProviderNames.CURRENCY_BEACON.value)
+    quota.acquire(max_wait=0)
+    quota.acquire(max_wait=0)
+    with pytest.raises(QuotaExceededException):
+        quota.acquire(max_wait=0)
+
+    # One token is refilled in 30s with 2 requests per minute
+    QuotaBucket.objects.update(refilled_at=F('refilled_at') - datetime.timedelta(seconds=30))
+    quota.acquire(max_wait=0)
+
+    # Monthly quota is exhausted, no waiting helps
+    QuotaBucket.objects.update(refilled_at=F('refilled_at') - datetime.timedelta(seconds=60))
+    with pytest.raises(QuotaExceededException):
+        quota.acquire(max_wait=60)
+
+
+@pytest.mark.django_db
+def test_timeseries_respects_max_range_days(mocker, fill_initial_data):
+    Provider.objects.filter(name=Provider.ProviderNames.CURRENCY_BEACON.value).update(max_range_days=30)
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {'meta': {'code': 200, 'disclaimer': ''}, 'response': {}}
+    requests_get = mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    CurrencyBeaconClient().timeseries('USD', datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))
+    assert requests_get.call_count == 4
+    assert requests_get.call_args_list[0].kwargs['params']['start_date'] == '2024-01-01'
+    assert requests_get.call_args_list[-1].kwargs['params']['end_date'] == '2024-03-31'
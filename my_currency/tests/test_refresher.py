@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from my_currency.currency_clients import CurrencyBeaconClient
+from my_currency.models import CurrencyExchangeRate, Provider
+from my_currency.refresher import RateRefresher
+from my_currency.schemas import Rates
+
+
+@pytest.fixture
+def mocked_currency_beacon(mocker):
+    yesterday = (timezone.now().date() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+    rates = Rates(CHF=0.85, EUR=0.9, GBP=0.77, USD=1.0)
+    return {
+        'latest': mocker.patch.object(CurrencyBeaconClient, 'latest', return_value=rates),
+        'timeseries': mocker.patch.object(CurrencyBeaconClient, 'timeseries', return_value={yesterday: rates}),
+    }
+
+
+@pytest.mark.django_db
+def test_rate_refresher_fills_today_and_yesterday(api_client, fill_initial_data, mocked_currency_beacon):
+    refresher = RateRefresher(interval=60, jitter=0, lock_ttl=120)
+    assert refresher.run_once()
+
+    today = timezone.now().date()
+    assert CurrencyExchangeRate.objects.filter(valuation_date=today).count() == 16
+    assert CurrencyExchangeRate.objects.filter(valuation_date=today - datetime.timedelta(days=1)).count() == 16
+
+    # Conversion is served from the refreshed rates without calling the provider
+    url = reverse('convert-amount-list')
+    response = api_client.get(url, {'source_currency': 'USD', 'exchanged_currency': 'EUR', 'amount': 50})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == Provider.ProviderNames.CURRENCY_BEACON.value
+    assert response.data['rate_value'] == 0.9
+    assert mocked_currency_beacon['latest'].call_count == 4
+
+
+@pytest.mark.django_db
+def test_rate_refresher_single_leader(fill_initial_data, mocked_currency_beacon):
+    leader = RateRefresher(interval=60, jitter=0, lock_ttl=120)
+    follower = RateRefresher(interval=60, jitter=0, lock_ttl=120)
+    follower.owner = 'another-host:1'
+
+    assert leader.run_once()
+    assert not follower.run_once()
+    assert leader.run_once()
+
+
+@pytest.mark.django_db
+def test_rate_refresher_survives_errors(fill_initial_data, mocked_currency_beacon, mocker):
+    refresh_latest_rates = mocker.patch(
+        'my_currency.refresher.CurrencyExchangeController.refresh_latest_rates',
+        side_effect=[ConnectionError('Provider is unreachable'), 'DB', 'DB', 'DB'],
+    )
+    mocker.patch('my_currency.refresher.maintain_snapshots', side_effect=RuntimeError('DB is down'))
+    deliver_alerts = mocker.patch('my_currency.refresher.deliver_alerts')
+
+    assert RateRefresher(interval=60, jitter=0, lock_ttl=120).run_once()
+    assert refresh_latest_rates.call_count == 4
+    deliver_alerts.assert_called_once()
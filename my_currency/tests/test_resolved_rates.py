@@ -0,0 +1,51 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import Provider, ResolvedExchangeRate
+from my_currency.schemas import Rates
+
+
+@pytest.fixture
+def rates_of_two_providers(fill_initial_data):
+    controller = CurrencyExchangeController()
+    days = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)]
+    for provider_name, rate_value in [
+        (Provider.ProviderNames.MOCK.value, 2.0), (Provider.ProviderNames.CURRENCY_BEACON.value, 1.0),
+    ]:
+        provider = Provider.objects.get(name=provider_name)
+        rates = {day: Rates(CHF=rate_value, EUR=rate_value, GBP=rate_value, USD=rate_value) for day in days}
+        controller.save_rates_to_db(rates, 'USD', provider.id)
+
+
+@pytest.mark.django_db
+def test_highest_priority_provider_wins(api_client, rates_of_two_providers):
+    assert ResolvedExchangeRate.objects.count() == 8
+    assert set(ResolvedExchangeRate.objects.values_list('provider__name', 'rate_value')) == {
+        (Provider.ProviderNames.CURRENCY_BEACON.value, Decimal('1')),
+    }
+
+    response = api_client.get(reverse('currency-rates-list'), {
+        'source_currency': 'USD', 'date_from': '2024-01-01', 'date_to': '2024-01-02',
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['provider_name'] == 'DB'
+    assert response.data['data'] == {
+        '2024-01-01': {'CHF': 1.0, 'EUR': 1.0, 'GBP': 1.0, 'USD': 1.0},
+        '2024-01-02': {'CHF': 1.0, 'EUR': 1.0, 'GBP': 1.0, 'USD': 1.0},
+    }
+
+
+@pytest.mark.django_db
+def test_priority_change_rebuilds_resolved_rates(api_client, rates_of_two_providers):
+    currency_beacon = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+    response = api_client.patch(reverse('providers-detail', args=[currency_beacon.id]), {'priority': 99})
+    assert response.status_code == status.HTTP_200_OK
+
+    assert set(ResolvedExchangeRate.objects.values_list('provider__name', 'rate_value')) == {
+        (Provider.ProviderNames.MOCK.value, Decimal('2')),
+    }
@@ -0,0 +1,109 @@
+import datetime
+import os
+from pathlib import Path
+
+import pytest
+
+from my_currency.currency_clients import CurrencyBeaconClient
+from my_currency.exceptions import CurrencyBeaconException
+from my_currency.provider_cache import ResponseCache
+
+
+@pytest.fixture
+def record_mode(provider_response_cache):
+    provider_response_cache['MODE'] = 'record'
+    return provider_response_cache
+
+
+@pytest.fixture
+def mocked_get(mocker, currency_beacon_timeseries_response):
+    mocked = mocker.patch('my_currency.currency_clients.requests.get')
+    mocked.return_value.status_code = 200
+    mocked.return_value.json.return_value = currency_beacon_timeseries_response
+    return mocked
+
+
+@pytest.mark.django_db
+def test_past_timeseries_is_served_from_cache(fill_initial_data, record_mode, mocked_get):
+    date_from, date_to = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+    first = CurrencyBeaconClient().timeseries('USD', date_from, date_to)
+
+    # api_key is not a part of the key
+    client = CurrencyBeaconClient()
+    client.api_key = 'another-key'
+    second = client.timeseries('USD', date_from, date_to)
+
+    assert mocked_get.call_count == 1
+    assert second == first
+
+
+@pytest.mark.django_db
+def test_range_including_today_is_not_cached(fill_initial_data, record_mode, mocked_get):
+    today = datetime.date.today()
+    CurrencyBeaconClient().timeseries('USD', today - datetime.timedelta(days=5), today)
+    CurrencyBeaconClient().timeseries('USD', today - datetime.timedelta(days=5), today)
+
+    assert mocked_get.call_count == 2
+    assert not list(record_mode['DIR'].glob('*.json'))
+
+
+@pytest.mark.django_db
+def test_replay_mode_never_calls_network(fill_initial_data, record_mode, mocked_get):
+    date_from, date_to = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+    recorded = CurrencyBeaconClient().timeseries('USD', date_from, date_to)
+
+    record_mode['MODE'] = 'replay'
+    assert CurrencyBeaconClient().timeseries('USD', date_from, date_to) == recorded
+    with pytest.raises(CurrencyBeaconException):
+        CurrencyBeaconClient().timeseries('USD', date_from, datetime.date(2024, 2, 1))
+    assert mocked_get.call_count == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('mode', ['record', 'replay'])
+def test_unreadable_recorded_response_is_a_miss(fill_initial_data, record_mode, mocked_get, mode):
+    date_from, date_to = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+    recorded = CurrencyBeaconClient().timeseries('USD', date_from, date_to)
+    [path] = record_mode['DIR'].glob('*.json')
+    path.write_text('')
+
+    record_mode['MODE'] = mode
+    if mode == 'replay':
+        with pytest.raises(CurrencyBeaconException):
+            CurrencyBeaconClient().timeseries('USD', date_from, date_to)
+        assert mocked_get.call_count == 1
+        assert not path.exists()
+    else:
+        assert CurrencyBeaconClient().timeseries('USD', date_from, date_to) == recorded
+        assert mocked_get.call_count == 2
+
+
+def test_read_of_evicted_response_does_not_recreate_it(tmp_path, mocker):
+    cache = ResponseCache(tmp_path, max_bytes=1024)
+    cache.set('latest', {'day': 0}, {'rates': {}})
+    path = cache._path('latest', {'day': 0})
+    read_text = Path.read_text
+
+    def read_then_evict(self):
+        # Another process evicts the file right after it was read
+        body = read_text(self)
+        os.remove(self)
+        return body
+    mocker.patch.object(Path, 'read_text', read_then_evict)
+
+    assert cache.get('latest', {'day': 0}) == {'rates': {}}
+    assert not path.exists()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    body = {'rates': 'x' * 90}
+    cache.set('latest', {'day': 0}, body)
+    cache.set('latest', {'day': 1}, body)
+    # mtime resolution may be coarse, day 1 is made the least recently used explicitly
+    os.utime(cache._path('latest', {'day': 1}), (0, 0))
+    cache.set('latest', {'day': 2}, body)
+
+    assert cache.get('latest', {'day': 0}) is not None
+    assert cache.get('latest', {'day': 1}) is None
+    assert cache.get('latest', {'day': 2}) is not None
@@ -0,0 +1,39 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.middleware import PIN_COOKIE_NAME
+from my_currency.models import Currency
+from my_currency.routers import reset_pinning
+from my_currency.utils import fill_currencies
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_reads_go_to_replica_and_writes_pin_to_primary(api_client, settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    fill_currencies()
+    reset_pinning()
+    assert Currency.objects.all().db == 'replica'
+
+    url = reverse('currencies-v1-list')
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 4
+    assert len(primary) == 0
+    assert len(replica) == 1
+
+    # Write goes to primary and pins the client there
+    response = api_client.post(url, {'code': 'JPY', 'name': 'Japanese Yen', 'symbol': '¥'})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert PIN_COOKIE_NAME in response.cookies
+
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = api_client.get(url)
+    assert len(response.data['results']) == 5
+    assert len(primary) == 1
+    assert len(replica) == 0
@@ -0,0 +1,95 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.models import (CurrencyExchangeRate, Provider, RateSnapshot,
+                                SnapshotResolution)
+from my_currency.snapshots import (choose_resolution, maintain_snapshots,
+                                   record_snapshot)
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def currency_beacon(fill_initial_data):
+    return Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+
+
+def _rates(value: float) -> dict:
+    return {'CHF': value, 'EUR': value, 'GBP': value, 'USD': 1.0}
+
+
+@pytest.mark.django_db
+def test_snapshots_of_a_minute_are_merged(currency_beacon):
+    record_snapshot(currency_beacon.id, 'USD', _rates(0.9), at=datetime.datetime(2024, 1, 1, 10, 0, 5, tzinfo=UTC))
+    record_snapshot(currency_beacon.id, 'USD', _rates(0.7), at=datetime.datetime(2024, 1, 1, 10, 0, 40, tzinfo=UTC))
+    record_snapshot(currency_beacon.id, 'USD', _rates(0.8), at=datetime.datetime(2024, 1, 1, 10, 0, 55, tzinfo=UTC))
+
+    snapshot = RateSnapshot.objects.get(exchanged_currency__code='EUR')
+    assert snapshot.bucket_start == datetime.datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+    assert (float(snapshot.rate_value), float(snapshot.rate_min), float(snapshot.rate_max)) == (0.8, 0.7, 0.9)
+    assert snapshot.samples == 3
+
+
+@pytest.mark.django_db
+def test_snapshots_are_downsampled(currency_beacon):
+    for hour, minute, value in [(10, 0, 0.9), (10, 30, 0.95), (11, 15, 0.85)]:
+        record_snapshot(
+            currency_beacon.id, 'USD', _rates(value), at=datetime.datetime(2024, 1, 1, hour, minute, tzinfo=UTC)
+        )
+
+    maintain_snapshots(now=datetime.datetime(2024, 1, 3, 12, 0, tzinfo=UTC))
+
+    eur = RateSnapshot.objects.filter(exchanged_currency__code='EUR')
+    # Minutes are older than their retention
+    assert not eur.filter(resolution=SnapshotResolution.MINUTE).exists()
+    hours = list(eur.filter(resolution=SnapshotResolution.HOUR).order_by('bucket_start'))
+    assert [(hour.bucket_start.hour, float(hour.rate_value), hour.samples) for hour in hours] == [
+        (10, 0.95, 2), (11, 0.85, 1)
+    ]
+    day = eur.get(resolution=SnapshotResolution.DAY)
+    assert (float(day.rate_value), float(day.rate_min), float(day.rate_max), day.samples) == (0.85, 0.85, 0.95, 3)
+
+    # The closing rate feeds the daily table
+    daily = CurrencyExchangeRate.objects.get(exchanged_currency__code='EUR', valuation_date=datetime.date(2024, 1, 1))
+    assert float(daily.rate_value) == 0.85
+
+
+def test_choose_resolution(settings):
+    now = datetime.datetime(2024, 6, 1, tzinfo=UTC)
+    assert choose_resolution(now - datetime.timedelta(hours=6), now, now) == SnapshotResolution.MINUTE
+    # Minutes of 10 days ago are gone
+    assert choose_resolution(
+        now - datetime.timedelta(days=10), now - datetime.timedelta(days=9), now
+    ) == SnapshotResolution.HOUR
+    assert choose_resolution(now - datetime.timedelta(days=365), now, now) == SnapshotResolution.DAY
+
+
+@pytest.mark.django_db
+def test_latest_rates_are_snapshotted(api_client, mocker, currency_beacon, currency_beacon_latest_response):
+    mock_response = mocker.Mock(status_code=200)
+    mock_response.json.return_value = currency_beacon_latest_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    # Conversions don't write snapshots on the request path
+    response = api_client.get(reverse('convert-amount-list'), {
+        'source_currency': 'USD', 'exchanged_currency': 'EUR', 'amount': 10,
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert not RateSnapshot.objects.exists()
+
+    CurrencyExchangeController().refresh_latest_rates('USD')
+    now = timezone.now()
+    response = api_client.get(reverse('currency-rates-intraday'), {
+        'source_currency': 'USD',
+        'time_from': (now - datetime.timedelta(minutes=5)).isoformat(),
+        'time_to': now.isoformat(),
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['resolution'] == SnapshotResolution.MINUTE
+    [rates] = response.data['data'].values()
+    assert set(rates) == {'CHF', 'EUR', 'GBP', 'USD'}
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.currency_clients import MockedCurrencyClient
+from my_currency.models import Provider
+
+BOOT_SCRIPT = '''
+import json, os, sys
+os.environ['DJANGO_SETTINGS_MODULE'] = 'my_currency.settings'
+import django
+django.setup()
+from django.core.management import load_command_class
+for name in sys.argv[1:]:
+    load_command_class('my_currency', name)
+if sys.argv[1:]:
+    import my_currency.refresher
+print(json.dumps(sorted(sys.modules)))
+'''
+
+
+def top_level(modules: set[str]) -> set[str]:
+    return {module.split('.')[0] for module in modules}
+
+
+def boot(*commands: str) -> set[str]:
+    output = subprocess.run(
+        [sys.executable, '-c', BOOT_SCRIPT, *commands],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return set(json.loads(output.splitlines()[-1]))
+
+
+def test_commands_and_worker_import_budget():
+    # Module lists don't depend on the machine, unlike wall clock time
+    baseline = boot()
+    modules = boot('archive_rates', 'backfill', 'fill_init_data', 'generate_rates', 'run_rate_refresher')
+    # Commands and the refresher add no third-party packages to what django.setup() already imports
+    assert {package for package in top_level(modules) - top_level(baseline) if not package.startswith('_')} == set()
+    # Provider clients and their schemas are imported on first use
+    assert 'my_currency.currency_clients' not in modules
+    assert 'my_currency.schemas' not in modules
+    assert 'pydantic' not in modules
+
+
+@pytest.mark.django_db
+def test_provider_declared_in_settings(fill_initial_data, settings, provider_registry):
+    settings.CURRENCY_PROVIDERS = {
+        Provider.ProviderNames.CURRENCY_BEACON.value: 'my_currency.currency_clients.MockedCurrencyClient',
+    }
+    provider_registry.reset()
+
+    providers = list(CurrencyExchangeController()._get_providers())
+    # The mock provider row has no client declared anymore and is skipped
+    assert len(providers) == 1
+    assert isinstance(providers[0]['client'], MockedCurrencyClient)
+    assert providers[0]['client'] is provider_registry.get_client(Provider.ProviderNames.CURRENCY_BEACON.value)
+
+
+@pytest.mark.django_db
+def test_provider_rows_need_a_declared_client(api_client, settings, provider_registry):
+    provider = {'name': 'my_provider', 'priority': 3, 'is_active': True}
+    response = api_client.post(reverse('providers-list'), provider)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'name' in response.data
+
+    settings.CURRENCY_PROVIDERS = {**settings.CURRENCY_PROVIDERS, 'my_provider': 'my_package.clients.MyProviderClient'}
+    provider_registry.reset()
+    response = api_client.post(reverse('providers-list'), provider)
+    assert response.status_code == status.HTTP_201_CREATED
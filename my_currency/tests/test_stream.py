@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+from django.test import AsyncClient
+from django.urls import reverse
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.stream import (RateChannel, Subscription, _channels,
+                                get_channel)
+
+
+@pytest.fixture
+def rate_stream_settings(settings):
+    settings.RATE_STREAM = {'POLL_INTERVAL': 0.01, 'HEARTBEAT': 1, 'QUEUE_SIZE': 2}
+
+
+def test_subscription_drops_oldest_updates():
+    async def main():
+        subscription = Subscription(max_size=2)
+        for value in range(5):
+            subscription.put({'value': value})
+        assert subscription.dropped == 3
+        assert await subscription.get(timeout=1) == {'value': 3}
+        assert await subscription.get(timeout=1) == {'value': 4}
+        assert await subscription.get(timeout=0.01) is None
+
+    asyncio.run(main())
+
+
+def test_rate_channel_polls_once_for_all_subscribers(rate_stream_settings):
+    calls = []
+
+    def fetch(source_currency):
+        calls.append(source_currency)
+        return {'source_currency': source_currency, 'rates': {'EUR': 0.9 + len(calls) / 100}}
+
+    async def main():
+        channel = RateChannel('USD', fetch=fetch)
+        subscriptions = [channel.subscribe() for _ in range(20)]
+        updates = [await subscription.get(timeout=1) for subscription in subscriptions]
+        assert all(update == updates[0] for update in updates)
+        assert len(calls) <= 2
+
+        for subscription in subscriptions:
+            channel.unsubscribe(subscription)
+        await asyncio.sleep(0.05)
+        num_calls = len(calls)
+        await asyncio.sleep(0.05)
+        # Poller stops with the last subscriber
+        assert len(calls) == num_calls
+
+    asyncio.run(main())
+
+
+def test_rate_channel_keeps_polling_after_errors(rate_stream_settings):
+    calls = []
+
+    def fetch(source_currency):
+        calls.append(source_currency)
+        if len(calls) == 1:
+            raise ConnectionError('Provider is unreachable')
+        return {'source_currency': source_currency, 'rates': {'EUR': 0.9}}
+
+    async def main():
+        channel = RateChannel('USD', fetch=fetch)
+        subscription = channel.subscribe()
+        assert await subscription.get(timeout=1) == {'source_currency': 'USD', 'rates': {'EUR': 0.9}}
+        channel.unsubscribe(subscription)
+
+    asyncio.run(main())
+    assert len(calls) >= 2
+
+
+def test_channels_of_closed_loops_are_removed():
+    async def main():
+        return get_channel('USD')
+
+    channel = asyncio.run(main())
+    assert channel in _channels.values()
+    asyncio.run(main())
+    assert channel not in _channels.values()
+
+
+def test_currency_rates_stream_view(rate_stream_settings, mocker):
+    latest_rates = {'provider_name': 'mock', 'source_currency': 'USD', 'rates': {'EUR': 0.9, 'USD': 1.0}}
+    mocker.patch('my_currency.stream._fetch_latest_rates', return_value=latest_rates)
+
+    async def main():
+        client = AsyncClient()
+        response = await client.get(reverse('currency-rates-stream'), {'source_currency': 'XXX'})
+        assert response.status_code == 400
+
+        response = await client.get(reverse('currency-rates-stream'), {'source_currency': 'USD'})
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/event-stream'
+        events = aiter(response.streaming_content)
+        event = (await anext(events)).decode()
+        await events.aclose()
+        return event
+
+    event = asyncio.run(main())
+    assert event.startswith('event: rates\ndata: ')
+    assert json.loads(event.split('data: ')[1]) == latest_rates
+
+
+@pytest.mark.django_db
+def test_latest_rates_from_db(mocker, currency_beacon_latest_response, fill_initial_data):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_latest_response
+    requests_get = mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    CurrencyExchangeController().refresh_latest_rates('USD')
+    rates = CurrencyExchangeController().latest_rates('USD')
+    assert rates['provider_name'] == 'currency_beacon'
+    assert rates['rates']['EUR'] == pytest.approx(currency_beacon_latest_response['response']['rates']['EUR'])
+    assert requests_get.call_count == 1
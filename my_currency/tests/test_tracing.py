@@ -0,0 +1,52 @@
+import datetime
+import json
+
+import pytest
+
+from my_currency.controllers import CurrencyExchangeController
+from my_currency.tracing import NOOP_SPAN, reset_exporter, start_span
+
+
+def test_tracing_disabled(settings):
+    settings.TRACING = {'EXPORTER': None, 'OPTIONS': {}}
+    reset_exporter()
+    assert start_span('phase', rows=1) is NOOP_SPAN
+
+
+def test_json_lines_span_exporter(settings, tmp_path):
+    path = tmp_path / 'spans.jsonl'
+    settings.TRACING = {'EXPORTER': 'my_currency.tracing.JsonLinesSpanExporter', 'OPTIONS': {'path': path}}
+    reset_exporter()
+    try:
+        with start_span('parent') as parent, start_span('child', rows=2):
+            pass
+    finally:
+        reset_exporter()
+
+    child, parent_span = [json.loads(line) for line in path.read_text().splitlines()]
+    assert child['name'] == 'child'
+    assert child['attributes'] == {'rows': 2}
+    assert child['parent_id'] == parent.span_id == parent_span['span_id']
+    assert child['trace_id'] == parent_span['trace_id']
+
+
+@pytest.mark.django_db
+def test_controller_spans(mocker, currency_beacon_timeseries_response, fill_initial_data, span_exporter):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = currency_beacon_timeseries_response
+    mocker.patch('my_currency.currency_clients.requests.get', return_value=mock_response)
+
+    CurrencyExchangeController().currency_rates_list('USD', datetime.date(2023, 10, 1), datetime.date(2023, 10, 3))
+
+    spans = {span['name']: span for span in span_exporter.spans}
+    assert list(spans) == [
+        'get_rates_from_db', 'provider_timeseries', 'save_rates_to_db', 'prepare_response_from_provider',
+        'currency_rates_list',
+    ]
+    assert spans['get_rates_from_db']['attributes']['rows'] == 0
+    assert spans['provider_timeseries']['attributes'] == {'provider': 'currency_beacon', 'days': 92}
+    assert spans['save_rates_to_db']['attributes']['rows'] == 92 * 4
+    assert spans['currency_rates_list']['attributes']['provider'] == 'currency_beacon'
+    root_id = spans['currency_rates_list']['span_id']
+    assert all(span['parent_id'] == root_id for name, span in spans.items() if name != 'currency_rates_list')
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from my_currency import logger
+
+_current_span = ContextVar('current_span', default=None)
+_UNSET = object()
+_exporter = _UNSET
+
+
+class NoopSpan:
+    """
+    Returned while tracing is disabled, so instrumented code costs one function call per span.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    def __init__(self, name: str, exporter, attributes: dict):
+        self.name = name
+        self.exporter = exporter
+        self.attributes = attributes
+        self.span_id = os.urandom(8).hex()
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._started
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        try:
+            self.exporter.export(self.to_dict())
+        except Exception as e:
+            logger.warning(f'Could not export span {self.name}: {e}')
+        return False
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'attributes': self.attributes,
+        }
+
+
+class JsonLinesSpanExporter:
+    """
+    Appends finished spans to a file, one JSON object per line.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        line = json.dumps(span, default=str) + '\n'
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line)
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span: dict) -> None:
+        self.spans.append(span)
+
+
+def get_exporter():
+    """
+    Exporter configured in settings.TRACING, None when tracing is disabled. Loaded once.
+    """
+    global _exporter
+    if _exporter is _UNSET:
+        exporter_path = settings.TRACING['EXPORTER']
+        _exporter = import_string(exporter_path)(**settings.TRACING['OPTIONS']) if exporter_path else None
+    return _exporter
+
+
+def set_exporter(exporter) -> None:
+    global _exporter
+    _exporter = exporter
+
+
+def reset_exporter() -> None:
+    set_exporter(_UNSET)
+
+
+def start_span(name: str, **attributes) -> Span | NoopSpan:
+    """
+    Use as `with start_span('phase', provider=name) as span: ...`, the span is exported when the block exits.
+    """
+    exporter = get_exporter()
+    if exporter is None:
+        return NOOP_SPAN
+    return Span(name, exporter, attributes)
@@ -4,7 +4,9 @@ from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 from rest_framework.routers import DefaultRouter
 
-from my_currency.viewsets import (ConvertAmountViewSet,
+from my_currency.stream import currency_rates_stream
+from my_currency.viewsets import (AlertSubscriptionsModelViewSet,
+                                  ConvertAmountViewSet,
                                   CurrenciesV1ModelViewSet,
                                   CurrenciesV2ModelViewSet,
                                   CurrencyRatesViewSet, LaunchAsyncHistoryTask,
@@ -16,12 +18,14 @@ routerv1.register('providers', ProvidersModelviewSet, basename='providers')
 routerv1.register('currency-rates', CurrencyRatesViewSet, basename='currency-rates')
 routerv1.register('convert-amount', ConvertAmountViewSet, basename='convert-amount')
 routerv1.register('launch-history-task', LaunchAsyncHistoryTask, basename='launch-history-task')
+routerv1.register('alert-subscriptions', AlertSubscriptionsModelViewSet, basename='alert-subscriptions')
 
 routerv2 = DefaultRouter()
 routerv2.register('currencies', CurrenciesV2ModelViewSet, basename='currencies-v2')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/currency-rates/stream/', currency_rates_stream, name='currency-rates-stream'),
     path('api/v1/', include(routerv1.urls)),
     path('api/v2/', include(routerv2.urls)),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -1,12 +1,12 @@
 import datetime
-from threading import Thread
 
 from django.db import IntegrityError
 
 from my_currency import logger
 from my_currency.controllers import CurrencyExchangeController
-from my_currency.currency_clients import currency_beacon_client
 from my_currency.models import Currency, Provider
+from my_currency.providers import get_provider_client
+from my_currency.tracing import start_span
 
 
 def fill_currencies():
@@ -45,27 +45,16 @@ def fill_providers():
 def fill_date_range(date_from: datetime.date, date_to: datetime.date, source_currency: str):
     logger.info(f'Loading historical data: {date_from} → {date_to}')
     controller = CurrencyExchangeController()
-    rates = currency_beacon_client.timeseries(
-        base_currency=source_currency,
-        start_date=date_from,
-        end_date=date_to,
-    )
-    currency_beacon_provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
-    controller.save_rates_to_db(rates, source_currency, currency_beacon_provider.id)
-
-def fill_historical_data(date_from: datetime.date, date_to: datetime.date, source_currency: str):
-    logger.info(
-        f'Launching threads to fetch historical data '
-        f'from {date_from} to {date_to}, source_currency: {source_currency}...'
-    )
-    for chunk_start, chunk_end in month_chunks(date_from, date_to):
-        Thread(target=fill_date_range, args=(chunk_start, chunk_end, source_currency)).start()
-    logger.info('All threads launched.')
-
-
-def month_chunks(start_date: datetime.date, end_date: datetime.date):
-    current = start_date
-    while current < end_date:
-        next_month = current + datetime.timedelta(days=30)
-        yield (current, min(next_month, end_date))
-        current = next_month
+    currency_beacon_client = get_provider_client(Provider.ProviderNames.CURRENCY_BEACON.value)
+    with start_span(
+            'backfill_chunk', provider=currency_beacon_client.provider_name, source_currency=source_currency,
+            date_from=str(date_from), date_to=str(date_to)
+            ) as span:
+        rates = currency_beacon_client.timeseries(
+            base_currency=source_currency,
+            start_date=date_from,
+            end_date=date_to,
+        )
+        span.set_attribute('days', len(rates))
+        currency_beacon_provider = Provider.objects.get(name=Provider.ProviderNames.CURRENCY_BEACON.value)
+        controller.save_timeseries_to_db(rates, source_currency, currency_beacon_provider.id, date_from, date_to)
@@ -1,44 +1,164 @@
 from threading import Thread
 
+from django.conf import settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import ModelViewSet, ViewSet
 
+from my_currency.audit import get_conversion_audit
+from my_currency.backfill import create_backfill_job, run_backfill_job
 from my_currency.controllers import CurrencyExchangeController
 from my_currency.exceptions import NoProviderException
-from my_currency.models import Currency, Provider
-from my_currency.serializers import (ConvertAmountRequestSerializer,
+from my_currency.models import AlertSubscription, Currency, Provider
+from my_currency.renderers import (ConvertAmountJSONRenderer,
+                                   CurrencyRatesColumnarRenderer,
+                                   CurrencyRatesJSONRenderer)
+from my_currency.resolved_rates import refresh_resolved_rates
+from my_currency.serializers import (AlertSubscriptionModelSerializer,
+                                     ConversionAuditStatsSerializer,
+                                     ConvertAmountRequestSerializer,
                                      ConvertAmountResponseSerializer,
                                      CurrenciesV1ModelSerializer,
                                      CurrenciesV2ModelSerializer,
+                                     CurrencyRatesAnalyticsRequestSerializer,
+                                     CurrencyRatesAnalyticsResponseSerializer,
+                                     CurrencyRatesListRequestSerializer,
+                                     CurrencyRatesMatrixRequestSerializer,
+                                     CurrencyRatesMatrixResponseSerializer,
                                      CurrencyRatesRequestSerializer,
                                      CurrencyRatesResponseSerializer,
                                      ErrorResponseSerializer,
-                                     ProviderModelSerializer)
-from my_currency.utils import fill_historical_data
+                                     ProviderModelSerializer,
+                                     RateSnapshotsRequestSerializer,
+                                     RateSnapshotsResponseSerializer)
+from my_currency.snapshots import get_snapshots
 
 
 class CurrencyRatesViewSet(ViewSet):
+    renderer_classes = [CurrencyRatesJSONRenderer, CurrencyRatesColumnarRenderer, BrowsableAPIRenderer]
+
+    @extend_schema(
+        parameters=[CurrencyRatesListRequestSerializer],
+        responses={
+            200: CurrencyRatesResponseSerializer,
+            (200, CurrencyRatesColumnarRenderer.media_type): OpenApiTypes.BINARY,
+            400: ErrorResponseSerializer,
+        },
+    )
     def list(self, request):
-        currency_rates_serializer = CurrencyRatesRequestSerializer(data=request.query_params)
+        currency_rates_serializer = CurrencyRatesListRequestSerializer(data=request.query_params)
         currency_rates_serializer.is_valid(raise_exception=True)
         filters = currency_rates_serializer.validated_data
 
         currency_controller = CurrencyExchangeController()
         try:
-            rates = currency_controller.currency_rates_list(
+            if isinstance(request.accepted_renderer, CurrencyRatesColumnarRenderer):
+                # The whole range in one response, bulk consumers don't paginate
+                if (filters['date_to'] - filters['date_from']).days >= settings.CURRENCY_RATES_COLUMNAR_MAX_DAYS:
+                    raise ValidationError(
+                        {'date_to': f'Range is limited to {settings.CURRENCY_RATES_COLUMNAR_MAX_DAYS} days.'}
+                    )
+                columns = currency_controller.currency_rates_columns(
+                    source_currency=filters['source_currency'],
+                    date_from=filters['date_from'],
+                    date_to=filters['date_to'],
+                )
+                return Response(columns)
+
+            rates = currency_controller.currency_rates_page(
+                source_currency=filters['source_currency'],
+                date_from=filters['date_from'],
+                date_to=filters['date_to'],
+                page_size=filters['page_size'],
+                position=filters.get('cursor'),
+            )
+            if rates['next'] is not None:
+                rates['next'] = replace_query_param(request.build_absolute_uri(), 'cursor', rates['next'])
+            # Serialised by CurrencyRatesJSONRenderer straight from the controller output
+            return Response(rates)
+        except NoProviderException as e:
+            serializer = ErrorResponseSerializer(data={'message': str(e)})
+            serializer.is_valid(raise_exception=True)
+            return Response(serializer.data, status=400)
+
+    @extend_schema(
+        parameters=[CurrencyRatesAnalyticsRequestSerializer],
+        responses={200: CurrencyRatesAnalyticsResponseSerializer, 400: ErrorResponseSerializer},
+    )
+    @action(detail=False, renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
+    def analytics(self, request):
+        analytics_serializer = CurrencyRatesAnalyticsRequestSerializer(data=request.query_params)
+        analytics_serializer.is_valid(raise_exception=True)
+        filters = analytics_serializer.validated_data
+
+        currency_controller = CurrencyExchangeController()
+        try:
+            analytics = currency_controller.currency_rates_analytics(
                 source_currency=filters['source_currency'],
                 date_from=filters['date_from'],
-                date_to=filters['date_to']
+                date_to=filters['date_to'],
+                windows=filters['windows'],
+                targets=filters['targets'],
+            )
+            return Response(analytics)
+        except NoProviderException as e:
+            serializer = ErrorResponseSerializer(data={'message': str(e)})
+            serializer.is_valid(raise_exception=True)
+            return Response(serializer.data, status=400)
+
+    @extend_schema(
+        parameters=[CurrencyRatesMatrixRequestSerializer],
+        responses={200: CurrencyRatesMatrixResponseSerializer, 400: ErrorResponseSerializer},
+    )
+    @action(detail=False, renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
+    def matrix(self, request):
+        matrix_serializer = CurrencyRatesMatrixRequestSerializer(data=request.query_params)
+        matrix_serializer.is_valid(raise_exception=True)
+        filters = matrix_serializer.validated_data
+
+        currency_controller = CurrencyExchangeController()
+        try:
+            matrix = currency_controller.currency_rates_matrix(
+                date_from=filters['date_from'],
+                date_to=filters['date_to'],
+                currencies=filters['currencies'],
             )
-            serializer = CurrencyRatesResponseSerializer(rates)
-            return Response(serializer.data)
+            return Response(matrix)
         except NoProviderException as e:
             serializer = ErrorResponseSerializer(data={'message': str(e)})
             serializer.is_valid(raise_exception=True)
             return Response(serializer.data, status=400)
 
-        
+    @extend_schema(
+        parameters=[RateSnapshotsRequestSerializer],
+        responses={200: RateSnapshotsResponseSerializer},
+    )
+    @action(detail=False, renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
+    def intraday(self, request):
+        snapshots_serializer = RateSnapshotsRequestSerializer(data=request.query_params)
+        snapshots_serializer.is_valid(raise_exception=True)
+        filters = snapshots_serializer.validated_data
+
+        snapshots = get_snapshots(
+            source_currency=filters['source_currency'],
+            time_from=filters['time_from'],
+            time_to=filters['time_to'],
+        )
+        return Response(RateSnapshotsResponseSerializer(snapshots).data)
+
+
 class ConvertAmountViewSet(ViewSet):
+    renderer_classes = [ConvertAmountJSONRenderer, BrowsableAPIRenderer]
+
+    @extend_schema(
+        parameters=[ConvertAmountRequestSerializer],
+        responses={200: ConvertAmountResponseSerializer, 400: ErrorResponseSerializer},
+    )
     def list(self, request):
         convert_amount_serializer = ConvertAmountRequestSerializer(data=request.query_params)
         convert_amount_serializer.is_valid(raise_exception=True)
@@ -51,18 +171,41 @@ class ConvertAmountViewSet(ViewSet):
                 exchanged_currency=filters['exchanged_currency'],
                 amount=filters['amount'],
             )
-            serializer = ConvertAmountResponseSerializer(rate)
-            return Response(serializer.data)
+            get_conversion_audit().record(rate)
+            # Serialised by ConvertAmountJSONRenderer straight from the controller output
+            return Response(rate)
         except NoProviderException as e:
             serializer = ErrorResponseSerializer(data={'message': str(e)})
             serializer.is_valid(raise_exception=True)
             return Response(serializer.data, status=400)
 
+    @extend_schema(responses={200: ConversionAuditStatsSerializer})
+    @action(detail=False, url_path='audit-stats', renderer_classes=[JSONRenderer, BrowsableAPIRenderer])
+    def audit_stats(self, request):
+        serializer = ConversionAuditStatsSerializer(get_conversion_audit().stats())
+        return Response(serializer.data)
+
 
 class ProvidersModelviewSet(ModelViewSet):
     queryset = Provider.objects.all()
     serializer_class = ProviderModelSerializer
 
+    def perform_update(self, serializer):
+        previous_priority = serializer.instance.priority
+        super().perform_update(serializer)
+        if serializer.instance.priority != previous_priority:
+            refresh_resolved_rates()
+
+    def perform_destroy(self, instance):
+        # Rates of lower priority providers take over the days of the deleted one
+        super().perform_destroy(instance)
+        refresh_resolved_rates()
+
+
+class AlertSubscriptionsModelViewSet(ModelViewSet):
+    queryset = AlertSubscription.objects.select_related('source_currency', 'exchanged_currency')
+    serializer_class = AlertSubscriptionModelSerializer
+
 
 class CurrenciesV1ModelViewSet(ModelViewSet):
     queryset = Currency.objects.all()
@@ -78,5 +221,6 @@ class LaunchAsyncHistoryTask(ViewSet):
         currency_rates_serializer = CurrencyRatesRequestSerializer(data=request.data)
         currency_rates_serializer.is_valid(raise_exception=True)
         data = currency_rates_serializer.validated_data
-        Thread(target=fill_historical_data, args=(data['date_from'], data['date_to'], data['source_currency'])).start()
-        return Response({'message': 'Task launched successfully'})
+        job = create_backfill_job(data['source_currency'], data['date_from'], data['date_to'])
+        Thread(target=run_backfill_job, args=(job,)).start()
+        return Response({'message': 'Task launched successfully', 'job_id': job.id})